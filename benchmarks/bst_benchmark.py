@@ -0,0 +1,85 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Time parsing .bst styles and formatting bibliographies with them.
+
+Usage: python benchmarks/bst_benchmark.py [number of entries]
+
+The entries of ``xampl.bib`` from the test data are copied with new keys
+until there are enough of them. The bibliography data is parsed once,
+so only the .bst interpreter is timed.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import io
+import os
+import sys
+import timeit
+
+import pybtex.io
+from pybtex import errors
+from pybtex.bibtex import bst
+from pybtex.bibtex.interpreter import Interpreter
+from pybtex.database import BibliographyData, parse_file
+from pybtex.database.input.bibtex import Parser
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, 'tests', 'data')
+STYLES = ['plain', 'alpha', 'IEEEtran', 'jurabib', 'apacite']
+
+
+def make_bib_data(size):
+    xampl = parse_file(os.path.join(DATA_DIR, 'xampl.bib'))
+    bib_data = BibliographyData(preamble=xampl.preamble_list)
+    copy = 0
+    while len(bib_data.entries) < size:
+        for key, entry in xampl.entries.items():
+            if 'crossref' in entry.fields:
+                continue
+            bib_data.add_entry('{0}-{1}'.format(key, copy), entry.lower())
+        copy += 1
+    return bib_data
+
+
+def format_bibliography(bst_script, bib_data):
+    stdout = pybtex.io.stdout
+    # silence top$
+    pybtex.io.stdout = io.StringIO()
+    try:
+        with errors.capture():
+            return Interpreter(Parser, None).run(bst_script, ['*'], bib_data, min_crossrefs=2)
+    finally:
+        pybtex.io.stdout = stdout
+
+
+def main(size=1000):
+    bib_data = make_bib_data(size)
+    print('{0} entries'.format(len(bib_data.entries)))
+    for style in STYLES:
+        filename = os.path.join(DATA_DIR, style + '.bst')
+        parse_time = min(timeit.repeat(lambda: list(bst.parse_file(filename)), number=1, repeat=5))
+        bst_script = list(bst.parse_file(filename))
+        run_time = min(timeit.repeat(lambda: format_bibliography(bst_script, bib_data), number=1, repeat=3))
+        print('{0:<10} parse {1:8.1f} ms   format {2:8.1f} ms'.format(style, parse_time * 1e3, run_time * 1e3))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,86 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Time the basic operations of the case-insensitive containers.
+
+Usage: python benchmarks/containers_benchmark.py
+
+The same operations on a plain :py:class:`dict` or :py:class:`set`
+are timed for comparison, and the times are also shown relative to them.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import timeit
+
+from pybtex.database import Entry, Person
+from pybtex.utils import CaseInsensitiveSet, OrderedCaseInsensitiveDict
+
+FIELDS = [
+    ('title', 'Title'), ('journal', 'Journal'), ('year', '2000'),
+    ('Volume', '1'), ('Pages', '1--10'), ('doi', '10.1000/1'),
+]
+
+SETUP = {
+    'dict': 'container = dict(FIELDS)',
+    'OrderedCaseInsensitiveDict': 'container = OrderedCaseInsensitiveDict(FIELDS)',
+    'set': 'container = set(name for name, value in FIELDS)',
+    'CaseInsensitiveSet': 'container = CaseInsensitiveSet(name for name, value in FIELDS)',
+}
+
+BENCHMARKS = [
+    ('getitem', "container['title']", ['dict', 'OrderedCaseInsensitiveDict']),
+    ('getitem, mixed case', "container['Volume']", ['dict', 'OrderedCaseInsensitiveDict']),
+    ('get, missing', "container.get('note')", ['dict', 'OrderedCaseInsensitiveDict']),
+    ('contains', "'year' in container", ['dict', 'OrderedCaseInsensitiveDict', 'set', 'CaseInsensitiveSet']),
+    ('items', "for item in container.items(): pass", ['dict', 'OrderedCaseInsensitiveDict']),
+    ('update', "container.update(FIELDS)", ['dict', 'OrderedCaseInsensitiveDict']),
+    ('copy', "container.copy()", ['dict', 'OrderedCaseInsensitiveDict']),
+]
+
+
+def main(number=200000):
+    namespace = {
+        'FIELDS': FIELDS,
+        'OrderedCaseInsensitiveDict': OrderedCaseInsensitiveDict,
+        'CaseInsensitiveSet': CaseInsensitiveSet,
+    }
+    for name, statement, container_types in BENCHMARKS:
+        baseline = None
+        for container_type in container_types:
+            timer = timeit.Timer(statement, SETUP[container_type], globals=namespace)
+            seconds = min(timer.repeat(repeat=5, number=number))
+            if baseline is None:
+                baseline = seconds
+            print('{0:<20} {1:<28} {2:8.0f} ns {3:6.1f}x'.format(
+                name, container_type, seconds / number * 1e9, seconds / baseline,
+            ))
+
+    entry = Entry('article', fields=FIELDS, persons={'author': [Person('Doe, John')]})
+    for field_name in 'year', 'author', 'note':
+        statement = "try: entry._find_field({0!r})\nexcept KeyError: pass".format(field_name)
+        timer = timeit.Timer(statement, globals={'entry': entry})
+        seconds = min(timer.repeat(repeat=5, number=number))
+        print('{0:<20} {1:<28} {2:8.0f} ns'.format('Entry._find_field', field_name, seconds / number * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Measure the memory used by parsed bibliography data.
+
+Usage: python benchmarks/memory_benchmark.py [number of entries]
+
+A synthetic BibTeX database is parsed with the eager and the lazy parser,
+and into :py:class:`.ColumnarBibliographyData`.
+The memory allocated for the resulting bibliography data is reported per entry,
+along with the time needed to read the years of all entries.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import gc
+import sys
+import timeit
+import tracemalloc
+
+from pybtex.database import Person
+from pybtex.database.input.bibtex import Parser
+
+AUTHORS = [
+    'Knuth, Donald E.', 'Lamport, Leslie', 'de la Vall{\\\'e}e Poussin, Charles',
+    'Dijkstra, Edsger W.', 'Hoare, C. A. R.', 'van Rossum, Guido', 'Wirth, Niklaus',
+]
+
+
+def make_bibliography(n_entries):
+    entries = []
+    for i in range(n_entries):
+        authors = ' and '.join(AUTHORS[(i + j) % len(AUTHORS)] for j in range(1 + i % 3))
+        entries.append(
+            '@Article{{key{0},\n'
+            '  Author = {{{1}}},\n'
+            '  Title = {{A title of the article number {0}}},\n'
+            '  Journal = {{Journal of Benchmarks}},\n'
+            '  Year = {2},\n'
+            '  Volume = {3},\n'
+            '  Pages = {{{0}--{4}}},\n'
+            '  DOI = {{10.1000/{0}}},\n'
+            '}}\n'.format(i, authors, 1970 + i % 50, i % 40, i + 10)
+        )
+    return '\n'.join(entries)
+
+
+def measure(text, **parser_options):
+    Person.name_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    data = Parser(**parser_options).parse_string(text)
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, size
+
+
+def read_years(data):
+    if hasattr(data, 'column'):
+        return data.column('year')
+    return [entry.fields.get('year') for entry in data.entries.values()]
+
+
+def main(n_entries=20000):
+    text = make_bibliography(n_entries)
+    modes = ('eager', {}), ('lazy', {'lazy_entries': True}), ('columnar', {'columnar': True})
+    for name, options in modes:
+        data, size = measure(text, **options)
+        seconds = min(timeit.repeat(lambda: read_years(data), number=1, repeat=5))
+        print('{0:>8}: {1:8.1f} MiB, {2:6.0f} bytes per entry, all years in {3:6.1f} ms'.format(
+            name, size / 1024.0 / 1024, float(size) / len(data.entries), seconds * 1000,
+        ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
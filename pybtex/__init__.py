@@ -50,7 +50,7 @@ class Engine(object):
         bib_filenames = [filename + bib_format.default_suffix for filename in aux_data.data]
         return self.format_from_files(
             bib_filenames,
-            style=aux_data.style,
+            style=style,
             citations=aux_data.citations,
             output_encoding=output_encoding,
             output_filename=base_filename,
@@ -101,6 +101,23 @@ class Engine(object):
         """
         raise NotImplementedError
 
+    async def format_from_files_async(self, *args, executor=None, **kwargs):
+        """
+        Run :py:meth:`~.Engine.format_from_files` in an executor
+        without blocking the event loop.
+
+        :param executor: A :py:class:`concurrent.futures.ThreadPoolExecutor`.
+            If not specified, the default executor of the event loop is used.
+
+        Cancelling the task does not interrupt the executor job,
+        which runs to completion in the background.
+        """
+        import asyncio
+        from functools import partial
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(self.format_from_files, *args, **kwargs))
+
 
 class PybtexEngine(Engine):
     """
@@ -116,6 +133,9 @@ class PybtexEngine(Engine):
         citations=['*'],
         bib_format=None,
         bib_encoding=None,
+        bib_processes=1,
+        use_bib_index=False,
+        bib_cache=None,
         output_backend=None,
         output_encoding=None,
         min_crossrefs=2,
@@ -133,6 +153,12 @@ class PybtexEngine(Engine):
         :param bib_format: The name of the bibliography format. The default
             format is ``bibtex``.
         :param bib_encoding: Encoding of bibliography files.
+        :param bib_processes: The number of worker processes for parsing
+            bibliography files in parallel. If None, use all available CPUs.
+        :param use_bib_index: Parse only the cited entries using sidecar
+            index files (see :py:class:`pybtex.database.input.bibtex.Parser`).
+        :param bib_cache: A directory for caching parsed bibliography files
+            (see :py:class:`pybtex.database.input.BaseParser`).
         :param output_backend: Which output backend to use. The default is ``latex``.
         :param output_encoding: Encoding that will be used by the output backend.
         :param bst_encoding: Encoding of the ``.bst`` file.
@@ -144,14 +170,92 @@ class PybtexEngine(Engine):
             name (``.bbl`` for LaTeX, ``.html`` for HTML, etc.).
         """
 
+        bib_parser = self.make_bib_parser(
+            bib_format, bib_encoding, citations, min_crossrefs, bib_processes, use_bib_index, bib_cache,
+        )
+        bib_data = bib_parser.parse_files(bib_files_or_filenames)
+        return self.format_bib_data(
+            bib_data,
+            style,
+            citations,
+            output_backend=output_backend,
+            output_encoding=output_encoding,
+            min_crossrefs=min_crossrefs,
+            output_filename=output_filename,
+            add_output_suffix=add_output_suffix,
+            **kwargs
+        )
+
+    async def format_from_files_async(
+        self,
+        bib_files_or_filenames,
+        style,
+        citations=['*'],
+        bib_format=None,
+        bib_encoding=None,
+        bib_processes=1,
+        use_bib_index=False,
+        bib_cache=None,
+        min_crossrefs=2,
+        executor=None,
+        **kwargs
+    ):
+        """
+        Like :py:meth:`format_from_files`, but do not block the event loop.
+
+        The bibliography files are parsed with
+        :py:meth:`.BaseParser.parse_files_async`, so cancelling the task
+        stops parsing after the current batch of entries.
+        The bibliography is then formatted in the executor.
+        """
+        import asyncio
+        from functools import partial
+
+        bib_parser = self.make_bib_parser(
+            bib_format, bib_encoding, citations, min_crossrefs, bib_processes, use_bib_index, bib_cache,
+        )
+        bib_data = await bib_parser.parse_files_async(bib_files_or_filenames, executor=executor)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(
+            self.format_bib_data, bib_data, style, citations, min_crossrefs=min_crossrefs, **kwargs
+        ))
+
+    def make_bib_parser(
+        self,
+        bib_format,
+        bib_encoding,
+        citations,
+        min_crossrefs,
+        bib_processes=1,
+        use_bib_index=False,
+        bib_cache=None,
+    ):
         from pybtex.plugin import find_plugin
 
         bib_parser = find_plugin('pybtex.database.input', bib_format)
-        bib_data = bib_parser(
+        return bib_parser(
             encoding=bib_encoding,
             wanted_entries=citations,
             min_crossrefs=min_crossrefs,
-        ).parse_files(bib_files_or_filenames)
+            processes=bib_processes,
+            use_index=use_bib_index,
+            cache=bib_cache,
+        )
+
+    def format_bib_data(
+        self,
+        bib_data,
+        style,
+        citations,
+        output_backend=None,
+        output_encoding=None,
+        min_crossrefs=2,
+        output_filename=None,
+        add_output_suffix=False,
+        **kwargs
+    ):
+        """Format the parsed bibliography data (see :py:meth:`format_from_files`)."""
+        from pybtex.plugin import find_plugin
 
         style_cls = find_plugin('pybtex.style.formatting', style)
         style = style_cls(
@@ -55,6 +55,12 @@ It is also possible to define bibliography formatting styles in Python.
             ),
             standard_option('min_crossrefs'),
             standard_option('bib_format'),
+            standard_option('bib_cache'),
+            make_option(
+                '--bst-cache', dest='bst_cache',
+                help='cache parsed .bst styles in DIRECTORY',
+                metavar='DIRECTORY',
+            ),
             standard_option('output_backend'),
             standard_option('style'),
             make_option(
@@ -63,6 +69,17 @@ It is also possible to define bibliography formatting styles in Python.
                 metavar='LANGUAGE',
             ),
         )),
+        ('BibTeX style options', (
+            make_option(
+                '--profile-bst', dest='profile_bst', action='store_true',
+                help='print the execution statistics of the .bst style',
+            ),
+            make_option(
+                '--profile-bst-output', dest='profile_bst_output',
+                help='write the execution statistics of the .bst style to FILENAME in pstats format',
+                metavar='FILENAME',
+            ),
+        )),
         ('Pythonic style options', (
             standard_option('label_style'),
             standard_option('name_style'),
@@ -108,11 +125,26 @@ It is also possible to define bibliography formatting styles in Python.
             if not options[encoding_option]:
                 options[encoding_option] = encoding
 
+        profile_bst = options.pop('profile_bst')
+        profile_bst_output = options.pop('profile_bst_output')
+        profiler = None
+        if profile_bst or profile_bst_output:
+            if style_language != 'bibtex':
+                self.opt_parser.error('profiling is only supported by the BibTeX style engine (-l bibtex)')
+            from pybtex.bibtex.profiler import Profiler
+            profiler = options['profiler'] = Profiler()
+
         ext = path.splitext(filename)[1]
         if ext != '.aux':
             filename = path.extsep.join([filename, 'aux'])
         engine.make_bibliography(filename, **options)
 
+        if profile_bst:
+            import pybtex.io
+            pybtex.io.stderr.write(profiler.format_report())
+        if profile_bst_output:
+            profiler.dump_stats(profile_bst_output)
+
 main = PybtexCommandLine()
 
 if __name__ == '__main__':
@@ -43,8 +43,14 @@ class BibTeXEngine(Engine):
         citations=['*'],
         bib_format=None,
         bib_encoding=None,
+        bib_processes=1,
+        use_bib_index=False,
+        bib_cache=None,
         output_encoding=None,
         bst_encoding=None,
+        bst_cache=None,
+        bst_processes=1,
+        profiler=None,
         min_crossrefs=2,
         output_filename=None,
         add_output_suffix=False,
@@ -54,14 +60,32 @@ class BibTeXEngine(Engine):
         Read the bigliography data from the given files and produce a formated
         bibliography.
 
-        :param bib_files_or_filenames: A list of file names or file objects.
-        :param style: The name of the formatting style.
+        :param bib_files_or_filenames: A list of file names or file objects,
+            or an already parsed :py:class:`.BibliographyData`
+            (such as a view returned by :py:meth:`.BibliographyData.view`).
+        :param style: The name of the formatting style,
+            or the file name of a Python module generated by ``pybtex-bst2py``
+            (see :py:mod:`pybtex.bibtex.bst2py`).
         :param citations: A list of citation keys.
         :param bib_format: The name of the bibliography format. The default
             format is ``bibtex``.
         :param bib_encoding: Encoding of bibliography files.
+        :param bib_processes: The number of worker processes for parsing
+            bibliography files in parallel. If None, use all available CPUs.
+        :param use_bib_index: Parse only the cited entries using sidecar
+            index files (see :py:class:`pybtex.database.input.bibtex.Parser`).
+        :param bib_cache: A directory for caching parsed bibliography files
+            (see :py:class:`pybtex.database.input.BaseParser`).
         :param output_encoding: Encoding that will be used by the output backend.
         :param bst_encoding: Encoding of the ``.bst`` file.
+        :param bst_cache: A directory for caching parsed ``.bst`` files
+            (see :py:func:`pybtex.bibtex.bst.parse_file`).
+        :param bst_processes: The number of worker processes for executing
+            ``ITERATE`` and ``REVERSE`` commands in parallel, if the style allows it
+            (see :py:meth:`.Interpreter.iterate_parallel`).
+            If None, use all available CPUs.
+        :param profiler: A :py:class:`pybtex.bibtex.profiler.Profiler`
+            for collecting execution statistics of the style.
         :param min_crossrefs: Include cross-referenced entries after this many
             crossrefs. See BibTeX manual for details.
         :param output_filename: If ``None``, the result will be returned as a
@@ -76,9 +100,15 @@ class BibTeXEngine(Engine):
 
         if bib_format is None:
             from pybtex.database.input.bibtex import Parser as bib_format
-        bst_filename = style + path.extsep + 'bst'
-        bst_script = bst.parse_file(bst_filename, bst_encoding)
-        interpreter = Interpreter(bib_format, bib_encoding)
+        if path.splitext(style)[1] == path.extsep + 'py':
+            from pybtex.bibtex.bst2py import load_module
+            bst_script = load_module(style)
+        else:
+            bst_filename = style + path.extsep + 'bst'
+            bst_script = bst.parse_file(bst_filename, bst_encoding, cache=bst_cache)
+        interpreter = Interpreter(
+            bib_format, bib_encoding, bib_processes, use_bib_index, bib_cache, profiler, bst_processes,
+        )
         bbl_data = interpreter.run(bst_script, citations, bib_files_or_filenames, min_crossrefs=min_crossrefs)
 
         if add_output_suffix:
@@ -21,15 +21,20 @@
 
 from __future__ import unicode_literals
 
+import io
+import os
 import re
 
 import pybtex.io
 from pybtex.bibtex.interpreter import (
     FunctionLiteral, Identifier, Integer, QuotedVar, String
 )
+from pybtex.database.input.cache import ParseCache, make_cache_key
+from pybtex.database.input.index import get_file_hash
 from pybtex.scanner import (
     Literal, Pattern, PybtexSyntaxError, Scanner, TokenRequired
 )
+from pybtex.utils import BoundedCache
 
 
 #ParserElement.enablePackrat()
@@ -95,6 +100,7 @@ class BstParser(Scanner):
     STRING = Pattern('"[^\"]*"', 'string')
     INTEGER = Pattern(r'#-?\d+', 'integer')
     NAME = Pattern(r'[^#\"\{\}\s]+', 'name')
+    lazy_lineno = True
 
     COMMANDS = {
         'ENTRY': 3,
@@ -149,9 +155,49 @@ class BstParser(Scanner):
             yield list(self.parse_group())
 
 
-def parse_file(filename, encoding=None):
-    with pybtex.io.open_unicode(filename, encoding=encoding) as bst_file:
-        return parse_stream(bst_file, filename)
+script_cache = BoundedCache(capacity=32)
+"""Parsed .bst files, keyed by the absolute file name, the encoding,
+and the size and modification time of the file."""
+
+
+def parse_file(filename, encoding=None, cache=None):
+    """Parse a .bst file and return the list of commands.
+
+    The parsed file is kept in memory (see :py:data:`script_cache`)
+    and reused while the file has the same size and modification time.
+
+    :param cache: A :py:class:`.ParseCache` or a cache directory.
+        If set, the parsed file is also stored on disk,
+        so that other processes do not have to parse it again.
+    """
+    if encoding is None:
+        encoding = pybtex.io.get_default_encoding()
+    if cache is not None and not isinstance(cache, ParseCache):
+        cache = ParseCache(cache)
+
+    with pybtex.io.open_raw(filename) as bst_file:
+        stat = os.fstat(bst_file.fileno())
+        abs_filename = os.path.abspath(bst_file.name)
+        memory_key = abs_filename, encoding, stat.st_size, stat.st_mtime_ns
+        bst_script = script_cache.get(memory_key)
+        if bst_script is not None:
+            return bst_script
+
+        if cache is not None:
+            key = make_cache_key(abs_filename, 'bst', encoding)
+            bst_script = cache.load(
+                key, stat.st_size, stat.st_mtime_ns, lambda: get_file_hash(bst_file.read())
+            )
+        if bst_script is None:
+            bst_file.seek(0)
+            data = bst_file.read()
+            with io.TextIOWrapper(io.BytesIO(data), encoding=encoding) as stream:
+                bst_script = list(parse_stream(stream, filename))
+            if cache is not None:
+                cache.store(key, stat.st_size, stat.st_mtime_ns, get_file_hash(data), bst_script)
+
+    script_cache.add(memory_key, bst_script)
+    return bst_script
 
 
 def parse_stream(stream, filename='<INPUT>'):
@@ -0,0 +1,542 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+r"""Translate .bst styles into Python modules.
+
+Each FUNCTION of the style becomes a Python function. Values are kept
+in local variables instead of the interpreter stack as long as
+the stack depth is known, and ``if$`` and ``while$`` with literal function
+arguments become Python ``if`` statements and ``while`` loops.
+The other commands are kept as they are, and the module is run by the
+usual :py:class:`.Interpreter`, so the output is the same as with the .bst file.
+
+>>> from pybtex.bibtex import bst
+>>> script = bst.parse_string('''
+...     STRINGS { s }
+...     FUNCTION {hello}
+...     { "world" 's :=
+...       "Hello, " s * empty$
+...         { "nothing" }
+...         { "Hello, " s * }
+...       if$
+...       write$ newline$
+...     }
+...     EXECUTE {hello}
+... ''')
+>>> print(transpile(script))  # doctest: +ELLIPSIS
+# Translated from a .bst style by pybtex-bst2py.
+...
+def make_hello(i, resolve):
+    v_s = resolve('s')
+    v_s_set = v_s.set
+    v_s_value = v_s.value
+    output = i.output
+    newline = i.newline
+<BLANKLINE>
+    def f_hello(i):
+        v_s_set('world')
+        t1 = v_s_value()
+        t2 = 'Hello, ' + t1
+        t3 = 0 if t2 and not t2.isspace() else 1
+        if t3 > 0:
+            m1 = 'nothing'
+        else:
+            t4 = v_s_value()
+            t5 = 'Hello, ' + t4
+            m1 = t5
+        output(m1)
+        newline()
+<BLANKLINE>
+    return f_hello
+<BLANKLINE>
+<BLANKLINE>
+SCRIPT = [
+    ['STRINGS', [Identifier('s')]],
+    ['FUNCTION', [Identifier('hello')], make_hello],
+    ['EXECUTE', [Identifier('hello')]],
+]
+<BLANKLINE>
+
+.. versionadded:: 0.26
+"""
+
+from __future__ import unicode_literals
+
+import importlib.util
+import keyword
+import re
+from os import path
+
+from pybtex.bibtex.builtins import builtins
+from pybtex.bibtex.interpreter import FunctionLiteral, Identifier, Integer, QuotedVar, String
+from pybtex.exceptions import PybtexError
+
+HEADER = '''\
+# Translated from a .bst style by pybtex-bst2py.
+
+from pybtex.bibtex import utils
+from pybtex.bibtex.builtins import _change_case, _format_name, print_warning
+from pybtex.bibtex.interpreter import (
+    FunctionLiteral, Identifier, Integer, MissingField, PythonFunction, QuotedVar, String,
+)
+'''
+
+# builtins translated to Python expressions:
+# name -> (number of arguments, expression),
+# {0} is the argument from the top of the stack
+EXPRESSIONS = {
+    '>': (2, '1 if {1} > {0} else 0'),
+    '<': (2, '1 if {1} < {0} else 0'),
+    '=': (2, '1 if {1} == {0} else 0'),
+    '+': (2, '{1} + {0}'),
+    '-': (2, '{1} - {0}'),
+    '*': (2, '{1} + {0}'),
+    'add.period$': (1, "{0} + '.' if {0} and not {0}.rstrip('}}')[-1] in '.?!' else {0}"),
+    'change.case$': (2, '_change_case({1}, {0})'),
+    'cite$': (0, 'i.current_entry_key'),
+    'empty$': (1, '0 if {0} and not {0}.isspace() else 1'),
+    'format.name$': (3, '_format_name({2}, {1}, {0})'),
+    'int.to.str$': (1, 'str({0})'),
+    'missing$': (1, '1 if isinstance({0}, MissingField) else 0'),
+    'num.names$': (1, 'len(utils.split_name_list({0}))'),
+    'preamble$': (0, 'i.bib_data.preamble'),
+    'purify$': (1, 'utils.bibtex_purify({0})'),
+    'quote$': (0, "'\"'"),
+    'substring$': (3, 'utils.bibtex_substring({2}, {1}, {0})'),
+    'text.length$': (1, 'utils.bibtex_len({0})'),
+    'text.prefix$': (2, 'utils.bibtex_prefix({1}, {0})'),
+    'type$': (0, 'i.current_entry.type'),
+    'width$': (1, 'utils.bibtex_width({0})'),
+}
+
+# builtins translated to Python statements:
+# name -> (number of arguments, statement, bindings used by the statement)
+STATEMENTS = {
+    'newline$': (0, 'newline()', [('newline', 'i.newline')]),
+    'warning$': (1, 'print_warning({0})', []),
+    'write$': (1, 'output({0})', [('output', 'i.output')]),
+}
+
+# variables defined by the interpreter itself
+PREDEFINED_VARIABLES = 'crossref', 'sort.key$', 'global.max$', 'entry.max$'
+
+
+class StackItem(object):
+    """A value on the stack known at translation time."""
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class Value(StackItem):
+    """A constant or a local variable."""
+
+
+class Quoted(StackItem):
+    """A function or a variable pushed with a quote."""
+
+    def __init__(self, expr, name):
+        super(Quoted, self).__init__(expr)
+        self.name = name
+
+
+class Literal(StackItem):
+    """A function literal."""
+
+    def __init__(self, body):
+        super(Literal, self).__init__(None)
+        self.body = body
+
+
+def make_python_name(name):
+    python_name = re.sub(r'\W', '_', name.replace('.', '_').replace('$', ''), flags=re.ASCII)
+    if not python_name or python_name[0].isdigit() or keyword.iskeyword(python_name):
+        python_name = '_' + python_name
+    return python_name
+
+
+class Module(object):
+    """A Python module being generated."""
+
+    def __init__(self, script):
+        self.script = script
+        self.kinds = {}
+        self.factories = []
+        self.factory_names = set()
+        for name in builtins:
+            self.kinds[name] = 'builtin'
+        for name in PREDEFINED_VARIABLES:
+            self.kinds[name] = 'variable'
+        for command in script:
+            command_name = command[0].upper()
+            if command_name == 'ENTRY':
+                for identifiers in command[1:]:
+                    self.declare(identifiers, 'variable')
+            elif command_name in ('INTEGERS', 'STRINGS'):
+                self.declare(command[1], 'variable')
+            elif command_name == 'FUNCTION':
+                self.declare(command[1], 'function')
+
+    def declare(self, identifiers, kind):
+        for identifier in identifiers:
+            self.kinds.setdefault(identifier.value().casefold(), kind)
+
+    def get_kind(self, name):
+        return self.kinds.get(name.casefold())
+
+    def make_factory_name(self, name):
+        factory_name = 'make_' + make_python_name(name)
+        unique_name = factory_name
+        number = 1
+        while unique_name in self.factory_names:
+            number += 1
+            unique_name = '{0}_{1}'.format(factory_name, number)
+        self.factory_names.add(unique_name)
+        return unique_name
+
+    def add_function(self, name, body):
+        """Translate a function body and return the name of its factory."""
+        factory_name = self.make_factory_name(name)
+        translator = FunctionTranslator(self, name, body)
+        # reserve the position before translating the nested literals
+        position = len(self.factories)
+        self.factories.append(None)
+        self.factories[position] = translator.make_factory(factory_name)
+        return factory_name
+
+    def format_command(self, command):
+        command_name = command[0]
+        args = [repr(command_name)]
+        if command_name.upper() == 'FUNCTION':
+            name = command[1][0].value()
+            args.append(self.format_list(command[1]))
+            args.append(self.add_function(name, command[2]))
+        else:
+            args.extend(self.format_list(arg) for arg in command[1:])
+        return '[{0}]'.format(', '.join(args))
+
+    def format_list(self, items):
+        return '[{0}]'.format(', '.join(self.format_item(item) for item in items))
+
+    def format_item(self, item):
+        if isinstance(item, FunctionLiteral):
+            return 'FunctionLiteral({0})'.format(self.format_list(item.body))
+        return repr(item)
+
+    def generate(self):
+        commands = [self.format_command(command) for command in self.script]
+        parts = [HEADER]
+        parts.extend(self.factories)
+        script_lines = ['SCRIPT = [']
+        script_lines.extend('    {0},'.format(command) for command in commands)
+        script_lines.append(']')
+        parts.append('\n'.join(script_lines) + '\n')
+        return '\n\n'.join(parts)
+
+
+class FunctionTranslator(object):
+    """Translate a function body into Python code."""
+
+    def __init__(self, module, name, body):
+        self.module = module
+        self.name = name
+        self.body = body
+        self.bindings = {}
+        self.binding_lines = []
+        # case-folded .bst name -> Python name
+        self.object_names = {}
+        self.temp_count = 0
+        self.merge_count = 0
+        self.lines = []
+        self.indent = 2
+        self.stack = []
+
+    def bind(self, python_name, expr):
+        """Bind a name once, when the function is made."""
+        if python_name not in self.bindings:
+            self.bindings[python_name] = expr
+            self.binding_lines.append('    {0} = {1}'.format(python_name, expr))
+        return python_name
+
+    def bind_object(self, name):
+        python_name = self.object_names.get(name.casefold())
+        if python_name is None:
+            python_name = base_name = 'v_' + make_python_name(name)
+            number = 1
+            while python_name in self.bindings:
+                number += 1
+                python_name = '{0}_{1}'.format(base_name, number)
+            self.object_names[name.casefold()] = python_name
+        return self.bind(python_name, 'resolve({0!r})'.format(name))
+
+    def bind_method(self, name, method):
+        obj = self.bind_object(name)
+        return self.bind('{0}_{1}'.format(obj, method), '{0}.{1}'.format(obj, method))
+
+    def emit(self, line):
+        self.lines.append('    ' * self.indent + line)
+
+    def new_temp(self):
+        self.temp_count += 1
+        return 't{0}'.format(self.temp_count)
+
+    def new_merge(self):
+        self.merge_count += 1
+        return 'm{0}'.format(self.merge_count)
+
+    def materialize(self, item):
+        """Return the expression for the value of the stack item."""
+        if isinstance(item, Literal):
+            factory_name = self.module.add_function(self.name, item.body)
+            item.expr = self.bind(factory_name.replace('make_', 'literal_', 1), 'PythonFunction({0})'.format(factory_name))
+        return item.expr
+
+    def flush(self):
+        """Move the values of the stack items to the interpreter stack."""
+        if not self.stack:
+            return
+        exprs = [self.materialize(item) for item in self.stack]
+        self.stack = []
+        self.bind('stack', 'i.stack')
+        if len(exprs) == 1:
+            self.emit('stack.append({0})'.format(exprs[0]))
+        else:
+            self.emit('stack.extend(({0}))'.format(', '.join(exprs)))
+
+    def pop_item(self):
+        if self.stack:
+            return self.stack.pop()
+        self.bind('pop', 'i.pop')
+        temp = self.new_temp()
+        self.emit('{0} = pop()'.format(temp))
+        return Value(temp)
+
+    def pop_value(self):
+        return self.materialize(self.pop_item())
+
+    def push_value(self, expr):
+        temp = self.new_temp()
+        self.emit('{0} = {1}'.format(temp, expr))
+        self.stack.append(Value(temp))
+
+    def translate_body(self, body):
+        for element in body:
+            self.translate_element(element)
+
+    def translate_element(self, element):
+        if isinstance(element, FunctionLiteral):
+            self.stack.append(Literal(element.body))
+        elif isinstance(element, QuotedVar):
+            name = element.value()
+            self.stack.append(Quoted(self.bind_object(name), name))
+        elif isinstance(element, Identifier):
+            self.translate_identifier(element.value())
+        elif isinstance(element, (Integer, String)):
+            self.stack.append(Value(repr(element.value())))
+        else:
+            raise ValueError('unexpected element in function body: {0!r}'.format(element))
+
+    def translate_identifier(self, name):
+        kind = self.module.get_kind(name)
+        builtin_name = name.lower() if kind == 'builtin' else None
+        if builtin_name in EXPRESSIONS:
+            num_args, template = EXPRESSIONS[builtin_name]
+            args = [self.pop_value() for n in range(num_args)]
+            self.push_value(template.format(*args))
+        elif builtin_name in STATEMENTS:
+            num_args, template, bindings = STATEMENTS[builtin_name]
+            args = [self.pop_value() for n in range(num_args)]
+            for python_name, expr in bindings:
+                self.bind(python_name, expr)
+            self.emit(template.format(*args))
+        elif builtin_name == 'skip$':
+            pass
+        elif builtin_name == 'pop$':
+            if self.stack:
+                self.stack.pop()
+            else:
+                self.bind('pop', 'i.pop')
+                self.emit('pop()')
+        elif builtin_name == 'duplicate$':
+            item = self.pop_item()
+            self.stack.extend([item, item])
+        elif builtin_name == 'swap$':
+            item1 = self.pop_item()
+            item2 = self.pop_item()
+            self.stack.extend([item1, item2])
+        elif builtin_name == ':=':
+            self.translate_assignment()
+        elif builtin_name == 'if$' and self.has_static_functions(2):
+            self.translate_if()
+        elif builtin_name == 'while$' and self.has_static_functions(2):
+            self.translate_while()
+        elif kind == 'variable':
+            self.push_value('{0}()'.format(self.bind_method(name, 'value')))
+        else:
+            self.flush()
+            self.emit('{0}(i)'.format(self.bind_method(name, 'execute')))
+
+    def translate_assignment(self):
+        var = self.pop_item()
+        value = self.pop_value()
+        if isinstance(var, Quoted):
+            self.emit('{0}({1})'.format(self.bind_method(var.name, 'set'), value))
+        else:
+            self.emit('{0}.set({1})'.format(self.materialize(var), value))
+
+    def has_static_functions(self, number):
+        return len(self.stack) >= number and all(
+            isinstance(item, (Literal, Quoted)) for item in self.stack[-number:]
+        )
+
+    def translate_function_item(self, item):
+        if isinstance(item, Literal):
+            self.translate_body(item.body)
+        else:
+            self.translate_identifier(item.name)
+
+    def translate_branch(self, item, stack):
+        lines = self.lines
+        self.lines = []
+        self.stack = list(stack)
+        self.indent += 1
+        self.translate_function_item(item)
+        self.indent -= 1
+        branch_lines, self.lines = self.lines, lines
+        return branch_lines, self.stack
+
+    def translate_if(self):
+        else_item = self.stack.pop()
+        then_item = self.stack.pop()
+        condition = self.pop_value()
+        stack = self.stack
+        then_lines, then_stack = self.translate_branch(then_item, stack)
+        else_lines, else_stack = self.translate_branch(else_item, stack)
+
+        if len(then_stack) == len(else_stack):
+            merged_stack = []
+            then_assignments = []
+            else_assignments = []
+            for then_stack_item, else_stack_item in zip(then_stack, else_stack):
+                if then_stack_item is else_stack_item:
+                    merged_stack.append(then_stack_item)
+                    continue
+                merged = self.new_merge()
+                then_assignments.append('{0} = {1}'.format(merged, self.materialize(then_stack_item)))
+                else_assignments.append('{0} = {1}'.format(merged, self.materialize(else_stack_item)))
+                merged_stack.append(Value(merged))
+            then_lines.extend('    ' * (self.indent + 1) + line for line in then_assignments)
+            else_lines.extend('    ' * (self.indent + 1) + line for line in else_assignments)
+        else:
+            then_lines.extend(self.get_flush_lines(then_stack))
+            else_lines.extend(self.get_flush_lines(else_stack))
+            merged_stack = []
+
+        self.emit('if {0} > 0:'.format(condition))
+        self.extend_block(then_lines)
+        if else_lines:
+            self.emit('else:')
+            self.extend_block(else_lines)
+        self.stack = merged_stack
+
+    def get_flush_lines(self, stack):
+        lines = self.lines
+        self.lines = []
+        self.stack = stack
+        self.indent += 1
+        self.flush()
+        self.indent -= 1
+        flush_lines, self.lines = self.lines, lines
+        return flush_lines
+
+    def extend_block(self, lines):
+        if lines:
+            self.lines.extend(lines)
+        else:
+            self.emit('    pass')
+
+    def translate_while(self):
+        body_item = self.stack.pop()
+        condition_item = self.stack.pop()
+        self.flush()
+        self.emit('while True:')
+        self.indent += 1
+        self.translate_function_item(condition_item)
+        condition = self.pop_value()
+        self.flush()
+        self.emit('if {0} <= 0:'.format(condition))
+        self.emit('    break')
+        self.translate_function_item(body_item)
+        self.flush()
+        self.indent -= 1
+
+    def make_factory(self, factory_name):
+        self.translate_body(self.body)
+        self.flush()
+        function_name = 'f_' + make_python_name(self.name)
+        lines = ['def {0}(i, resolve):'.format(factory_name)]
+        lines.extend(self.binding_lines)
+        if self.binding_lines:
+            lines.append('')
+        lines.append('    def {0}(i):'.format(function_name))
+        lines.extend(self.lines or ['        pass'])
+        lines.append('')
+        lines.append('    return {0}'.format(function_name))
+        return '\n'.join(lines) + '\n'
+
+
+def transpile(bst_script):
+    """Translate a parsed .bst script and return the source code of a Python module.
+
+    The module defines ``SCRIPT`` that can be run by :py:class:`.Interpreter`
+    instead of the parsed script.
+    """
+    return Module(list(bst_script)).generate()
+
+
+def transpile_file(filename, output_filename=None, encoding=None):
+    """Translate a .bst file into a Python module.
+
+    By default, the module is written next to the .bst file,
+    with a ``.py`` suffix instead of ``.bst``.
+    Return the name of the module file.
+    """
+    from pybtex.bibtex import bst
+    import pybtex.io
+
+    if output_filename is None:
+        output_filename = path.splitext(filename)[0] + '.py'
+    source = transpile(bst.parse_file(filename, encoding))
+    with pybtex.io.open_unicode(output_filename, 'w', encoding='utf-8') as output_file:
+        output_file.write(source)
+    return output_filename
+
+
+def load_module(filename):
+    """Import a Python module generated by :py:func:`transpile_file` and return its ``SCRIPT``."""
+    module_name = '_pybtex_bst_' + make_python_name(path.splitext(path.basename(filename))[0])
+    spec = importlib.util.spec_from_file_location(module_name, filename)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except EnvironmentError as error:
+        raise PybtexError('unable to open %s. %s' % (filename, error.strerror))
+    return module.SCRIPT
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from __future__ import unicode_literals
+
+from pybtex.cmdline import CommandLine, make_option, standard_option
+
+
+class PybtexBst2PyCommandLine(CommandLine):
+    prog = 'pybtex-bst2py'
+    args = '[options] style.bst'
+    description = 'translate a BibTeX style into a Python module'
+    long_description = """
+
+pybtex-bst2py translates a BibTeX .bst style into a Python module
+that produces the same output faster. The module can be used
+instead of the style with pybtex --style=module.py.
+
+    """.strip()
+
+    num_args = 1
+
+    options = (
+        (None, (
+            standard_option('strict'),
+            make_option(
+                '-o', '--output', dest='output_filename',
+                help='output file name (default: the style name with a .py suffix)',
+                metavar='FILENAME',
+            ),
+        )),
+        ('Encoding options', (
+            make_option('--bst-encoding', dest='bst_encoding', metavar='ENCODING'),
+        )),
+    )
+
+    def run(self, filename, output_filename, bst_encoding, **options):
+        from pybtex.bibtex.bst2py import transpile_file
+        transpile_file(filename, output_filename, encoding=bst_encoding)
+
+
+main = PybtexBst2PyCommandLine()
+
+if __name__ == '__main__':
+    main()
@@ -42,10 +42,13 @@ def print_warning(msg):
 class Builtin(object):
     def __init__(self, f):
         self.f = f
-    def execute(self, interpreter):
-        self.f(interpreter)
+        # call the function directly, without an extra method call
+        self.execute = f
     def __repr__(self):
         return '<builtin %s>' % self.f.__name__
+    def __reduce__(self):
+        # pickle by reference: the module attribute is this object, not the function
+        return self.f.__name__
 
 builtins = {}
 
@@ -130,19 +133,22 @@ def call_type(i):
             return
     func.execute(i)
 
-@builtin('change.case$')
-def change_case(i):
-
-    mode = i.pop()
-    string = i.pop()
-
+def _change_case(string, mode):
     if not mode:
         raise BibTeXError('empty mode string passed to change.case$')
     mode_letter = mode[0].lower()
     if not mode_letter in ('l', 'u', 't'):
         raise BibTeXError('incorrect change.case$ mode: %s' % mode)
 
-    i.push(utils.change_case(string, mode_letter))
+    return utils.change_case(string, mode_letter)
+
+
+@builtin('change.case$')
+def change_case(i):
+
+    mode = i.pop()
+    string = i.pop()
+    i.push(_change_case(string, mode))
 
 @builtin('chr.to.int$')
 def chr_to_int(i):
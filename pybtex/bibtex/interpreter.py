@@ -21,11 +21,19 @@
 
 from __future__ import print_function, unicode_literals
 
+import os
+import pickle
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-from pybtex.bibtex.builtins import builtins, print_warning
+import pybtex.errors
+from pybtex.bibtex.builtins import Builtin, builtins, print_warning
 from pybtex.bibtex.exceptions import BibTeXError
 from pybtex.bibtex.utils import wrap
+from pybtex.database import BibliographyData
+from pybtex.database.input import _pack_error, _unpack_error
+from pybtex.errors import report_error
 from pybtex.utils import CaseInsensitiveDict
 
 
@@ -53,6 +61,9 @@ class Variable(object):
             raise ValueError('Invalid value for BibTeX %s: %s' % (self.__class__.__name__, value))
     def execute(self, interpreter):
         interpreter.push(self.value())
+    def compile(self, interpreter):
+        # only literals are compiled, and their values never change
+        return interpreter.stack.append, self._value
     def value(self):
         return self._value
 
@@ -140,6 +151,13 @@ class Identifier(Variable):
         except KeyError:
             raise BibTeXError('can not execute undefined function %s' % self)
         f.execute(interpreter)
+    def compile(self, interpreter):
+        try:
+            f = interpreter.vars[self.value()]
+        except KeyError:
+            # may be defined later, report the error only if executed
+            return self.execute, interpreter
+        return f.execute, interpreter
 
 
 class QuotedVar(Variable):
@@ -150,13 +168,28 @@ class QuotedVar(Variable):
         except KeyError:
             raise BibTeXError('can not push undefined variable %s' % self.value())
         interpreter.push(var)
+    def compile(self, interpreter):
+        try:
+            var = interpreter.vars[self.value()]
+        except KeyError:
+            return self.execute, interpreter
+        return interpreter.stack.append, var
 
 
 class Function(object):
+    """A function defined in a .bst file.
+
+    When executed for the first time, the function body is compiled
+    into a sequence of ``(callable, argument)`` pairs, with all identifiers
+    resolved to the functions and variables they refer to. The body is compiled
+    again if the variables of the interpreter change.
+    """
+
     def __init__(self, body=None):
         if body is None:
             body = []
         self.body = body
+        self._code = None
 
     def __repr__(self):
         return u'{0}({1})'.format(type(self).__name__, repr(self.body))
@@ -164,23 +197,108 @@ class Function(object):
     def __eq__(self, other):
         return type(self) == type(other) and self.body == other.body
 
+    def __getstate__(self):
+        # the compiled code refers to the interpreter
+        return {'body': self.body}
+
+    def __setstate__(self, state):
+        self.body = state['body']
+        self._code = None
+
+    def compile(self, interpreter):
+        return [element.compile(interpreter) for element in self.body]
+
     def execute(self, interpreter):
 #        print 'executing function', self.body
-        for element in self.body:
-            element.execute(interpreter)
+        code = self._code
+        if code is None or code[0] is not interpreter or code[1] != interpreter.vars_version:
+            code = self._code = interpreter, interpreter.vars_version, self.compile(interpreter)
+        for f, arg in code[2]:
+            f(arg)
+
+
+class PythonFunction(Function):
+    """A .bst function translated to Python by :py:mod:`pybtex.bibtex.bst2py`.
+
+    ``make(interpreter, resolve)`` returns a Python function executing the body.
+    It is called on the first execution, and again if the variables of the interpreter change.
+    """
+
+    def __init__(self, make):
+        super(PythonFunction, self).__init__()
+        self.make = make
+
+    def __repr__(self):
+        return u'{0}({1})'.format(type(self).__name__, self.make.__name__)
+
+    def __eq__(self, other):
+        return type(self) == type(other) and self.make == other.make
+
+    def __getstate__(self):
+        return {'make': self.make}
+
+    def __setstate__(self, state):
+        self.make = state['make']
+        self.body = []
+        self._code = None
+
+    def compile(self, interpreter):
+        return [(self.make(interpreter, interpreter.resolve), interpreter)]
+
+
+class UndefinedVariable(object):
+    """A placeholder for an identifier that is not defined yet."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def execute(self, interpreter):
+        Identifier(self.name).execute(interpreter)
+
+    def value(self):
+        raise BibTeXError('can not execute undefined function %s' % Identifier(self.name))
+
+    def set(self, value):
+        raise BibTeXError('can not push undefined variable %s' % self.name)
 
 
 class FunctionLiteral(Function):
     def execute(self, interpreter):
         interpreter.push(Function(self.body))
+    def compile(self, interpreter):
+        # the same function object is pushed each time, so it is compiled only once
+        return interpreter.stack.append, Function(self.body)
 
 
 class Interpreter(object):
-    def __init__(self, bib_format, bib_encoding):
+    min_parallel_entries = 256
+    """ITERATE and REVERSE are run in parallel only for at least this many entries."""
+
+    # builtins printing the stack to stdout
+    non_local_builtins = builtins['stack$'], builtins['top$']
+
+    def __init__(
+        self, bib_format, bib_encoding, bib_processes=1, use_bib_index=False, bib_cache=None, profiler=None,
+        processes=1,
+    ):
         self.bib_format = bib_format
         self.bib_encoding = bib_encoding
+        self.bib_processes = bib_processes
+        self.use_bib_index = use_bib_index
+        self.bib_cache = bib_cache
+        # a pybtex.bibtex.profiler.Profiler or None
+        self.profiler = profiler
+        self.processes = processes if processes is not None else os.cpu_count()
+        # functions that could not be executed in parallel
+        self.sequential_functions = set()
         self.stack = []
-        self.vars = CaseInsensitiveDict(builtins)
+        if profiler is None:
+            self.vars = CaseInsensitiveDict(builtins)
+        else:
+            self.vars = CaseInsensitiveDict(
+                (name, profiler.wrap(name, builtin)) for name, builtin in builtins.items()
+            )
+        self.vars_version = 0
         self.add_variable('global.max$', Integer(20000))  # constants taken from
         self.add_variable('entry.max$', Integer(250))     # BibTeX 0.99d (TeX Live 2012)
         self.add_variable('sort.key$', EntryString(self, 'sort.key$'))
@@ -189,6 +307,23 @@ class Interpreter(object):
         self.output_lines = []
         self.entry_vars = defaultdict(dict)
 
+    def __getstate__(self):
+        # only the state needed by ITERATE workers (see iterate_parallel)
+        state = dict(self.__dict__)
+        for name in (
+            'bst_script', 'bib_files', 'output_buffer', 'output_lines', 'entry_vars', 'profiler',
+            'current_entry', 'current_entry_key', 'current_entry_vars',
+        ):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.profiler = None
+        self.output_buffer = []
+        self.output_lines = []
+        self.entry_vars = defaultdict(dict)
+
     def push(self, value):
 #        print 'push <%s>' % value
         self.stack.append(value)
@@ -205,10 +340,20 @@ class Interpreter(object):
     def get_token(self):
         return next(self.bst_script)
 
+    def resolve(self, name):
+        """Return the function or variable with the given name,
+        or an :py:class:`UndefinedVariable` if there is none.
+        """
+        try:
+            return self.vars[name]
+        except KeyError:
+            return UndefinedVariable(name)
+
     def add_variable(self, name, value):
         if name in self.vars:
             raise BibTeXError('variable "{0}" already declared as {1}'.format(name, type(value).__name__))
         self.vars[name] = value
+        self.vars_version += 1
 
     def output(self, string):
         self.output_buffer.append(string)
@@ -256,26 +401,151 @@ class Interpreter(object):
 
     def command_function(self, name_, body):
         name = name_[0].value()
-        self.add_variable(name, Function(body))
+        if callable(body):
+            # translated by pybtex.bibtex.bst2py
+            function = PythonFunction(body)
+        else:
+            function = Function(body)
+        if self.profiler is not None:
+            function = self.profiler.wrap(name, function)
+        self.add_variable(name, function)
 
     def command_integers(self, identifiers):
 #        print 'INTEGERS'
         for identifier in identifiers:
             self.vars[identifier.value()] = Integer()
+        self.vars_version += 1
 
     def command_iterate(self, function_group):
         function = function_group[0].value()
         self._iterate(function, self.citations)
 
     def _iterate(self, function, citations):
+        if self.processes > 1 and self.profiler is None:
+            citations = list(citations)
+            if (
+                len(citations) >= self.min_parallel_entries
+                and len(set(citations)) == len(citations)
+                and not self.stack
+                and function not in self.sequential_functions
+                and self.is_entry_local(function, citations)
+                and self.iterate_parallel(function, citations)
+            ):
+                return
         f = self.vars[function]
         for key in citations:
             self.current_entry_key = key
             self.current_entry = self.bib_data.entries[key]
             self.current_entry_vars = self.entry_vars[key]
-            f.execute(self)
+            if self.profiler is None:
+                f.execute(self)
+            else:
+                self.profiler.execute_entry(f, self)
         self.currentEntry = None
 
+    def is_entry_local(self, function, citations):
+        """Return True if executing the function for the given entries
+        only uses fields, entry variables, global variables and the output.
+
+        Such a function can be executed for each entry independently
+        of other entries (see :py:meth:`iterate_parallel`), provided that
+        the global variables are only used as temporaries.
+        Functions translated to Python are never considered entry-local.
+        """
+        try:
+            to_visit = [self.vars[function]]
+        except KeyError:
+            return False
+        visited = set()
+        while to_visit:
+            obj = to_visit.pop()
+            if id(obj) in visited:
+                continue
+            visited.add(id(obj))
+            if isinstance(obj, Builtin):
+                if obj in self.non_local_builtins:
+                    return False
+                if obj is builtins['call.type$']:
+                    entry_types = set(self.bib_data.entries[key].type for key in citations)
+                    entry_types.add('default.type')
+                    to_visit.extend(self.vars[name] for name in entry_types if name in self.vars)
+            elif isinstance(obj, PythonFunction):
+                return False
+            elif isinstance(obj, Function):
+                for element in obj.body:
+                    if isinstance(element, FunctionLiteral):
+                        to_visit.append(element)
+                    elif isinstance(element, (Identifier, QuotedVar)):
+                        try:
+                            to_visit.append(self.vars[element.value()])
+                        except KeyError:
+                            return False
+            elif not isinstance(obj, (Variable, Field)):
+                return False
+        return True
+
+    def iterate_parallel(self, function, citations):
+        """Execute the function for each entry in worker processes,
+        then merge the output, the warnings, the entry variables
+        and the global variables in citation order.
+
+        The function must be entry-local (see :py:meth:`is_entry_local`).
+        Return False and do nothing if the entries cannot be processed
+        independently of each other. This happens if the interpreter
+        cannot be sent to worker processes, if the function leaves
+        something on the stack or fails for some entry, or if some global
+        variable is read before it is assigned for an entry and is assigned
+        for another entry.
+        """
+        try:
+            state = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        num_chunks = min(self.processes * 4, len(citations))
+        chunk_size = -(-len(citations) // num_chunks)
+        chunks = [citations[start:start + chunk_size] for start in range(0, len(citations), chunk_size)]
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.processes, len(chunks)),
+                initializer=_init_iterate_worker, initargs=(state,),
+            ) as executor:
+                futures = [
+                    executor.submit(_iterate_chunk, function, chunk, [self.entry_vars[key] for key in chunk])
+                    for chunk in chunks
+                ]
+                results = [future.result() for future in futures]
+        except (BrokenProcessPool, OSError):
+            return False
+        if None in results:
+            self.sequential_functions.add(function)
+            return False
+        read_variables = set()
+        assigned_variables = set()
+        for chunk_results, chunk_read_variables, chunk_assigned_variables in results:
+            read_variables.update(chunk_read_variables)
+            assigned_variables.update(chunk_assigned_variables)
+        if read_variables & assigned_variables:
+            # the values depend on the preceding entries
+            self.sequential_functions.add(function)
+            return False
+
+        for chunk, (chunk_results, chunk_read_variables, chunk_assigned_variables) in zip(chunks, results):
+            for key, (events, reported_errors, entry_vars, global_vars) in zip(chunk, chunk_results):
+                self.current_entry_key = key
+                self.current_entry = self.bib_data.entries[key]
+                self.current_entry_vars = self.entry_vars[key] = entry_vars
+                for string in events:
+                    if string is None:
+                        self.newline()
+                    else:
+                        self.output(string)
+                for error in reported_errors:
+                    report_error(_unpack_error(error))
+                for name, value in global_vars.items():
+                    self.vars[name].set(value)
+        self.current_entry = None
+        return True
+
     def command_macro(self, name_, value_):
         name = name_[0].value()
         value = value_[0].value()
@@ -283,13 +553,19 @@ class Interpreter(object):
 
     def command_read(self):
 #        print 'READ'
-        p = self.bib_format(
-            encoding=self.bib_encoding,
-            macros=self.macros,
-            person_fields=[],
-            wanted_entries=self.citations,
-        )
-        self.bib_data = p.parse_files(self.bib_files)
+        if isinstance(self.bib_files, BibliographyData):
+            self.bib_data = self.bib_files
+        else:
+            p = self.bib_format(
+                encoding=self.bib_encoding,
+                macros=self.macros,
+                person_fields=[],
+                wanted_entries=self.citations,
+                processes=self.bib_processes,
+                use_index=self.use_bib_index,
+                cache=self.bib_cache,
+            )
+            self.bib_data = p.parse_files(self.bib_files)
         self.citations = self.bib_data.add_extra_citations(self.citations, self.min_crossrefs)
         self.citations = list(self.remove_missing_citations(self.citations))
 #        for k, v in self.bib_data.items():
@@ -318,7 +594,90 @@ class Interpreter(object):
         #print 'STRINGS'
         for identifier in identifiers:
             self.vars[identifier.value()] = String()
+        self.vars_version += 1
 
     @staticmethod
     def is_missing_field(field):
         return isinstance(field, MissingField)
+
+
+class _VariableLog(object):
+    """Global variables read and assigned in a worker process."""
+
+    def __init__(self):
+        # read before being assigned for the same entry
+        self.read = set()
+        self.assigned = set()
+        # values assigned for the current entry
+        self.entry_values = {}
+
+
+class _TemporaryVariable(object):
+    """A global variable in a worker process that records how it is used."""
+
+    def __init__(self, name, variable, log):
+        self.name = name
+        self.variable = variable
+        self.log = log
+
+    def execute(self, interpreter):
+        interpreter.push(self.value())
+
+    def value(self):
+        if self.name not in self.log.entry_values:
+            self.log.read.add(self.name)
+        return self.variable.value()
+
+    def set(self, value):
+        self.variable.set(value)
+        self.log.entry_values[self.name] = self.variable.value()
+        self.log.assigned.add(self.name)
+
+
+_worker_interpreter = None
+_worker_variable_log = None
+
+
+def _init_iterate_worker(state):
+    global _worker_interpreter, _worker_variable_log
+    _worker_interpreter = pickle.loads(state)
+    _worker_variable_log = _VariableLog()
+    for name, value in list(_worker_interpreter.vars.items()):
+        if isinstance(value, (Integer, String)) and not isinstance(value, EntryVariable):
+            _worker_interpreter.vars[name] = _TemporaryVariable(name, value, _worker_variable_log)
+
+
+def _iterate_chunk(function, citations, entry_vars_list):
+    """Execute the function for each entry in a worker process.
+
+    For each entry, return the output events (strings written with ``write$``,
+    and None for ``newline$``), the reported errors, the entry variables
+    and the values of the assigned global variables.
+    Also return the global variables read before being assigned for the same entry,
+    and the assigned global variables.
+    Return None if the entries cannot be processed independently.
+    """
+    interpreter = _worker_interpreter
+    log = _worker_variable_log
+    log.read.clear()
+    log.assigned.clear()
+    f = interpreter.vars[function]
+    results = []
+    for key, entry_vars in zip(citations, entry_vars_list):
+        events = []
+        interpreter.output = events.append
+        interpreter.newline = lambda: events.append(None)
+        interpreter.current_entry_key = key
+        interpreter.current_entry = interpreter.bib_data.entries[key]
+        interpreter.current_entry_vars = entry_vars
+        log.entry_values = {}
+        with pybtex.errors.capture() as reported_errors:
+            try:
+                f.execute(interpreter)
+            except Exception:
+                # the error is reported when the entries are processed sequentially
+                return None
+        if interpreter.stack or log.read & log.assigned:
+            return None
+        results.append((events, [_pack_error(error) for error in reported_errors], entry_vars, log.entry_values))
+    return results, log.read, log.assigned
@@ -291,6 +291,7 @@ class NameFormatParser(Scanner):
     FORMAT_CHARS = Pattern(r'[^\W\d_]+', 'format chars', flags=re.IGNORECASE | re.UNICODE)
 
     lineno = None
+    lazy_lineno = True
 
     def parse(self):
         while True:
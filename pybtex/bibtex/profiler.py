@@ -0,0 +1,245 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Profiler for the BibTeX interpreter.
+
+Pass a :py:class:`Profiler` to :py:meth:`.BibTeXEngine.format_from_files`
+(or use :option:`pybtex --profile-bst`) to find out which functions
+and builtins take the most time:
+
+>>> from pybtex.bibtex import bst
+>>> from pybtex.bibtex.interpreter import Interpreter
+>>> from pybtex.database import BibliographyData, Entry
+>>> script = bst.parse_string('''
+...     ENTRY {title} {} {}
+...     FUNCTION {print} { title write$ newline$ }
+...     FUNCTION {article} { print }
+...     READ
+...     ITERATE {call.type$}
+... ''')
+>>> bib_data = BibliographyData({
+...     'one': Entry('article', {'title': 'One'}),
+...     'two': Entry('article', {'title': 'Two'}),
+... })
+>>> profiler = Profiler()
+>>> interpreter = Interpreter(None, None, profiler=profiler)
+>>> print(interpreter.run(script, ['*'], bib_data, min_crossrefs=2).strip())
+One
+Two
+>>> print(profiler.function_stats['print'].ncalls)
+2
+>>> print(profiler.function_stats['write$'].callers['print'].ncalls)
+2
+>>> print(profiler.entry_type_stats['article'].ncalls)
+2
+>>> print(profiler.max_stack_depth)
+1
+
+Builtins inlined by :py:mod:`pybtex.bibtex.bst2py` are not visible to the profiler.
+"""
+
+from __future__ import unicode_literals
+
+import marshal
+from time import perf_counter
+
+
+class CallStats(object):
+    """Execution statistics of a function, or of all calls from one caller."""
+
+    __slots__ = 'primitive_calls', 'ncalls', 'tottime', 'cumtime'
+
+    def __init__(self):
+        self.primitive_calls = 0
+        self.ncalls = 0
+        self.tottime = 0.0
+        self.cumtime = 0.0
+
+    def add(self, elapsed, self_time, recursive):
+        self.ncalls += 1
+        self.tottime += self_time
+        if not recursive:
+            self.primitive_calls += 1
+            self.cumtime += elapsed
+
+    def to_pstats(self):
+        return self.primitive_calls, self.ncalls, self.tottime, self.cumtime
+
+
+class FunctionStats(CallStats):
+    __slots__ = 'callers',
+
+    def __init__(self):
+        super(FunctionStats, self).__init__()
+        self.callers = {}
+
+    def add_call(self, caller, elapsed, self_time, recursive):
+        self.add(elapsed, self_time, recursive)
+        if caller is not None:
+            try:
+                caller_stats = self.callers[caller]
+            except KeyError:
+                caller_stats = self.callers[caller] = CallStats()
+            caller_stats.add(elapsed, self_time, recursive)
+
+
+class ProfiledFunction(object):
+    """Record the execution time of a builtin or a .bst function."""
+
+    def __init__(self, name, function, profiler):
+        self.name = name
+        self.function = function
+        self.profiler = profiler
+
+    def __repr__(self):
+        return repr(self.function)
+
+    def __getattr__(self, name):
+        return getattr(self.function, name)
+
+    def execute(self, interpreter):
+        self.profiler.call(self.name, self.function, interpreter)
+
+
+class Profiler(object):
+    """Collect execution statistics of .bst functions and builtins.
+
+    For each function, :py:attr:`function_stats` contains the number of calls,
+    the total time spent in the function itself (``tottime``),
+    and the time including all called functions (``cumtime``).
+    :py:attr:`entry_type_stats` contains the time spent in ``ITERATE`` and ``REVERSE``
+    for each entry type.
+
+    A profiler can be passed to :py:class:`pstats.Stats`.
+    """
+
+    def __init__(self, timer=perf_counter):
+        self.timer = timer
+        self.function_stats = {}
+        self.entry_type_stats = {}
+        self.max_stack_depth = 0
+        # [function name, time spent in called functions]
+        self.frames = []
+        self.active_calls = {}
+
+    def wrap(self, name, function):
+        return ProfiledFunction(name, function, self)
+
+    def call(self, name, function, interpreter):
+        stack_depth = len(interpreter.stack)
+        if stack_depth > self.max_stack_depth:
+            self.max_stack_depth = stack_depth
+        active_calls = self.active_calls.get(name, 0)
+        self.active_calls[name] = active_calls + 1
+        frame = [name, 0.0]
+        self.frames.append(frame)
+        start = self.timer()
+        try:
+            function.execute(interpreter)
+        finally:
+            elapsed = self.timer() - start
+            self.frames.pop()
+            self.active_calls[name] = active_calls
+            if self.frames:
+                caller = self.frames[-1]
+                caller[1] += elapsed
+                caller_name = caller[0]
+            else:
+                caller_name = None
+            try:
+                stats = self.function_stats[name]
+            except KeyError:
+                stats = self.function_stats[name] = FunctionStats()
+            stats.add_call(caller_name, elapsed, elapsed - frame[1], active_calls > 0)
+            stack_depth = len(interpreter.stack)
+            if stack_depth > self.max_stack_depth:
+                self.max_stack_depth = stack_depth
+
+    def execute_entry(self, function, interpreter):
+        """Execute the function for the current entry and record the time for its type."""
+        start = self.timer()
+        try:
+            function.execute(interpreter)
+        finally:
+            elapsed = self.timer() - start
+            entry_type = interpreter.current_entry.type.lower()
+            try:
+                stats = self.entry_type_stats[entry_type]
+            except KeyError:
+                stats = self.entry_type_stats[entry_type] = CallStats()
+            stats.add(elapsed, elapsed, False)
+
+    def create_stats(self):
+        """Convert the statistics to the :py:mod:`pstats` format
+        and store them in the ``stats`` attribute.
+        """
+        self.stats = {
+            self.get_pstats_key(name): stats.to_pstats() + ({
+                self.get_pstats_key(caller): caller_stats.to_pstats()
+                for caller, caller_stats in stats.callers.items()
+            },)
+            for name, stats in self.function_stats.items()
+        }
+
+    def get_pstats_key(self, name):
+        # pstats displays built-in functions without the file name and line number
+        return '~', 0, name
+
+    def dump_stats(self, filename):
+        """Write the statistics to a file that can be loaded with :py:class:`pstats.Stats`."""
+        self.create_stats()
+        with open(filename, 'wb') as stats_file:
+            marshal.dump(self.stats, stats_file)
+
+    def format_report(self, limit=None):
+        """Return a table of functions sorted by ``tottime``,
+        followed by a table of entry types and the maximum stack depth.
+        """
+        function_stats = sorted(
+            self.function_stats.items(), key=lambda item: item[1].tottime, reverse=True,
+        )[:limit]
+        lines = ['{0:>10} {1:>9} {2:>9} {3:>9} {4:>9}  {5}'.format(
+            'ncalls', 'tottime', 'percall', 'cumtime', 'percall', 'function',
+        )]
+        for name, stats in function_stats:
+            if stats.primitive_calls == stats.ncalls:
+                ncalls = str(stats.ncalls)
+            else:
+                ncalls = '{0}/{1}'.format(stats.ncalls, stats.primitive_calls)
+            lines.append('{0:>10} {1:9.3f} {2:9.6f} {3:9.3f} {4:9.6f}  {5}'.format(
+                ncalls,
+                stats.tottime, stats.tottime / stats.ncalls,
+                stats.cumtime, stats.cumtime / max(stats.primitive_calls, 1),
+                name,
+            ))
+        if self.entry_type_stats:
+            lines.append('')
+            lines.append('{0:>10} {1:>9} {2:>9}  {3}'.format('entries', 'time', 'percall', 'entry type'))
+            entry_type_stats = sorted(
+                self.entry_type_stats.items(), key=lambda item: item[1].tottime, reverse=True,
+            )
+            for entry_type, stats in entry_type_stats:
+                lines.append('{0:>10} {1:9.3f} {2:9.6f}  {3}'.format(
+                    stats.ncalls, stats.tottime, stats.tottime / stats.ncalls, entry_type,
+                ))
+        lines.append('')
+        lines.append('maximum stack depth: {0}'.format(self.max_stack_depth))
+        return '\n'.join(lines) + '\n'
@@ -91,6 +91,13 @@ make_standard_option(
     help='allow BibTeX entries without keys and generate unnamed-<number> keys for them'
 )
 
+make_standard_option(
+    '--bib-cache',
+    action='store', type='string', dest='bib_cache',
+    help='cache parsed bibliography files in DIRECTORY',
+    metavar='DIRECTORY',
+)
+
 make_standard_option(
     '-s', '--style',
     type='string', dest='style', help='bibliography formatting style',
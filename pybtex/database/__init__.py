@@ -24,6 +24,8 @@
 from __future__ import unicode_literals
 from __future__ import print_function
 import re
+import sys
+from itertools import chain
 from typing import Iterable, Tuple
 
 try:
@@ -35,13 +37,16 @@ import textwrap
 
 from pybtex.exceptions import PybtexError
 from pybtex.utils import (
-    deprecated,
+    deprecated, BoundedCache,
     OrderedCaseInsensitiveDict, CaseInsensitiveDefaultDict, CaseInsensitiveSet
 )
 from pybtex.richtext import Text
-from pybtex.bibtex.utils import split_tex_string, scan_bibtex_string
+from pybtex.bibtex.utils import split_name_list, split_tex_string, scan_bibtex_string
+from pybtex.textutils import normalize_whitespace
 from pybtex.errors import report_error
 from pybtex.plugin import find_plugin
+from pybtex.database.crossref import CrossrefGraph
+from pybtex.database.query import IndexedEntries, QueryError
 
 
 # for python2 compatibility
@@ -63,6 +68,8 @@ class InvalidNameString(PybtexError):
 
 
 class BibliographyData(object):
+    entries_type = OrderedCaseInsensitiveDict
+
     def __init__(self, entries=None, preamble=None, wanted_entries=None, min_crossrefs=2):
         """
         A :py:class:`.BibliographyData` object contains a dictionary of bibliography
@@ -73,7 +80,7 @@ class BibliographyData(object):
         preamble defined by ``@PREAMBLE`` commands in the BibTeX file.
         """
 
-        self.entries = OrderedCaseInsensitiveDict()
+        self.entries = self.entries_type()
         '''A dictionary of bibliography entries referenced by their keys.
 
         The dictionary is case insensitive:
@@ -92,6 +99,7 @@ class BibliographyData(object):
         self.crossref_count = CaseInsensitiveDefaultDict(int)
         self.min_crossrefs = min_crossrefs
         self._preamble = []
+        self._crossref_graph = None
         if wanted_entries is not None:
             self.wanted_entries = CaseInsensitiveSet(wanted_entries)
             self.citations = CaseInsensitiveSet(wanted_entries)
@@ -132,6 +140,21 @@ class BibliographyData(object):
             "  preamble={1})".format(repr_entry, repr(self._preamble))
         )
 
+    @property
+    def crossref_graph(self):
+        """A :py:class:`.CrossrefGraph` used to find the fields inherited
+        through ``crossref`` fields.
+
+        The graph is created on first access and follows the changes
+        to the entries.
+
+        .. versionadded:: 0.26
+        """
+        graph = getattr(self, '_crossref_graph', None)
+        if graph is None or graph.entries is not self.entries:
+            graph = self._crossref_graph = CrossrefGraph(self.entries)
+        return graph
+
     def add_to_preamble(self, *values):
         self._preamble.extend(values)
 
@@ -209,6 +232,49 @@ class BibliographyData(object):
         for key, entry in entries:
             self.add_entry(key, entry)
 
+    def add_index(self, index):
+        """Add a secondary index over the entries
+        (see :py:mod:`pybtex.database.query`).
+
+        The index is kept up to date as entries are added, replaced and
+        deleted. The first index replaces :py:attr:`entries` with an
+        :py:class:`.IndexedEntries` wrapper around the entry dictionary.
+
+        .. versionadded:: 0.26
+        """
+        if not isinstance(self.entries, IndexedEntries):
+            self.entries = IndexedEntries(self.entries)
+        self.entries.add_index(index)
+
+    def query(self, **conditions):
+        """Return the keys of the entries matching all conditions, in the entry order.
+
+        The keyword names are the names of the indexes
+        (the field name, the person role or ``type``), and the values are
+        either values to compare with, or :py:class:`.Prefix` and :py:class:`.Range` objects.
+        :py:class:`.QueryError` is raised if there is no index for a condition.
+
+        .. versionadded:: 0.26
+        """
+        if not isinstance(self.entries, IndexedEntries):
+            if conditions:
+                raise QueryError('no index for {0}'.format(next(iter(conditions))))
+            return list(self.entries.keys())
+        return self.entries.query(conditions)
+
+    def view(self, citations, min_crossrefs=2):
+        """Return a read-only :py:class:`.BibliographyDataView` of the cited entries.
+
+        Wildcard citations and cross-referenced entries are handled
+        like in :py:meth:`add_extra_citations`. The entries are not copied,
+        and the view can be used anywhere a :py:class:`.BibliographyData` can
+        be formatted or written.
+
+        .. versionadded:: 0.26
+        """
+        from pybtex.database.view import BibliographyDataView
+        return BibliographyDataView(self, citations, min_crossrefs=min_crossrefs)
+
     def _get_crossreferenced_citations(self, citations, min_crossrefs):
         r"""
         Get cititations not cited explicitly but referenced by other citations.
@@ -422,24 +488,18 @@ class RichFieldProxyDict(Mapping):
 class Entry(object):
     """A bibliography entry."""
 
-    type = None
-    """Entry type (``'book'``, ``'article'``, etc.)."""
-
-    key = None
-    """Entry key (for example, ``'fukushima1980neocognitron'``)."""
-
-    fields = None
-    """A dictionary of entry fields.
-    The dictionary is ordered and case-insensitive."""
-
-    persons = None
-    """
+    __slots__ = {
+        'type': """Entry type (``'book'``, ``'article'``, etc.).""",
+        'original_type': """Entry type as written in the bibliography file.""",
+        'key': """Entry key (for example, ``'fukushima1980neocognitron'``).""",
+        'fields': """A dictionary of entry fields.
+    The dictionary is ordered and case-insensitive.""",
+        'persons': """
     A dictionary of entry persons, by their roles.
 
     The most often used roles are ``'author'`` and ``'editor'``.
-    """
-
-    """A reference to the containing :py:class:`.BibliographyData` object. Used to resolve crossrefs."""
+    """,
+    }
 
     def __init__(self, type_, fields=None, persons=None):
         if fields is None:
@@ -448,9 +508,28 @@ class Entry(object):
             persons = {}
         self.type = type_.lower()
         self.original_type = type_
+        self.key = None
         self.fields = OrderedCaseInsensitiveDict(fields)
         self.persons = OrderedCaseInsensitiveDict(persons)
 
+    def __getstate__(self):
+        state = {}
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name == '__dict__':
+                    continue
+                try:
+                    # read the slot directly, bypassing the descriptors of LazyEntry
+                    state[name] = cls.__dict__[name].__get__(self, cls)
+                except AttributeError:
+                    pass
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def __eq__(self, other):
         if not isinstance(other, Entry):
             return super(Entry, self) == other
@@ -501,12 +580,6 @@ class Entry(object):
         persons = self.persons[role]
         return ' and '.join(str(person) for person in persons)
 
-    def _find_crossref_field(self, name, bib_data):
-        if bib_data is None or 'crossref' not in self.fields:
-            raise KeyError(name)
-        referenced_entry = bib_data.entries[self.fields['crossref']]
-        return referenced_entry._find_field(name, bib_data)
-
     def _find_field(self, name, bib_data=None):
         """
         Find the field with the given ``name`` according to this rules:
@@ -521,14 +594,18 @@ class Entry(object):
         - Otherwise, if this entry has a ``crossreff`` field, look up for the
           cross-referenced entry and try to find its field with the given
           ``name``.
+
+        If ``bib_data`` is given, the lookup is done by its
+        :py:attr:`~.BibliographyData.crossref_graph`.
         """
-        try:
-            return self.fields[name]
-        except KeyError:
-            try:
-                return self._find_person_field(name)
-            except KeyError:
-                return self._find_crossref_field(name, bib_data)
+        fields = self.fields
+        if name in fields:
+            return fields[name]
+        if bib_data is not None:
+            return bib_data.crossref_graph.find_field(self, name)
+        if name in self.persons:
+            return self._find_person_field(name)
+        raise KeyError(name)
 
     def to_string(self, bib_format, **kwargs):
         """
@@ -557,6 +634,113 @@ class Entry(object):
         return bibdata.entries[key]
 
 
+class _LazyEntryAttribute(object):
+    """Builds the fields or persons of a :py:class:`.LazyEntry` on first access.
+
+    This is a non-data descriptor: once built, the value is stored in the
+    instance dictionary and the descriptor is not called any more.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, entry, owner):
+        if entry is None:
+            return self
+        return entry._materialize(self.name)
+
+
+class LazyEntry(Entry):
+    r"""A bibliography entry that keeps the raw field values
+    and builds :py:attr:`~.Entry.fields` and :py:attr:`~.Entry.persons`
+    on first access.
+
+    Whitespace in the raw values is normalized, and the values of person fields
+    are split into :py:class:`.Person` objects at that time. Thus errors in
+    person names are reported when the persons are first used, not when the entry is parsed.
+
+    >>> entry = LazyEntry('Article', [
+    ...     ('Title', 'An  article\nabout  journals'),
+    ...     ('Author', 'Donald E. Knuth and Jones, Jr, John'),
+    ... ], person_fields=['author'])
+    >>> entry.type
+    'article'
+    >>> entry.fields
+    OrderedCaseInsensitiveDict([('Title', 'An article about journals')])
+    >>> entry.persons['author']
+    [Person('Knuth, Donald E.'), Person('Jones, Jr, John')]
+    >>> entry == Entry('article', fields={'Title': 'An article about journals'}, persons={
+    ...     'Author': [Person('Donald E. Knuth'), Person('Jones, Jr, John')],
+    ... })
+    True
+    """
+
+    # materialized fields and persons are stored in __dict__
+    __slots__ = ('_raw_fields', '_person_fields', '__dict__')
+
+    fields = _LazyEntryAttribute('fields')
+    persons = _LazyEntryAttribute('persons')
+
+    def __init__(self, type_, raw_fields, person_fields=()):
+        """
+        :param raw_fields: A list of (name, value) pairs.
+        :param person_fields: Names of the fields to be parsed as person lists.
+        """
+        if not isinstance(person_fields, CaseInsensitiveSet):
+            person_fields = CaseInsensitiveSet(person_fields)
+        self.type = type_.lower()
+        self.original_type = type_
+        self.key = None
+        self._raw_fields = raw_fields
+        self._person_fields = person_fields
+
+    def _materialize(self, name):
+        if name == 'fields':
+            value = OrderedCaseInsensitiveDict(
+                (field_name, normalize_whitespace(field_value))
+                for field_name, field_value in self._raw_fields
+                if field_name not in self._person_fields
+            )
+        else:
+            value = OrderedCaseInsensitiveDict()
+            for field_name, field_value in self._raw_fields:
+                if field_name in self._person_fields:
+                    for person_name in split_name_list(normalize_whitespace(field_value)):
+                        value.setdefault(field_name, []).append(Person(person_name))
+        value = self.__dict__.setdefault(name, value)
+        if 'fields' in self.__dict__ and 'persons' in self.__dict__:
+            self._raw_fields = None
+            self._person_fields = None
+        return value
+
+    def lower(self):
+        return Entry(
+            self.type,
+            fields=self.fields.lower(),
+            persons=self.persons.lower(),
+        )
+
+
+def _name_parts_property(slot, doc):
+    """Make a property for a list of name parts.
+
+    Until the list is first accessed, the slot holds a tuple
+    shared with :py:attr:`Person.name_cache` and other :py:class:`Person` objects.
+    """
+
+    def get_name_parts(self):
+        name_parts = getattr(self, slot)
+        if type(name_parts) is tuple:
+            name_parts = list(name_parts)
+            setattr(self, slot, name_parts)
+        return name_parts
+
+    def set_name_parts(self, name_parts):
+        setattr(self, slot, name_parts)
+
+    return property(get_name_parts, set_name_parts, doc=doc)
+
+
 class Person(object):
     """A person or some other person-like entity.
 
@@ -570,50 +754,56 @@ class Person(object):
 
     """
 
-    first_names = None
-    """
+    __slots__ = ('_first_names', '_middle_names', '_prelast_names', '_last_names', '_lineage_names')
+
+    first_names = _name_parts_property('_first_names', """
     A list of first names.
 
     .. versionadded:: 0.19
         Earlier versions used :py:meth:`.first`, which is now deprecated.
-    """
+    """)
 
-    middle_names = None
-    """
+    middle_names = _name_parts_property('_middle_names', """
     A list of middle names.
 
     .. versionadded:: 0.19
         Earlier versions used :py:meth:`.middle`, which is now deprecated.
-    """
+    """)
 
-    prelast_names = None
-    """
+    prelast_names = _name_parts_property('_prelast_names', """
     A list of pre-last (aka von) name parts.
 
     .. versionadded:: 0.19
         Earlier versions used :py:meth:`.middle`, which is now deprecated.
-    """
+    """)
 
-    last_names = None
-    """
+    last_names = _name_parts_property('_last_names', """
     A list of last names.
 
     .. versionadded:: 0.19
         Earlier versions used :py:meth:`.last`, which is now deprecated.
-    """
+    """)
 
-    lineage_names = None
-    """
+    lineage_names = _name_parts_property('_lineage_names', """
     A list of linage (aka Jr) name parts.
 
     .. versionadded:: 0.19
         Earlier versions used :py:meth:`.lineage`, which is now deprecated.
-    """
+    """)
 
     valid_roles = ['author', 'editor']
     style1_re = re.compile(r'^(.+),\s*(.+)$')
     style2_re = re.compile(r'^(.+),\s*(.+),\s*(.+)$')
 
+    name_cache = BoundedCache(capacity=65536)
+    """
+    Parsed names shared by all :py:class:`Person` objects,
+    keyed by the constructor arguments.
+    Use ``Person.name_cache.cache_info()`` to get the hit and miss counts.
+
+    .. versionadded:: 0.26
+    """
+
     def __init__(self, string="", first="", middle="", prelast="", last="", lineage=""):
         """
         :param string: The full name string.
@@ -630,21 +820,65 @@ class Person(object):
 
         """
 
+        string = string.strip()
+        cache_key = string, first, middle, prelast, last, lineage
+        name_parts = self.name_cache.get(cache_key)
+        if name_parts is not None:
+            self._set_name_parts(name_parts)
+            return
+
         self.first_names = []
         self.middle_names = []
         self.prelast_names = []
         self.last_names = []
         self.lineage_names = []
 
-        string = string.strip()
+        valid = True
         if string:
-            self._parse_string(string)
+            valid = self._parse_string(string)
         self.first_names.extend(split_tex_string(first))
         self.middle_names.extend(split_tex_string(middle))
         self.prelast_names.extend(split_tex_string(prelast))
         self.last_names.extend(split_tex_string(last))
         self.lineage_names.extend(split_tex_string(lineage))
 
+        # invalid names are not cached, so that the error is reported every time
+        if valid:
+            name_parts = tuple(
+                tuple(sys.intern(part) for part in parts)
+                for parts in self._get_name_parts()
+            )
+            self.name_cache.add(cache_key, name_parts)
+            self._set_name_parts(name_parts)
+
+    def _get_name_parts(self):
+        return (
+            self._first_names,
+            self._middle_names,
+            self._prelast_names,
+            self._last_names,
+            self._lineage_names,
+        )
+
+    def _set_name_parts(self, name_parts):
+        (
+            self._first_names,
+            self._middle_names,
+            self._prelast_names,
+            self._last_names,
+            self._lineage_names,
+        ) = name_parts
+
+    def __getstate__(self):
+        return dict(
+            (slot[1:], list(parts))
+            for slot, parts in zip(Person.__slots__, self._get_name_parts())
+        )
+
+    def __setstate__(self, state):
+        for name, parts in state.items():
+            setattr(self, name, parts)
+
     @property
     def bibtex_first_names(self):
         """A list of first and middle names together.
@@ -663,6 +897,8 @@ class Person(object):
     def _parse_string(self, name):
         """Extract various parts of the name from a string.
 
+        Return False if the name string is invalid.
+
         >>> p = Person('Avinash K. Dixit')
         >>> print(p.first_names)
         ['Avinash']
@@ -763,9 +999,11 @@ class Person(object):
                         return char.islower()
             return False
 
+        valid = True
         parts = split_tex_string(name, ',')
         if len(parts) > 3:
             report_error(InvalidNameString(name))
+            valid = False
             last_parts = parts[2:]
             parts = parts[:2] + [' '.join(last_parts)]
 
@@ -787,23 +1025,21 @@ class Person(object):
         else:
             # should hot really happen
             raise ValueError(name)
+        return valid
 
     def __eq__(self, other):
         if not isinstance(other, Person):
             return super(Person, self) == other
-        return (
-            self.first_names == other.first_names
-            and self.middle_names == other.middle_names
-            and self.prelast_names == other.prelast_names
-            and self.last_names == other.last_names
-            and self.lineage_names == other.lineage_names
+        return all(
+            list(parts) == list(other_parts)
+            for parts, other_parts in zip(self._get_name_parts(), other._get_name_parts())
         )
 
     def __str__(self):
         # von Last, Jr, First
-        von_last = ' '.join(self.prelast_names + self.last_names)
-        jr = ' '.join(self.lineage_names)
-        first = ' '.join(self.first_names + self.middle_names)
+        von_last = ' '.join(chain(self._prelast_names, self._last_names))
+        jr = ' '.join(self._lineage_names)
+        first = ' '.join(chain(self._first_names, self._middle_names))
         return ', '.join(part for part in (von_last, jr, first) if part)
 
     def __repr__(self):
@@ -946,6 +1182,50 @@ def parse_file(file, bib_format=None, **kwargs):
     return parser.parse_file(file)
 
 
+async def parse_file_async(file, bib_format=None, executor=None, **kwargs):
+    """
+    Like :py:func:`parse_file`, but do not block the event loop
+    (see :py:meth:`.BaseParser.parse_file_async`).
+
+    :param executor: A :py:class:`concurrent.futures.ThreadPoolExecutor`
+        for reading and parsing the file.
+        If not specified, the default executor of the event loop is used.
+
+    .. versionadded:: 0.26
+    """
+
+    if isinstance(file, str):
+        filename = file
+    else:
+        filename = getattr(file, 'name', None)
+
+    parser = find_plugin('pybtex.database.input', bib_format, filename=filename)(**kwargs)
+    return await parser.parse_file_async(file, executor=executor)
+
+
+def iter_entries(file, bib_format=None, **kwargs):
+    """
+    Read bibliography data from file and yield ``(key, entry)`` pairs
+    as soon as they are parsed, without building a :py:class:`.BibliographyData` object.
+
+    Unlike :py:func:`parse_file`, repeated entries are not detected.
+
+    :param file: A file name or a file-like object.
+    :param bib_format: Data format ("bibtex", "yaml", etc.).
+        If not specified, Pybtex will try to guess by the file name.
+
+    .. versionadded:: 0.26
+    """
+
+    if isinstance(file, str):
+        filename = file
+    else:
+        filename = getattr(file, 'name', None)
+
+    parser = find_plugin('pybtex.database.input', bib_format, filename=filename)(**kwargs)
+    return parser.iter_entries(file)
+
+
 def parse_string(value, bib_format, **kwargs):
     """
     Parse a Unicode string containing bibliography data and return a :py:class:`.BibliographyData` object.
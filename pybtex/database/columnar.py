@@ -0,0 +1,447 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+r"""Column-wise storage of bibliography data for very large databases.
+
+:py:class:`ColumnarBibliographyData` stores the field values
+of all entries in a single UTF-8 buffer. For each field name, there is
+a column of offsets into the buffer, one pair of offsets per entry.
+Persons are stored in a separate table, each distinct name only once.
+There are no :py:class:`.Entry` or :py:class:`.Person` objects until they are asked for,
+so the memory used per entry is a fraction of that of :py:class:`.BibliographyData`.
+
+All values of a field can be read at once without creating any entries:
+
+>>> from pybtex.database import parse_string
+>>> bib_data = parse_string('''
+...     @Book{knuth1984,
+...         author = {Donald E. Knuth},
+...         title = {The {\\TeX}book},
+...         year = 1984,
+...     }
+...     @Article{lamport1986,
+...         author = {Leslie Lamport},
+...         title = {{\\LaTeX}: A Document Preparation System},
+...     }
+... ''', 'bibtex', columnar=True)
+>>> bib_data.column('year')
+['1984', None]
+>>> bib_data.type_column()
+['book', 'article']
+>>> bib_data.person_column('author')
+[[Person('Knuth, Donald E.')], [Person('Lamport, Leslie')]]
+
+Otherwise, :py:class:`ColumnarBibliographyData` works like :py:class:`.BibliographyData`.
+The entries are read-only views of the stored data:
+
+>>> entry = bib_data.entries['Knuth1984']
+>>> print(entry.fields['title'])
+The {\TeX}book
+>>> entry.fields['title'] = 'The METAFONTbook'
+>>> print(bib_data.entries['knuth1984'].fields['title'])
+The {\TeX}book
+
+To change an entry, replace it with another :py:class:`.Entry`.
+
+.. versionadded:: 0.26
+"""
+
+from __future__ import unicode_literals
+
+from array import array
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+from pybtex.database import BibliographyData, Entry, Person
+from pybtex.database.query import IndexedEntries
+from pybtex.utils import OrderedCaseInsensitiveDict
+
+# separators of the person name parts in the person table
+_PART_SEPARATOR = '\x1e'
+_NAME_SEPARATOR = '\x1f'
+
+
+def _encode_person(person):
+    return _PART_SEPARATOR.join(
+        _NAME_SEPARATOR.join(names) for names in person._get_name_parts()
+    )
+
+
+def _decode_name_parts(encoded_person):
+    return tuple(
+        tuple(names.split(_NAME_SEPARATOR)) if names else ()
+        for names in encoded_person.split(_PART_SEPARATOR)
+    )
+
+
+def _make_person(name_parts):
+    person = Person.__new__(Person)
+    person._set_name_parts(name_parts)
+    return person
+
+
+class _ValueTable(object):
+    """A list of distinct values, referenced by their numbers."""
+
+    def __init__(self):
+        self.values = []
+        self.numbers = {}
+
+    def add(self, value):
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.values)
+            self.values.append(value)
+        return number
+
+
+class _Column(object):
+    """Start and end offsets of the values of a field in the string buffer.
+
+    The column may be shorter than the number of entries, and the start offset
+    is -1 for entries without the field.
+    Short values that are used again (years, journal names, etc.)
+    are stored in the buffer only once.
+    """
+
+    max_shared_length = 64
+    max_shared_values = 4096
+
+    def __init__(self):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.shared_values = {}
+
+    def add(self, row, value, buffer):
+        span = self.shared_values.get(value)
+        if span is None:
+            start = len(buffer)
+            buffer += value.encode('UTF-8', 'surrogatepass')
+            span = start, len(buffer)
+            if len(value) <= self.max_shared_length:
+                if len(self.shared_values) >= self.max_shared_values:
+                    self.shared_values.clear()
+                self.shared_values[value] = span
+        self.set(row, *span)
+
+    def set(self, row, start, end):
+        starts = self.starts
+        if row < len(starts):
+            starts[row] = start
+            self.ends[row] = end
+            return
+        missing = row - len(starts)
+        if missing:
+            starts.extend(array('q', [-1]) * missing)
+            self.ends.extend(array('q', [-1]) * missing)
+        starts.append(start)
+        self.ends.append(end)
+
+    def clear(self, row):
+        if row < len(self.starts):
+            self.starts[row] = -1
+
+
+class ColumnarEntries(MutableMapping):
+    """An ordered case-insensitive mapping of entry keys
+    to :py:class:`ColumnarEntry` views.
+
+    Each entry has a row number, and all per-entry data is stored
+    in arrays indexed by the row number.
+    Entries assigned to the mapping are split into the columns, and
+    later changes to the assigned :py:class:`.Entry` objects are not stored.
+    """
+
+    def __init__(self, entries=()):
+        self._rows = {}
+        self._keys = []
+        self._buffer = bytearray()
+        self._columns = {}
+        self._types = _ValueTable()
+        self._type_ids = array('l')
+        # the field names of an entry, in the original order
+        self._schemas = _ValueTable()
+        self._schema_ids = array('l')
+        self._schema_columns = []
+        # the person table and the entry-person links
+        self._persons = _ValueTable()
+        self._roles = _ValueTable()
+        self._person_ids = array('l')
+        self._role_ids = array('l')
+        self._persons_start = array('q')
+        self._persons_end = array('q')
+        self.update(entries)
+
+    def _get_row(self, key):
+        rows = self._rows
+        if key in rows:
+            return rows[key]
+        return rows[key.casefold()]
+
+    def __getitem__(self, key):
+        return ColumnarEntry(self, self._get_row(key))
+
+    def __contains__(self, key):
+        rows = self._rows
+        return key in rows or key.casefold() in rows
+
+    def __iter__(self):
+        keys = self._keys
+        return (keys[row] for row in self._rows.values())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __delitem__(self, key):
+        row = self._rows.pop(key.casefold())
+        self._clear_fields(row)
+        self._keys[row] = None
+
+    def __setitem__(self, key, entry):
+        key_folded = key.casefold()
+        row = self._rows.get(key_folded)
+        if row is None:
+            row = self._rows[key_folded] = len(self._keys)
+            self._keys.append(key)
+            self._type_ids.append(0)
+            self._schema_ids.append(0)
+            self._persons_start.append(0)
+            self._persons_end.append(0)
+        else:
+            self._keys[row] = key
+            self._clear_fields(row)
+        self._type_ids[row] = self._types.add(entry.original_type)
+        self._set_fields(row, entry.fields)
+        self._set_persons(row, entry.persons)
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, list(self.items()))
+
+    def _set_fields(self, row, fields):
+        buffer = self._buffer
+        columns = self._columns
+        schema_id = self._schemas.add(tuple(fields.keys()))
+        if schema_id == len(self._schema_columns):
+            schema_columns = []
+            for name in self._schemas.values[schema_id]:
+                column = columns.get(name.casefold())
+                if column is None:
+                    column = columns[name.casefold()] = _Column()
+                schema_columns.append((name, column))
+            self._schema_columns.append(schema_columns)
+        self._schema_ids[row] = schema_id
+        for (name, column), value in zip(self._schema_columns[schema_id], fields.values()):
+            column.add(row, value, buffer)
+
+    def _clear_fields(self, row):
+        for name, column in self._schema_columns[self._schema_ids[row]]:
+            column.clear(row)
+
+    def _set_persons(self, row, persons):
+        # the old links of a replaced entry are left unused
+        self._persons_start[row] = len(self._person_ids)
+        for role, role_persons in persons.items():
+            role_id = self._roles.add(role)
+            for person in role_persons:
+                self._person_ids.append(self._persons.add(_encode_person(person)))
+                self._role_ids.append(role_id)
+        self._persons_end[row] = len(self._person_ids)
+
+    def _get_value(self, column, row):
+        start = column.starts[row]
+        return self._buffer[start:column.ends[row]].decode('UTF-8', 'surrogatepass')
+
+    def get_type(self, row):
+        return self._types.values[self._type_ids[row]]
+
+    def get_fields(self, row):
+        get_value = self._get_value
+        return OrderedCaseInsensitiveDict([
+            (name, get_value(column, row))
+            for name, column in self._schema_columns[self._schema_ids[row]]
+        ])
+
+    def get_persons(self, row):
+        persons = OrderedCaseInsensitiveDict()
+        start, end = self._persons_start[row], self._persons_end[row]
+        roles = self._roles.values
+        encoded_persons = self._persons.values
+        for role_id, person_id in zip(self._role_ids[start:end], self._person_ids[start:end]):
+            person = _make_person(_decode_name_parts(encoded_persons[person_id]))
+            persons.setdefault(roles[role_id], []).append(person)
+        return persons
+
+    def column(self, field_name):
+        """Return the values of the field for all entries, in the entry order.
+
+        The value is None for entries without the field.
+        """
+        column = self._columns.get(field_name.casefold())
+        if column is None:
+            return [None] * len(self)
+        buffer = self._buffer
+        max_shared_length = column.max_shared_length
+        # decode the shared values only once
+        decoded = {}
+        values = []
+        append = values.append
+        if len(self._rows) == len(self._keys):
+            # no entries were deleted, the rows are in order
+            spans = zip(column.starts, column.ends)
+        else:
+            starts, ends = column.starts, column.ends
+            spans = (
+                (starts[row], ends[row]) if row < len(starts) else (-1, -1)
+                for row in self._rows.values()
+            )
+        for start, end in spans:
+            if start < 0:
+                append(None)
+            elif end - start > max_shared_length:
+                append(buffer[start:end].decode('UTF-8', 'surrogatepass'))
+            else:
+                value = decoded.get(start)
+                if value is None:
+                    value = decoded[start] = buffer[start:end].decode('UTF-8', 'surrogatepass')
+                append(value)
+        values.extend([None] * (len(self._rows) - len(values)))
+        return values
+
+    def type_column(self):
+        """Return the (lowercase) types of all entries, in the entry order."""
+        types = [entry_type.lower() for entry_type in self._types.values]
+        type_ids = self._type_ids
+        return [types[type_ids[row]] for row in self._rows.values()]
+
+    def person_column(self, role):
+        """Return the lists of persons with the role for all entries, in the entry order."""
+        role_id = self._roles.numbers.get(role)
+        if role_id is None:
+            role_ids = set(
+                number for name, number in self._roles.numbers.items()
+                if name.casefold() == role.casefold()
+            )
+        else:
+            role_ids = {role_id}
+        encoded_persons = self._persons.values
+        name_parts = {}
+        person_ids, entry_role_ids = self._person_ids, self._role_ids
+        starts, ends = self._persons_start, self._persons_end
+        values = []
+        for row in self._rows.values():
+            persons = []
+            for index in range(starts[row], ends[row]):
+                if entry_role_ids[index] in role_ids:
+                    person_id = person_ids[index]
+                    parts = name_parts.get(person_id)
+                    if parts is None:
+                        parts = name_parts[person_id] = _decode_name_parts(encoded_persons[person_id])
+                    persons.append(_make_person(parts))
+            values.append(persons)
+        return values
+
+
+class ColumnarEntry(Entry):
+    """A read-only view of an entry in :py:class:`ColumnarEntries`.
+
+    :py:attr:`fields` and :py:attr:`persons` are built on first access.
+    Changing them does not change the stored entry.
+    """
+
+    __slots__ = ('_entries', '_row', '_fields', '_persons')
+
+    def __init__(self, entries, row):
+        self._entries = entries
+        self._row = row
+        self.key = entries._keys[row]
+
+    @property
+    def original_type(self):
+        return self._entries.get_type(self._row)
+
+    @property
+    def type(self):
+        return self.original_type.lower()
+
+    @property
+    def fields(self):
+        try:
+            return self._fields
+        except AttributeError:
+            self._fields = self._entries.get_fields(self._row)
+            return self._fields
+
+    @property
+    def persons(self):
+        try:
+            return self._persons
+        except AttributeError:
+            self._persons = self._entries.get_persons(self._row)
+            return self._persons
+
+    def detach(self):
+        """Return a standalone :py:class:`.Entry` with the same data."""
+        entry = Entry(self.original_type, fields=self.fields, persons=self.persons)
+        entry.key = self.key
+        return entry
+
+    def __reduce__(self):
+        # pickled as a standalone entry
+        return Entry, (self.original_type,), self.detach().__getstate__()
+
+    def lower(self):
+        return self.detach().lower()
+
+
+class ColumnarBibliographyData(BibliographyData):
+    """:py:class:`.BibliographyData` with column-wise storage of the entries.
+
+    Use ``parse_file(filename, columnar=True)`` to parse a file into it.
+    """
+
+    entries_type = ColumnarEntries
+
+    def _get_columnar_entries(self):
+        """Return the :py:class:`ColumnarEntries`, unwrapping the
+        :py:class:`.IndexedEntries` added by :py:meth:`.add_index`.
+        """
+        entries = self.entries
+        if isinstance(entries, IndexedEntries):
+            return entries.entries
+        return entries
+
+    def column(self, field_name):
+        """Return the values of the field for all entries, in the entry order.
+
+        The value is None for entries without the field.
+        """
+        return self._get_columnar_entries().column(field_name)
+
+    def type_column(self):
+        """Return the (lowercase) types of all entries, in the entry order."""
+        return self._get_columnar_entries().type_column()
+
+    def person_column(self, role):
+        """Return the lists of persons with the role for all entries, in the entry order."""
+        return self._get_columnar_entries().person_column(role)
@@ -54,6 +54,7 @@ pybtex-convert converts bibliography database files between supported formats
                 type='load_plugin', plugin_group='pybtex.database.output',
             ),
             standard_option('keyless_entries'),
+            standard_option('bib_cache'),
             make_option(
                 '--preserve-case', dest='preserve_case',
                 action='store_true',
@@ -74,7 +75,7 @@ pybtex-convert converts bibliography database files between supported formats
     def run(
         self, from_filename, to_filename,
         encoding, input_encoding, output_encoding,
-        keyless_entries,
+        keyless_entries, bib_cache,
         **options
     ):
         from pybtex.database.convert import convert
@@ -82,7 +83,7 @@ pybtex-convert converts bibliography database files between supported formats
             from_filename, to_filename,
             input_encoding=input_encoding or encoding,
             output_encoding=output_encoding or encoding,
-            parser_options={'keyless_entries': keyless_entries},
+            parser_options={'keyless_entries': keyless_entries, 'cache': bib_cache},
             **options
         )
 
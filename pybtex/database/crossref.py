@@ -0,0 +1,154 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Resolution of fields inherited through ``crossref`` fields.
+
+>>> from pybtex.database import BibliographyData, Entry, Person
+>>> bib_data = BibliographyData({
+...     'article': Entry('inproceedings', fields={'title': 'Title', 'crossref': 'Proc'}),
+...     'proc': Entry('proceedings', fields={'year': '2024'}, persons={
+...         'editor': [Person('Doe, John'), Person('Jane Roe')],
+...     }),
+...     'loop1': Entry('misc', fields={'crossref': 'loop2'}),
+...     'loop2': Entry('misc', fields={'crossref': 'loop1'}),
+...     'lost': Entry('misc', fields={'crossref': 'nowhere'}),
+... })
+>>> graph = bib_data.crossref_graph
+>>> graph.find_field(bib_data.entries['article'], 'year')
+'2024'
+>>> graph.find_field(bib_data.entries['article'], 'editor')
+'Doe, John and Roe, Jane'
+>>> graph.missing
+[('lost', 'nowhere')]
+>>> graph.cycles
+[['loop1', 'loop2']]
+>>> graph.find_field(bib_data.entries['loop1'], 'year')
+Traceback (most recent call last):
+    ...
+KeyError: 'year'
+
+.. versionadded:: 0.26
+"""
+
+from __future__ import unicode_literals
+
+from pybtex.utils import BoundedCache
+
+
+class CrossrefGraph(object):
+    """The ``crossref`` links between the entries of a :py:class:`.BibliographyData`.
+
+    The links are not copied: the fields are looked up in the current entries,
+    so added, replaced and deleted entries and changes to the fields
+    and ``crossref`` links take effect immediately.
+    :py:attr:`missing` and :py:attr:`cycles` are found in the current entries
+    each time they are accessed.
+
+    The resolved field values are not memoized. The entries can be changed
+    in place, and checking a memoized value would cost as much as following
+    the few links of a crossref chain.
+    The strings of joined person names are cached by the name parts,
+    so changes to the persons take effect immediately too.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._person_strings = BoundedCache()
+
+    @property
+    def missing(self):
+        """``(key, crossref)`` pairs for the links to missing entries."""
+        missing, cycles = self._check_links()
+        return missing
+
+    @property
+    def cycles(self):
+        """Lists of the entry keys forming crossref cycles."""
+        missing, cycles = self._check_links()
+        return cycles
+
+    def _check_links(self):
+        entries = self.entries
+        missing = []
+        links = {}
+        keys = {}
+        for key, entry in entries.items():
+            crossref = entry.fields.get('crossref')
+            if crossref is None:
+                continue
+            if crossref in entries:
+                links[key.casefold()] = crossref.casefold()
+                keys[key.casefold()] = key
+            else:
+                missing.append((key, crossref))
+        return missing, self._find_cycles(links, keys)
+
+    def _find_cycles(self, links, keys):
+        cycles = []
+        done = set()
+        for start in links:
+            path = []
+            on_path = {}
+            key = start
+            while key in links and key not in done and key not in on_path:
+                on_path[key] = len(path)
+                path.append(key)
+                key = links[key]
+            if key in on_path:
+                cycles.append([keys[cycle_key] for cycle_key in path[on_path[key]:]])
+            done.update(path)
+        return cycles
+
+    def join_persons(self, persons):
+        """Return the names joined with ``' and '``, as BibTeX does."""
+        key = tuple(tuple(parts) for person in persons for parts in person._get_name_parts())
+        string = self._person_strings.get(key)
+        if string is None:
+            string = ' and '.join(str(person) for person in persons)
+            self._person_strings.add(key, string)
+        return string
+
+    def find_field(self, entry, name):
+        """Find the field in the entry, among its persons
+        or in the entries it references with ``crossref``.
+
+        Raise :py:exc:`KeyError` if the field is not found.
+        """
+        visited = None
+        while True:
+            fields = entry.fields
+            if name in fields:
+                return fields[name]
+            persons = entry.persons
+            if name in persons:
+                return self.join_persons(persons[name])
+            crossref = fields.get('crossref')
+            if crossref is None:
+                break
+            if visited is None:
+                visited = set()
+            visited.add(entry.key.casefold() if entry.key is not None else None)
+            if crossref.casefold() in visited:
+                break
+            entry = self.entries.get(crossref)
+            if entry is None:
+                break
+        raise KeyError(name)
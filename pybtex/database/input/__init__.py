@@ -23,11 +23,21 @@ from __future__ import with_statement
 from __future__ import unicode_literals
 
 from __future__ import absolute_import
+import asyncio
 import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 
+import pybtex.errors
 import pybtex.io
+from pybtex.errors import report_error
 from pybtex.plugin import Plugin
 from pybtex.database import BibliographyData
+from pybtex.database.columnar import ColumnarBibliographyData
+from pybtex.database.input.cache import ParseCache, make_cache_key
+from pybtex.database.input.index import get_file_hash
 from pybtex.exceptions import PybtexError
 
 
@@ -36,17 +46,40 @@ class BaseParser(Plugin):
     filename = '<INPUT>'
     unicode_io = False
 
-    def __init__(self, encoding=None, wanted_entries=None, min_crossrefs=2, **kwargs):
+    async_batch_size = 1000
+    """The number of entries parsed at a time by :py:meth:`parse_file_async`."""
+
+    def __init__(
+        self, encoding=None, wanted_entries=None, min_crossrefs=2, processes=1, cache=None, columnar=False,
+        **kwargs
+    ):
+        """
+        :param processes: The number of worker processes for parsing
+            files in parallel (see :py:meth:`parse_files`).
+            If None, use all available CPUs.
+        :param cache: A :py:class:`.ParseCache` or a cache directory.
+            If set, :py:meth:`parse_file` stores the parsed files in the cache
+            and loads them from the cache next time (see :py:meth:`parse_file_cached`).
+        :param columnar: If True, store the entries column-wise in a
+            :py:class:`.ColumnarBibliographyData`.
+        """
         self.encoding = encoding or pybtex.io.get_default_encoding()
-        self.data = BibliographyData(
+        data_type = ColumnarBibliographyData if columnar else BibliographyData
+        self.data = data_type(
             wanted_entries=wanted_entries,
             min_crossrefs=min_crossrefs,
         )
+        self.processes = processes if processes is not None else os.cpu_count()
+        if cache is not None and not isinstance(cache, ParseCache):
+            cache = ParseCache(cache)
+        self.cache = cache
 
     def parse_file(self, filename, file_suffix=None):
         if file_suffix is not None:
             filename = filename + file_suffix
         self.filename = filename
+        if self.cache is not None and _is_filename(filename):
+            return self.parse_file_cached(filename)
         open_file = pybtex.io.open_unicode if self.unicode_io else pybtex.io.open_raw
         with open_file(filename, encoding=self.encoding) as f:
             try:
@@ -56,10 +89,183 @@ class BaseParser(Plugin):
         return self.data
 
     def parse_files(self, base_filenames, file_suffix=None):
+        """Parse the files one after another into the same
+        :py:class:`.BibliographyData`.
+
+        If more than one worker process is allowed and there is no cache,
+        the files are parsed in parallel (see :py:meth:`parse_files_parallel`).
+        """
+        base_filenames = list(base_filenames)
+        if (
+            self.processes > 1 and self.cache is None
+            and len(base_filenames) > 1 and all(map(_is_filename, base_filenames))
+        ):
+            filenames = [
+                filename + file_suffix if file_suffix is not None else filename
+                for filename in base_filenames
+            ]
+            return self.parse_files_parallel(filenames)
         for filename in base_filenames:
             self.parse_file(filename, file_suffix)
         return self.data
 
+    def parse_files_parallel(self, filenames):
+        """Parse each file in a separate worker process and merge the results
+        in the given order.
+
+        The first occurrence of an entry wins and the repeated entries are
+        reported, as with sequential parsing. Errors reported while parsing
+        a file are reported before the entries from that file are added.
+        """
+        max_workers = min(self.processes, len(filenames))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_parse_file, type(self), self.encoding, filename)
+                for filename in filenames
+            ]
+            results = [future.result() for future in futures]
+
+        for parsed_file in results:
+            self.merge_parsed_file(parsed_file)
+        return self.data
+
+    def parse_file_cached(self, filename):
+        """Load the parsed file from the cache, or parse the file and store it in the cache.
+
+        The cache key depends on the absolute file name, the parser class and
+        the parser options (see :py:meth:`get_cache_options`).
+        A cached file is used as long as the file has the same size and
+        modification time, or the same contents.
+        """
+        with pybtex.io.open_raw(filename) as f:
+            stat = os.fstat(f.fileno())
+            key = make_cache_key(
+                os.path.abspath(f.name),
+                type(self).__module__,
+                type(self).__name__,
+                sorted(self.get_cache_options().items()),
+            )
+            parsed_file = self.cache.load(
+                key, stat.st_size, stat.st_mtime_ns, lambda: get_file_hash(f.read())
+            )
+            if parsed_file is None:
+                f.seek(0)
+                file_hash = get_file_hash(f.read())
+                parsed_file = self.parse_for_cache(filename)
+                self.cache.store(key, stat.st_size, stat.st_mtime_ns, file_hash, parsed_file)
+        self.merge_parsed_file(parsed_file)
+        return self.data
+
+    def get_cache_options(self):
+        """Return a dictionary of the parser options affecting the parsed data."""
+        return {'encoding': self.encoding}
+
+    def parse_for_cache(self, filename):
+        """Parse the file in isolation and return the data to be stored in the cache
+        and passed to :py:meth:`merge_parsed_file`.
+        """
+        return _parse_file(type(self), self.encoding, filename)
+
+    def merge_parsed_file(self, parsed_file):
+        """Add a file parsed in isolation to the bibliography data."""
+        packed_error, reported_errors, entries, preamble = parsed_file
+        for reported_error in reported_errors:
+            report_error(_unpack_error(reported_error))
+        if packed_error is not None:
+            raise _unpack_error(packed_error)
+        self.data.add_entries(entries)
+        self.data.add_to_preamble(*preamble)
+
+    def iter_entries(self, filename, file_suffix=None):
+        """Parse a file and yield ``(key, entry)`` pairs as soon as they are parsed.
+
+        The entries are not added to :py:attr:`data`, so memory usage
+        does not grow with the number of entries. Unlike :py:meth:`parse_file`,
+        repeated entries are not detected, and cross-referenced entries are
+        only yielded if they come after the entries referencing them.
+        The preamble is still added to :py:attr:`data`.
+        """
+        if file_suffix is not None:
+            filename = filename + file_suffix
+        self.filename = filename
+        open_file = pybtex.io.open_unicode if self.unicode_io else pybtex.io.open_raw
+        with open_file(filename, encoding=self.encoding) as f:
+            try:
+                for key, entry in self.filter_entries(self.iter_stream_entries(f)):
+                    yield key, entry
+            except UnicodeDecodeError as e:
+                raise PybtexError(str(e), filename=self.filename)
+
+    def iter_stream_entries(self, stream):
+        """Yield ``(key, entry)`` pairs parsed from the stream.
+
+        The default implementation parses the whole stream into :py:attr:`data` first.
+        Parsers that can parse entries one by one override it.
+        """
+        data = self.parse_stream(stream)
+        return iter(list(data.entries.items()))
+
+    def filter_entries(self, entries):
+        """Skip the unwanted entries, as :py:meth:`.BibliographyData.add_entry` does."""
+        data = self.data
+        for key, entry in entries:
+            if not data.want_entry(key):
+                continue
+            entry.key = data.get_canonical_key(key)
+            if data.wanted_entries is not None:
+                crossref = entry.fields.get('crossref')
+                if crossref is not None:
+                    data.wanted_entries.add(crossref)
+            yield entry.key, entry
+
+    async def parse_file_async(self, filename, file_suffix=None, executor=None):
+        """Parse a file without blocking the event loop.
+
+        The file is read and parsed in the executor (the default executor
+        of the event loop if None), :py:attr:`async_batch_size` entries at a time,
+        so that other tasks can run between the batches.
+        If the task is cancelled, parsing stops after the current batch.
+
+        Files that cannot be parsed entry by entry (see :py:meth:`can_stream`)
+        are parsed in a single executor call.
+        """
+        loop = asyncio.get_running_loop()
+        if not self.can_stream():
+            return await loop.run_in_executor(executor, self.parse_file, filename, file_suffix)
+
+        entries = self.iter_entries(filename, file_suffix)
+        batch = None
+        try:
+            while True:
+                batch = loop.run_in_executor(executor, self.parse_batch, entries)
+                # the executor job cannot be interrupted, so let it finish if the task is cancelled
+                if await asyncio.shield(batch):
+                    return self.data
+        finally:
+            if batch is None or batch.done():
+                entries.close()
+            else:
+                batch.add_done_callback(partial(_close_entries, entries))
+
+    async def parse_files_async(self, base_filenames, file_suffix=None, executor=None):
+        """Parse the files one after another with :py:meth:`parse_file_async`."""
+        for filename in base_filenames:
+            await self.parse_file_async(filename, file_suffix, executor)
+        return self.data
+
+    def can_stream(self):
+        """Return True if :py:meth:`iter_entries` gives the same results as :py:meth:`parse_file`."""
+        return self.cache is None
+
+    def parse_batch(self, entries):
+        """Add the next :py:attr:`async_batch_size` entries to :py:attr:`data`.
+
+        Return True if there are no entries left.
+        """
+        batch = list(islice(entries, self.async_batch_size))
+        self.data.add_entries(batch)
+        return len(batch) < self.async_batch_size
+
     def parse_string(self, value):
         if isinstance(value, bytes):
             msg = 'unicode string expected. Use {0}.parse_bytes() to parse bytes'.format(type(self).__name__)
@@ -80,3 +286,68 @@ class BaseParser(Plugin):
 
     def parse_stream(self, stream):
         raise NotImplementedError
+
+
+def _close_entries(entries, batch):
+    if not batch.cancelled():
+        # do not warn about exceptions nobody is waiting for
+        batch.exception()
+    entries.close()
+
+
+def _is_filename(filename_or_file):
+    return isinstance(filename_or_file, (str, bytes, os.PathLike))
+
+
+class _FrozenErrorContext(object):
+    """Stands in for the parser in errors sent from worker processes."""
+
+    def get_error_context(self, context_info):
+        return context_info
+
+
+def _pack_error(error):
+    # exceptions with custom __init__ signatures cannot be unpickled,
+    # and syntax errors refer to the whole parser
+    state = dict(error.__dict__)
+    parser = state.get('parser')
+    if parser is not None:
+        state['error_context_info'] = parser.get_error_context(error.error_context_info)
+        state['parser'] = _FrozenErrorContext()
+    return type(error), error.args, state
+
+
+def _unpack_error(packed_error, line_offset=0):
+    error_type, args, state = packed_error
+    error = error_type.__new__(error_type, *args)
+    error.args = args
+    error.__dict__.update(state)
+    if 'parser' in state:
+        context, lineno, colno = error.error_context_info
+        if lineno is not None:
+            lineno += line_offset
+        error.error_context_info = context, lineno, colno
+        if error.lineno is not None:
+            error.lineno += line_offset
+    return error
+
+
+def _parse_file(parser_type, encoding, filename):
+    """Parse a file in a worker process.
+
+    Return the error that stopped the parser, if any, the reported errors,
+    the entries and the preamble.
+    """
+    parser = parser_type(encoding=encoding)
+    packed_error = None
+    with pybtex.errors.capture() as reported_errors:
+        try:
+            parser.parse_file(filename)
+        except PybtexError as error:
+            packed_error = _pack_error(error)
+    return (
+        packed_error,
+        [_pack_error(error) for error in reported_errors],
+        list(parser.data.entries.items()),
+        parser.data.preamble_list,
+    )
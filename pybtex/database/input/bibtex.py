@@ -70,15 +70,27 @@ http://www.sciencemag.org/cgi/content/abstract/276/5315/1109
 """
 from __future__ import unicode_literals
 
+import io
+import mmap
+import os
 import re
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from string import ascii_letters, digits
 
+import pybtex.errors
+import pybtex.io
 from pybtex import textutils
 from pybtex.bibtex.utils import split_name_list
-from pybtex.database import Entry, Person, BibliographyDataError
-from pybtex.database.input import BaseParser
+from pybtex.database import Entry, LazyEntry, Person, BibliographyDataError
+from pybtex.errors import report_error
+from pybtex.database.input import BaseParser, _is_filename, _pack_error, _unpack_error
+from pybtex.database.input.index import BibliographyIndex, get_file_hash
+from pybtex.exceptions import PybtexError
 from pybtex.scanner import (
-    Literal, Pattern, PrematureEOF, PybtexSyntaxError, Scanner
+    Literal, Pattern, PatternGroup, PrematureEOF, PybtexSyntaxError, Scanner,
+    to_binary_regexp
 )
 from pybtex.utils import CaseInsensitiveDict, CaseInsensitiveSet
 
@@ -101,6 +113,21 @@ month_names = {
 NAME_CHARS = ascii_letters + u'@!$&*+-./:;<>?[\\]^_`|~\x7f'
 
 
+def _make_skip_fields_regexp(name, number, max_level=8):
+    """Make a regexp matching well-formed entry fields up to the closing delimiter.
+
+    Braced strings may have at most ``max_level`` levels of nested braces.
+    Backtracking is linear: the alternatives never match the same character.
+    """
+    braced = r'\{[^{}]*\}'
+    for level in range(max_level):
+        braced = r'\{[^{}]*(?:' + braced + r'[^{}]*)*\}'
+    quoted = r'"[^"{}]*(?:' + braced + r'[^"{}]*)*"'
+    value = '(?:' + '|'.join([quoted, braced, number, name]) + ')'
+    field = r'\s*' + name + r'\s*=\s*' + value + r'(?:\s*\#\s*' + value + ')*'
+    return r'(?:{0})?(?:\s*,(?:{0})?)*\s*(?=[)}}])'.format(field)
+
+
 class SkipEntry(Exception):
     pass
 
@@ -131,10 +158,13 @@ class LowLevelParser(Scanner):
     EQUALS = Literal(u'=')
     HASH = Literal(u'#')
     AT = Literal(u'@')
+    SKIP_FIELDS = re.compile(_make_skip_fields_regexp(NAME.regexp, NUMBER.regexp))
 
     command_start = None
     current_command = None
     current_entry_key = None
+    # the position of the fields of the current entry while they are being parsed
+    current_fields_start = None
     current_fields = None
     current_field_name = None
     current_field_value = None
@@ -196,6 +226,7 @@ class LowLevelParser(Scanner):
 
     def parse_command(self):
         self.current_entry_key = None
+        self.current_fields_start = None
         self.current_fields = []
         self.current_field_name = None
         self.current_value = []
@@ -219,6 +250,7 @@ class LowLevelParser(Scanner):
             make_result = lambda: (command, (self.current_entry_key, self.current_fields))
         try:
             parse_body(body_end)
+            self.current_fields_start = None
             self.required([body_end])
         except PybtexSyntaxError as error:
             self.handle_error(error)
@@ -237,9 +269,26 @@ class LowLevelParser(Scanner):
         if not self.keyless_entries:
             key_pattern = self.KEY_PAREN if body_end == self.RPAREN else self.KEY_BRACE
             self.current_entry_key = self.required([key_pattern]).value
-        self.parse_entry_fields()
+        self.current_fields_start = self.pos
         if not self.want_current_entry():
+            self.skip_entry_fields()
             raise SkipEntry
+        self.parse_entry_fields()
+
+    def skip_entry_fields(self):
+        """Skip the fields of an unwanted entry.
+
+        Well-formed fields are skipped with a single regexp match,
+        without building any values or substituting macros.
+        Anything unusual is parsed as usual, so that syntax errors are
+        reported and the parser stops in the same place.
+        """
+        match = self.SKIP_FIELDS.match(self.text, self.pos)
+        if match is None:
+            self.parse_entry_fields()
+        else:
+            self.update_lineno_range(self.pos, match.end())
+            self.pos = match.end()
 
     def parse_entry_fields(self):
         while True:
@@ -321,6 +370,322 @@ class LowLevelParser(Scanner):
                 raise PybtexSyntaxError('unbalanced braces', self)
 
 
+class FastLowLevelParser(LowLevelParser):
+    """A faster drop-in replacement for :py:class:`LowLevelParser`.
+
+    Each parser state has a single combined regular expression
+    (a :py:class:`~pybtex.scanner.PatternGroup`), so every token is fetched
+    with one regex call and returned as a plain ``(value, pattern)`` tuple.
+    Quoted and braced strings are scanned in a single loop over the
+    positions of special characters instead of a recursive generator.
+
+    The results, error messages and line numbers are the same as with
+    :py:class:`LowLevelParser`. Line numbers are only computed when an error
+    is reported (see :py:attr:`pybtex.scanner.Scanner.lazy_lineno`).
+    """
+
+    lazy_lineno = True
+
+    NAME_TOKEN = PatternGroup([LowLevelParser.NAME])
+    KEY_PAREN_TOKEN = PatternGroup([LowLevelParser.KEY_PAREN])
+    KEY_BRACE_TOKEN = PatternGroup([LowLevelParser.KEY_BRACE])
+    BODY_START_TOKEN = PatternGroup([LowLevelParser.LPAREN, LowLevelParser.LBRACE])
+    RPAREN_TOKEN = PatternGroup([LowLevelParser.RPAREN])
+    RBRACE_TOKEN = PatternGroup([LowLevelParser.RBRACE])
+    COMMA_TOKEN = PatternGroup([LowLevelParser.COMMA])
+    EQUALS_TOKEN = PatternGroup([LowLevelParser.EQUALS])
+    HASH_TOKEN = PatternGroup([LowLevelParser.HASH])
+    VALUE_TOKEN = PatternGroup(
+        [LowLevelParser.QUOTE, LowLevelParser.LBRACE, LowLevelParser.NUMBER, LowLevelParser.NAME],
+        description='field value',
+    )
+    FIELD_START = re.compile(r'\s*(?P<name>{0})\s*=\s*(?:{1})'.format(
+        LowLevelParser.NAME.regexp, VALUE_TOKEN.alternatives,
+    ))
+    QUOTED_STRING_SPECIAL = re.compile(r'["{}]')
+    BRACED_STRING_SPECIAL = re.compile(r'[{}]')
+    AT_CHAR = '@'
+    LBRACE_CHAR = '{'
+    RBRACE_CHAR = '}'
+
+    def parse_bibliography(self):
+        text = self.text
+        at_char = self.AT_CHAR
+        while True:
+            at = text.find(at_char, self.pos)
+            if at == -1:
+                return
+            self.skip_scanned(self.pos, at + 1)
+            self.command_start = at
+            try:
+                yield tuple(self.parse_command())
+            except PybtexSyntaxError as error:
+                self.handle_error(error)
+            except SkipEntry:
+                pass
+
+    def parse_command(self):
+        self.current_entry_key = None
+        self.current_fields_start = None
+        self.current_fields = []
+        self.current_field_name = None
+        self.current_value = []
+
+        command, _ = self.required_tuple(self.NAME_TOKEN)
+        _, body_start = self.required_tuple(self.BODY_START_TOKEN)
+        body_end = self.RBRACE if body_start is self.LBRACE else self.RPAREN
+
+        command_lower = command.lower()
+        if command_lower == 'string':
+            parse_body = self.parse_string_body
+            make_result = lambda: (command, (self.current_field_name, self.current_value))
+        elif command_lower == 'preamble':
+            parse_body = self.parse_preamble_body
+            make_result = lambda: (command, (self.current_value,))
+        elif command_lower == 'comment':
+            raise SkipEntry
+        else:
+            parse_body = self.parse_entry_body
+            make_result = lambda: (command, (self.current_entry_key, self.current_fields))
+        try:
+            parse_body(body_end)
+            self.current_fields_start = None
+            self.required_tuple(self.RBRACE_TOKEN if body_end is self.RBRACE else self.RPAREN_TOKEN)
+        except PybtexSyntaxError as error:
+            self.handle_error(error)
+        return make_result()
+
+    def parse_string_body(self, body_end):
+        self.current_field_name, _ = self.required_tuple(self.NAME_TOKEN)
+        self.required_tuple(self.EQUALS_TOKEN)
+        self.parse_value()
+        self.macros[self.current_field_name] = ''.join(self.current_value)
+
+    def parse_entry_body(self, body_end):
+        if not self.keyless_entries:
+            key_token = self.KEY_PAREN_TOKEN if body_end is self.RPAREN else self.KEY_BRACE_TOKEN
+            self.current_entry_key, _ = self.required_tuple(key_token)
+        self.current_fields_start = self.pos
+        if not self.want_current_entry():
+            self.skip_entry_fields()
+            raise SkipEntry
+        self.parse_entry_fields()
+
+    def parse_entry_fields(self):
+        while True:
+            self.current_field_name = None
+            self.current_value = []
+            self.parse_field()
+            if self.current_field_name and self.current_value:
+                self.current_fields.append((self.current_field_name, self.current_value))
+            if not self.get_token_tuple(self.COMMA_TOKEN):
+                return
+
+    def parse_field(self):
+        # fast path for the common "name = value" case
+        match = self.FIELD_START.match(self.text, self.pos)
+        if match:
+            self.parse_value([self.parse_field_start(match)])
+            return
+
+        name = self.get_token_tuple(self.NAME_TOKEN)
+        if not name:
+            return
+        self.current_field_name = name[0]
+        self.required_tuple(self.EQUALS_TOKEN)
+        self.parse_value()
+
+    def parse_field_start(self, match):
+        self.skip_scanned(self.pos, match.end())
+        self.current_field_name = match.group('name')
+        value_group = match.lastgroup
+        return self.make_value_part(match.group(value_group), self.VALUE_TOKEN.patterns[value_group])
+
+    def parse_value(self, value_parts=None):
+        if value_parts is None:
+            value_parts = [self.parse_value_part()]
+        while self.get_token_tuple(self.HASH_TOKEN):
+            value_parts.append(self.parse_value_part())
+        self.current_value = value_parts
+
+    def parse_value_part(self):
+        return self.make_value_part(*self.required_tuple(self.VALUE_TOKEN))
+
+    def make_value_part(self, value, pattern):
+        if pattern is self.QUOTE:
+            return self.scan_string(quoted=True)
+        elif pattern is self.LBRACE:
+            return self.scan_string(quoted=False)
+        elif pattern is self.NUMBER:
+            return value
+        else:
+            return self.substitute_macro(value)
+
+    def scan_string(self, quoted, max_level=100):
+        """Skip to the end of a quoted or braced string and return its contents.
+
+        Must be called right after the opening quote or brace.
+        """
+        text = self.text
+        lbrace = self.LBRACE_CHAR
+        rbrace = self.RBRACE_CHAR
+        start = pos = self.pos
+        level = 0
+        search_quoted = self.QUOTED_STRING_SPECIAL.search
+        search_braced = self.BRACED_STRING_SPECIAL.search
+        while True:
+            search = search_quoted if quoted and level == 0 else search_braced
+            match = search(text, pos)
+            if match is None:
+                self.skip_scanned(start, pos)
+                raise PrematureEOF(self)
+            pos = match.end()
+            char = match.group()
+            if char == lbrace:
+                level += 1
+                if level > max_level:
+                    self.skip_scanned(start, pos)
+                    raise PybtexSyntaxError('too many nested braces', self)
+            elif char == rbrace and level > 0:
+                level -= 1
+            elif char == rbrace and quoted:
+                self.skip_scanned(start, pos)
+                raise PybtexSyntaxError('unbalanced braces', self)
+            else:
+                self.skip_scanned(start, pos)
+                return text[start:pos - 1]
+
+    def skip_scanned(self, start, end):
+        if not self.lazy_lineno:
+            self.update_lineno_range(start, end)
+        self.pos = end
+
+
+class BytesLowLevelParser(FastLowLevelParser):
+    """A :py:class:`FastLowLevelParser` working on undecoded bytes.
+
+    The input can be a :py:class:`bytes` object or a memory-mapped file.
+    The structure of the file is scanned without decoding it: only names,
+    keys and field values are decoded, and field values of unwanted entries
+    are not decoded at all.
+
+    The encoding must be ASCII-compatible
+    (see :py:func:`pybtex.io.is_ascii_compatible`).
+    Unlike with text parsers, non-ASCII whitespace between tokens is
+    a syntax error.
+    """
+
+    NAME_TOKEN = PatternGroup([LowLevelParser.NAME], binary=True)
+    KEY_PAREN_TOKEN = PatternGroup([LowLevelParser.KEY_PAREN], binary=True)
+    KEY_BRACE_TOKEN = PatternGroup([LowLevelParser.KEY_BRACE], binary=True)
+    BODY_START_TOKEN = PatternGroup([LowLevelParser.LPAREN, LowLevelParser.LBRACE], binary=True)
+    RPAREN_TOKEN = PatternGroup([LowLevelParser.RPAREN], binary=True)
+    RBRACE_TOKEN = PatternGroup([LowLevelParser.RBRACE], binary=True)
+    COMMA_TOKEN = PatternGroup([LowLevelParser.COMMA], binary=True)
+    EQUALS_TOKEN = PatternGroup([LowLevelParser.EQUALS], binary=True)
+    HASH_TOKEN = PatternGroup([LowLevelParser.HASH], binary=True)
+    VALUE_TOKEN = PatternGroup(
+        [LowLevelParser.QUOTE, LowLevelParser.LBRACE, LowLevelParser.NUMBER, LowLevelParser.NAME],
+        description='field value', binary=True,
+    )
+    FIELD_START = re.compile(to_binary_regexp(FastLowLevelParser.FIELD_START.pattern))
+    SKIP_FIELDS = re.compile(to_binary_regexp(LowLevelParser.SKIP_FIELDS.pattern))
+    QUOTED_STRING_SPECIAL = re.compile(br'["{}]')
+    BRACED_STRING_SPECIAL = re.compile(br'[{}]')
+    NEWLINE_BYTES = re.compile(br'\n|\r\n|\r')
+    AT_CHAR = b'@'
+    LBRACE_CHAR = b'{'
+    RBRACE_CHAR = b'}'
+
+    decode_values = True
+
+    def __init__(self, data, encoding='UTF-8', **kwargs):
+        super(BytesLowLevelParser, self).__init__(data, **kwargs)
+        self.encoding = encoding
+
+    def get_line_starts(self):
+        if self._line_starts is None:
+            line_starts = array('q', [0])
+            line_starts.extend(match.end() for match in self.NEWLINE_BYTES.finditer(self.text))
+            self._line_starts = line_starts
+        return self._line_starts
+
+    def get_error_context_info(self):
+        # the data may be already unmapped when the error is displayed,
+        # so extract the context right away
+        text = self.text
+        error_start, error_pos = self.command_start, self.pos
+        before_error = text[error_start:error_pos].decode(self.encoding, 'replace')
+        if not before_error.endswith('\n'):
+            eol = self.NEWLINE_BYTES.search(text, error_pos)
+            error_end = eol.end() if eol else self.end_pos
+        else:
+            error_end = error_pos
+        context = text[error_start:error_end].decode(self.encoding, 'replace').rstrip('\r\n')
+        colno = len(before_error.splitlines()[-1])
+        return context, self.lineno, colno
+
+    def get_error_context(self, context_info):
+        return context_info
+
+    def get_token_tuple(self, group):
+        pos = self.pos
+        match = group.match(self.text, pos)
+        group_name = match.lastgroup
+        if group_name is None:
+            self.pos = match.end()
+        else:
+            self.pos = match.start(group_name)
+        if self.pos == self.end_pos:
+            raise PrematureEOF(self)
+        if group_name is None:
+            return None
+        self.pos = match.end()
+        return match.group(group_name).decode(self.encoding), group.patterns[group_name]
+
+    def parse_entry_fields(self):
+        self.decode_values = self.want_current_entry()
+        try:
+            super(BytesLowLevelParser, self).parse_entry_fields()
+        finally:
+            self.decode_values = True
+
+    def parse_field_start(self, match):
+        self.skip_scanned(self.pos, match.end())
+        self.current_field_name = match.group('name').decode('ascii')
+        value_group = match.lastgroup
+        value = match.group(value_group).decode('ascii')
+        return self.make_value_part(value, self.VALUE_TOKEN.patterns[value_group])
+
+    def scan_string(self, quoted, max_level=100):
+        value = super(BytesLowLevelParser, self).scan_string(quoted, max_level)
+        return value.decode(self.encoding) if self.decode_values else ''
+
+
+class _IndexingParser(BytesLowLevelParser):
+    """Scans the file for :py:meth:`Parser.build_index`.
+
+    Only the crossref fields are decoded. Macros are not substituted
+    but recorded in :py:attr:`referenced_macros`.
+    """
+
+    def parse_command(self):
+        self.crossref = None
+        self.referenced_macros = []
+        return super(_IndexingParser, self).parse_command()
+
+    def substitute_macro(self, name):
+        self.referenced_macros.append(name)
+        return ''
+
+    def scan_string(self, quoted, max_level=100):
+        value = FastLowLevelParser.scan_string(self, quoted, max_level)
+        if self.current_entry_key is not None and self.current_field_name.lower() == 'crossref':
+            self.crossref = value.decode(self.encoding)
+            return self.crossref
+        return ''
+
+
 class BibTeXEntryIterator(LowLevelParser):
     def __init__(self, *args, **kwargs):
         import warnings
@@ -334,6 +699,15 @@ class Parser(BaseParser):
     unicode_io = True
 
     macros = None
+    low_level_parser = FastLowLevelParser
+
+    min_chunk_size = 1 << 18
+    """Texts shorter than two chunks are never parsed in parallel."""
+
+    index_suffix = '.pybtex-index'
+
+    CHUNK_BOUNDARY = re.compile(r'[\r\n][ \t]*@')
+    STRING_COMMAND = re.compile(r'@\s*string\s*[({]', re.IGNORECASE)
 
     def __init__(
         self,
@@ -341,26 +715,62 @@ class Parser(BaseParser):
         macros=month_names,
         person_fields=Person.valid_roles,
         keyless_entries=False,
+        low_level_parser=None,
+        memory_map=False,
+        use_index=False,
+        lazy_entries=False,
         **kwargs
     ):
+        """
+        :param low_level_parser: The tokenizer class to use,
+            :py:class:`FastLowLevelParser` by default.
+            Pass :py:class:`LowLevelParser` to use the older
+            pattern-by-pattern tokenizer.
+        :param memory_map: If True, :py:meth:`parse_file` memory-maps the file
+            and parses it with :py:class:`BytesLowLevelParser` instead of
+            reading and decoding it as a whole.
+            Ignored if the encoding is not ASCII-compatible.
+        :param use_index: If True and only some entries are wanted,
+            :py:meth:`parse_file` parses only the wanted entries, using
+            a sidecar index file with byte offsets of all commands
+            (see :py:mod:`pybtex.database.input.index`).
+            The index is created or updated as needed.
+            Ignored if the encoding is not ASCII-compatible.
+        :param lazy_entries: If True, create :py:class:`.LazyEntry` objects
+            that build their fields and persons on first access.
+
+        If more than one worker process is allowed (see
+        :py:class:`.BaseParser`), large strings and multiple files are parsed
+        in parallel (see :py:meth:`parse_string` and :py:meth:`parse_files`).
+        """
         BaseParser.__init__(self, encoding, **kwargs)
 
         self.macros = CaseInsensitiveDict(macros)
         self.person_fields = CaseInsensitiveSet(person_fields)
         self.keyless_entries = keyless_entries
+        if low_level_parser is not None:
+            self.low_level_parser = low_level_parser
+        self.memory_map = memory_map
+        self.use_index = use_index
+        self.lazy_entries = lazy_entries
 
     def process_entry(self, entry_type, key, fields):
-        entry = Entry(entry_type)
-
         if key is None:
             key = 'unnamed-%i' % self.unnamed_entry_counter
             self.unnamed_entry_counter += 1
+        self.data.add_entry(key, self.make_entry(entry_type, key, fields))
 
+    def make_entry(self, entry_type, key, fields):
+        if self.lazy_entries:
+            return self.make_lazy_entry(entry_type, key, fields)
+        entry = Entry(entry_type)
         seen_fields = set()
         for field_name, field_value_list in fields:
             if field_name.lower() in seen_fields:
                 self.handle_error(DuplicateField(key, field_name))
                 continue
+            # share field names between entries
+            field_name = sys.intern(field_name)
 
             field_value = textutils.normalize_whitespace(self.flatten_value_list(field_value_list))
             if field_name in self.person_fields:
@@ -369,11 +779,24 @@ class Parser(BaseParser):
             else:
                 entry.fields[field_name] = field_value
             seen_fields.add(field_name.lower())
-        self.data.add_entry(key, entry)
+        return entry
+
+    def make_lazy_entry(self, entry_type, key, fields):
+        raw_fields = []
+        seen_fields = set()
+        for field_name, field_value_list in fields:
+            if field_name.lower() in seen_fields:
+                self.handle_error(DuplicateField(key, field_name))
+                continue
+            raw_fields.append((sys.intern(field_name), self.flatten_value_list(field_value_list)))
+            seen_fields.add(field_name.lower())
+        return LazyEntry(entry_type, raw_fields, self.person_fields)
 
     def process_preamble(self, value_list):
-        value = textutils.normalize_whitespace(self.flatten_value_list(value_list))
-        self.data.add_to_preamble(value)
+        self.data.add_to_preamble(self.make_preamble(value_list))
+
+    def make_preamble(self, value_list):
+        return textutils.normalize_whitespace(self.flatten_value_list(value_list))
 
     def flatten_value_list(self, value_list):
         return ''.join(value_list)
@@ -383,28 +806,541 @@ class Parser(BaseParser):
         report_error(error)
 
     def parse_string(self, text):
+        """Parse a string.
+
+        If more than one worker process is allowed, large strings
+        are split at top-level ``@`` commands and the chunks are parsed
+        in parallel (see :py:meth:`parse_string_parallel`).
+        """
+        if self.processes > 1:
+            chunks = self.split_text(text)
+            if len(chunks) > 1:
+                return self.parse_string_parallel(text, chunks)
+        return self._parse(self.low_level_parser, text)
+
+    def split_text(self, text):
+        """Split the text into chunks for parallel parsing.
+
+        Return a list of (start, end) tuples.
+        Chunks start at ``@`` characters at the beginning of a line.
+        """
+        if self.keyless_entries:
+            # unnamed entry counters depend on preceding chunks
+            return [(0, len(text))]
+        num_chunks = min(self.processes * 4, len(text) // self.min_chunk_size)
+        if num_chunks < 2:
+            return [(0, len(text))]
+        chunk_size = len(text) // num_chunks
+        boundaries = [0]
+        while True:
+            match = self.CHUNK_BOUNDARY.search(text, boundaries[-1] + chunk_size)
+            if not match:
+                break
+            boundaries.append(match.end() - 1)
+        boundaries.append(len(text))
+        return list(zip(boundaries, boundaries[1:]))
+
+    def parse_string_parallel(self, text, chunks):
+        """Parse the chunks of the text in parallel worker processes.
+
+        If a chunk boundary turns out to be inside a command,
+        or some ``@string`` command was not found by the first pass,
+        the text is parsed sequentially (see :py:meth:`parse_in_parallel`).
+        """
+        line_scanner = Scanner(text)
+        parts = [
+            (text[start:end], self.filename, line_scanner.get_lineno(start) - 1, end == len(text))
+            for start, end in chunks
+        ]
+        if not self.parse_in_parallel(parts):
+            self._parse(self.low_level_parser, text)
+        return self.data
+
+    def parse_files(self, base_filenames, file_suffix=None):
+        """Parse the files one after another.
+
+        If more than one worker process is allowed and there is no cache,
+        the files are read and then parsed in parallel (see :py:meth:`parse_in_parallel`).
+        ``@string`` macros defined in one file can be used in the following files.
+        """
+        base_filenames = list(base_filenames)
+        if (
+            self.processes <= 1 or len(base_filenames) < 2 or self.keyless_entries
+            or self.index_enabled() or self.cache is not None
+            or not all(map(_is_filename, base_filenames))
+        ):
+            return super(Parser, self).parse_files(base_filenames, file_suffix)
+
+        parts = []
+        for filename in base_filenames:
+            if file_suffix is not None:
+                filename = filename + file_suffix
+            parts.append((self.read_file(filename), filename, 0, True))
+        if not self.parse_in_parallel(parts):
+            for text, filename, line_offset, complete in parts:
+                self.filename = filename
+                self._parse(self.low_level_parser, text)
+        return self.data
+
+    def read_file(self, filename):
+        with pybtex.io.open_unicode(filename, encoding=self.encoding) as f:
+            try:
+                return f.read()
+            except UnicodeDecodeError as e:
+                raise PybtexError(str(e), filename=filename)
+
+    def parse_in_parallel(self, parts):
+        """Parse texts in parallel worker processes and merge the results in order.
+
+        ``parts`` is a list of (text, filename, line_offset, complete) tuples.
+        ``line_offset`` is added to line numbers in error messages.
+        ``complete`` is False if the text is a chunk of a larger text
+        and its last command may be incomplete.
+
+        Each worker gets the ``@string`` macros defined before its text.
+        The macros are collected beforehand by parsing only ``@string``
+        commands. Workers do not skip any entries, and the entries not wanted
+        at the time of merging are dropped along with their errors.
+        Thus the entries, macros and errors are the same as with sequential parsing.
+
+        Return False and do nothing if the texts cannot be parsed
+        independently of each other.
+        """
+        texts = [text for text, filename, line_offset, complete in parts]
+        macros_by_part, definitions_by_part = self.collect_macros(texts)
+        options = self.get_worker_options()
+        max_workers = min(self.processes, len(parts))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_parse_chunk, dict(options, filename=filename), text, macros)
+                for (text, filename, line_offset, complete), macros in zip(parts, macros_by_part)
+            ]
+            results = [future.result() for future in futures]
+
+        for (text, filename, line_offset, complete), events, definitions in zip(parts, results, definitions_by_part):
+            if not _check_chunk_events(events, definitions, complete):
+                return False
+
+        for (text, filename, line_offset, complete), events in zip(parts, results):
+            self.replay_events(events, line_offset)
+        return True
+
+    def get_worker_options(self):
+        """Return the options for :py:class:`_ChunkParser`."""
+        return {
+            'encoding': self.encoding,
+            'person_fields': list(self.person_fields),
+            'keyless_entries': self.keyless_entries,
+            'low_level_parser': self.low_level_parser,
+            'lazy_entries': self.lazy_entries,
+        }
+
+    def replay_events(self, events, line_offset=0):
+        """Add the entries, preamble values, macros and errors recorded by :py:class:`_ChunkParser`.
+
+        Entries not wanted at this point are dropped along with their errors.
+        """
+        for event in events:
+            event_type = event[0]
+            if event_type == 'entry':
+                key, entry, entry_errors = event[1:]
+                if self.data.want_entry(key):
+                    self.replay_errors(entry_errors, line_offset)
+                    self.data.add_entry(key, entry)
+            elif event_type == 'preamble':
+                self.data.add_to_preamble(event[1])
+            elif event_type == 'macro':
+                self.macros[event[1]] = event[2]
+            else:
+                key = event[2]
+                if key is None or self.data.want_entry(key):
+                    self.replay_errors([event[1]], line_offset)
+
+    def replay_errors(self, errors, line_offset):
+        for error_type, packed_error in errors:
+            error = _unpack_error(packed_error, line_offset)
+            if error_type == 'handled_error':
+                self.handle_error(error)
+            else:
+                report_error(error)
+
+    def collect_macros(self, texts):
+        """Parse all ``@string`` commands and return the macros defined
+        before each text, and the macros defined in each text.
+        """
+        macros_by_text = []
+        definitions_by_text = []
+
+        def record(name, value):
+            definitions_by_text[-1].append((name, value))
+
+        macros = _RecordingMacros(self.macros, record)
+        for text in texts:
+            macros_by_text.append(list(macros.items()))
+            definitions_by_text.append([])
+            string_parser = self.low_level_parser(text, macros=macros, handle_error=lambda error: None)
+            for match in self.STRING_COMMAND.finditer(text):
+                string_parser.pos = match.start() + 1
+                string_parser.command_start = match.start()
+                try:
+                    string_parser.parse_command()
+                except (PybtexSyntaxError, SkipEntry):
+                    pass
+        return macros_by_text, definitions_by_text
+
+    def parse_buffer(self, data):
+        """Parse bytes or a memory-mapped file without decoding it first.
+
+        The encoding must be ASCII-compatible.
+        """
+        return self._parse(BytesLowLevelParser, data, encoding=self.encoding)
+
+    def parse_file(self, filename, file_suffix=None):
+        use_cache = self.cache is not None and _is_filename(filename)
+        use_index = self.index_enabled() and _is_filename(filename)
+        use_memory_map = (
+            self.memory_map and pybtex.io.is_ascii_compatible(self.encoding)
+            # text streams are already decoded
+            and not isinstance(filename, io.TextIOBase)
+        )
+        if use_cache or not (use_index or use_memory_map):
+            return super(Parser, self).parse_file(filename, file_suffix)
+
+        if file_suffix is not None:
+            filename = filename + file_suffix
+        self.filename = filename
+        with pybtex.io.open_raw(filename) as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError, io.UnsupportedOperation):
+                # empty files and in-memory streams cannot be mapped
+                data = f.read()
+            try:
+                index = self.get_index(f, data) if use_index else None
+                if index is not None:
+                    self.parse_indexed(data, index)
+                elif use_memory_map:
+                    self.parse_buffer(data)
+            except UnicodeDecodeError as e:
+                raise PybtexError(str(e), filename=self.filename)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+        if index is None and not use_memory_map:
+            return super(Parser, self).parse_file(filename)
+        return self.data
+
+    def iter_entries(self, filename, file_suffix=None):
+        """Parse a file and yield ``(key, entry)`` pairs as soon as they are parsed
+        (see :py:meth:`.BaseParser.iter_entries`).
+
+        With ``memory_map=True``, the file is memory-mapped instead of being
+        read into memory as a whole.
+        """
+        if not (self.memory_map and pybtex.io.is_ascii_compatible(self.encoding)):
+            for key, entry in super(Parser, self).iter_entries(filename, file_suffix):
+                yield key, entry
+            return
+
+        if file_suffix is not None:
+            filename = filename + file_suffix
+        self.filename = filename
+        with pybtex.io.open_raw(filename) as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError, io.UnsupportedOperation):
+                data = f.read()
+            try:
+                if isinstance(data, str):
+                    entries = self._iter_entries(self.low_level_parser, data)
+                else:
+                    entries = self._iter_entries(BytesLowLevelParser, data, encoding=self.encoding)
+                for key, entry in self.filter_entries(entries):
+                    yield key, entry
+            except UnicodeDecodeError as e:
+                raise PybtexError(str(e), filename=self.filename)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+    def can_stream(self):
+        return super(Parser, self).can_stream() and not self.index_enabled()
+
+    def get_cache_options(self):
+        options = super(Parser, self).get_cache_options()
+        options.update(
+            macros=sorted(self.macros.items()),
+            person_fields=sorted(self.person_fields),
+            keyless_entries=self.keyless_entries,
+            low_level_parser=self.low_level_parser,
+            lazy_entries=self.lazy_entries,
+        )
+        return options
+
+    def parse_for_cache(self, filename):
+        """Parse the file with the macros defined so far, without skipping any entries.
+
+        Return the list of events recorded by :py:class:`_ChunkParser`.
+        """
+        text = self.read_file(filename)
+        chunk_parser = _ChunkParser(filename=filename, **self.get_worker_options())
+        return chunk_parser.parse_chunk(text, list(self.macros.items()))
+
+    def merge_parsed_file(self, events):
+        self.replay_events(events)
+
+    def index_enabled(self):
+        wanted_entries = self.data.wanted_entries
+        return (
+            self.use_index
+            and wanted_entries is not None
+            and '*' not in wanted_entries
+            and not self.keyless_entries
+            and pybtex.io.is_ascii_compatible(self.encoding)
+        )
+
+    def get_index(self, f, data):
+        """Load the index for an open file, or build a new one.
+
+        Return None if the file cannot be indexed.
+        """
+        index_filename = f.name + self.index_suffix
+        stat = os.fstat(f.fileno())
+        index = BibliographyIndex.load(index_filename)
+        if index is None or not index.is_valid(
+            self.encoding, stat.st_size, stat.st_mtime_ns, lambda: get_file_hash(data)
+        ):
+            index = self.build_index(data, stat.st_size, stat.st_mtime_ns)
+            index.changed = True
+        if index.changed:
+            index.save(index_filename)
+        return index if index.commands is not None else None
+
+    def build_index(self, data, file_size, file_mtime):
+        """Scan the file and index all commands (see :py:mod:`pybtex.database.input.index`).
+
+        Files with syntax or encoding errors are not indexed, so that the
+        errors are reported by the regular parser.
+        """
+        index = BibliographyIndex(self.encoding, file_size, file_mtime, get_file_hash(data), None)
+        try:
+            str(data, self.encoding)
+        except UnicodeDecodeError:
+            return index
+
+        errors = []
+        indexer = _IndexingParser(data, encoding=self.encoding, macros={}, handle_error=errors.append)
+        commands = []
+        for command, args in indexer.parse_bibliography():
+            command = command.lower()
+            if command not in ('string', 'preamble'):
+                command = 'entry'
+            key = args[0] if command != 'preamble' else None
+            commands.append((command, key, indexer.command_start, indexer.pos, indexer.crossref, indexer.referenced_macros))
+        if all(isinstance(error, UndefinedMacro) for error in errors):
+            index.commands = commands
+        return index
+
+    def parse_indexed(self, data, index):
+        """Parse only the wanted entries, the ``@string`` and the ``@preamble`` commands."""
+        self.unnamed_entry_counter = 1
+        parser = BytesLowLevelParser(
+            data,
+            encoding=self.encoding,
+            handle_error=self.handle_error,
+            want_entry=self.data.want_entry,
+            filename=self.filename,
+            macros=self.macros,
+        )
+        want_entry = self.data.want_entry
+        for command, key, start, end, crossref, macros in index.commands:
+            if command == 'entry' and not want_entry(key):
+                continue
+            parser.pos = start + 1
+            parser.command_start = start
+            try:
+                self.process_command(tuple(parser.parse_command()))
+            except PybtexSyntaxError as error:
+                self.handle_error(error)
+            except SkipEntry:
+                pass
+        return self.data
+
+    def _parse(self, low_level_parser, text, **kwargs):
         self.unnamed_entry_counter = 1
         self.command_start = 0
 
-        entry_iterator = LowLevelParser(
+        entry_iterator = low_level_parser(
             text,
             keyless_entries=self.keyless_entries,
             handle_error=self.handle_error,
             want_entry=self.data.want_entry,
             filename=self.filename,
             macros=self.macros,
+            **kwargs
         )
         for entry in entry_iterator:
-            entry_type = entry[0]
+            self.process_command(entry)
+        return self.data
+
+    def _iter_entries(self, low_level_parser, text, **kwargs):
+        """Like :py:meth:`_parse`, but yield the entries instead of adding them to :py:attr:`data`."""
+        self.unnamed_entry_counter = 1
+        self.command_start = 0
+
+        entry_iterator = low_level_parser(
+            text,
+            keyless_entries=self.keyless_entries,
+            handle_error=self.handle_error,
+            want_entry=self.data.want_entry,
+            filename=self.filename,
+            macros=self.macros,
+            **kwargs
+        )
+        for command in entry_iterator:
+            entry_type = command[0]
             entry_type_lower = entry_type.lower()
             if entry_type_lower == 'string':
                 pass
             elif entry_type_lower == 'preamble':
-                self.process_preamble(*entry[1])
+                self.process_preamble(*command[1])
             else:
-                self.process_entry(entry_type, *entry[1])
-        return self.data
+                key, fields = command[1]
+                if key is None:
+                    key = 'unnamed-%i' % self.unnamed_entry_counter
+                    self.unnamed_entry_counter += 1
+                yield key, self.make_entry(entry_type, key, fields)
+
+    def process_command(self, entry):
+        entry_type = entry[0]
+        entry_type_lower = entry_type.lower()
+        if entry_type_lower == 'string':
+            pass
+        elif entry_type_lower == 'preamble':
+            self.process_preamble(*entry[1])
+        else:
+            self.process_entry(entry_type, *entry[1])
 
     def parse_stream(self, stream):
         text = stream.read()
         return self.parse_string(text)
+
+    def iter_stream_entries(self, stream):
+        text = stream.read()
+        return self._iter_entries(self.low_level_parser, text)
+
+
+class _RecordingMacros(CaseInsensitiveDict):
+    """A macro dictionary calling ``record(name, value)`` on every new macro definition."""
+
+    def __init__(self, macros, record):
+        super(_RecordingMacros, self).__init__(macros)
+        self.record = record
+
+    def __setitem__(self, key, value):
+        self.record(key, value)
+        super(_RecordingMacros, self).__setitem__(key, value)
+
+
+def _check_chunk_events(events, definitions, complete):
+    """Check that a chunk was parsed the same way as it would be parsed as part of the whole text."""
+    chunk_definitions = [(event[1], event[2]) for event in events if event[0] == 'macro']
+    if chunk_definitions != definitions:
+        return False
+    if not complete:
+        # the last command of the chunk is incomplete
+        for event in events:
+            if event[0] == 'error' and issubclass(event[1][1][0], PrematureEOF):
+                return False
+    return True
+
+
+class _ChunkParser(Parser):
+    """Parses a chunk of text in a worker process.
+
+    Instead of building a :py:class:`.BibliographyData`, return a list of
+    entries, preamble values, macro definitions and errors, in order.
+    Errors that would not be reported if the current entry were not wanted
+    are tagged with the entry key.
+    """
+
+    def __init__(self, filename, **kwargs):
+        super(_ChunkParser, self).__init__(**kwargs)
+        self.filename = filename
+        self.events = []
+        self.captured_errors = []
+        self.entry_errors = None
+
+    def flush_captured_errors(self):
+        for error in self.captured_errors:
+            self.add_error('reported_error', error)
+        del self.captured_errors[:]
+
+    def add_error(self, error_type, error, key=None):
+        packed_error = error_type, _pack_error(error)
+        if self.entry_errors is not None:
+            self.entry_errors.append(packed_error)
+        else:
+            self.events.append(('error', packed_error, key))
+
+    def handle_error(self, error):
+        self.flush_captured_errors()
+        self.add_error('handled_error', error, self.get_skipped_error_key(error))
+
+    def get_skipped_error_key(self, error):
+        """Return the entry key if the error would not be reported
+        if the entry were not wanted, otherwise None.
+
+        Unwanted entries are skipped without checking the end of the entry
+        or substituting macros, and their fields are parsed only if they
+        cannot be skipped with :py:attr:`LowLevelParser.SKIP_FIELDS`.
+        """
+        parser = getattr(error, 'parser', None)
+        if parser is None or parser.current_entry_key is None:
+            return None
+        fields_start = parser.current_fields_start
+        if (
+            isinstance(error, UndefinedMacro) or fields_start is None
+            or parser.SKIP_FIELDS.match(parser.text, fields_start)
+        ):
+            return parser.current_entry_key
+        return None
+
+    def define_macro(self, name, value):
+        self.flush_captured_errors()
+        self.events.append(('macro', name, value))
+
+    def process_entry(self, entry_type, key, fields):
+        keyless = key is None
+        if keyless:
+            key = 'unnamed-%i' % self.unnamed_entry_counter
+            self.unnamed_entry_counter += 1
+        self.flush_captured_errors()
+        self.entry_errors = []
+        try:
+            entry = self.make_entry(entry_type, key, fields)
+            self.flush_captured_errors()
+        finally:
+            entry_errors, self.entry_errors = self.entry_errors, None
+        if keyless:
+            # keyless entries are never skipped, so their errors are always reported
+            self.events.extend(('error', error, None) for error in entry_errors)
+            entry_errors = []
+        self.events.append(('entry', key, entry, entry_errors))
+
+    def process_preamble(self, value_list):
+        value = self.make_preamble(value_list)
+        self.flush_captured_errors()
+        self.events.append(('preamble', value))
+
+    def parse_chunk(self, text, macros):
+        self.macros = _RecordingMacros(macros, self.define_macro)
+        with pybtex.errors.capture() as captured_errors:
+            self.captured_errors = captured_errors
+            self._parse(self.low_level_parser, text)
+            self.flush_captured_errors()
+        return self.events
+
+
+def _parse_chunk(options, text, macros):
+    return _ChunkParser(**options).parse_chunk(text, macros)
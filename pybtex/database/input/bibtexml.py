@@ -21,6 +21,7 @@
 
 from __future__ import unicode_literals
 
+import sys
 from xml.etree import ElementTree as ET
 
 from pybtex.database import Entry, Person
@@ -53,6 +54,23 @@ class Parser(BaseParser):
         self.data.add_entries(self.process_entry(entry) for entry in entries)
         return self.data
 
+    def iter_stream_entries(self, stream):
+        """Parse the entries one by one with :py:func:`xml.etree.ElementTree.iterparse`,
+        discarding each entry element after processing it.
+        """
+        depth = 0
+        root = None
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and element.tag == bibtexns + 'entry':
+                yield self.process_entry(element)
+                root.clear()
+
     def process_entry(self, entry):
         def process_person(person_entry, role):
             persons = person_entry.findall(bibtexns + 'person')
@@ -74,7 +92,7 @@ class Parser(BaseParser):
         type = remove_ns(item.tag)
         e = Entry(type)
         for field in item:
-            field_name = remove_ns(field.tag)
+            field_name = sys.intern(remove_ns(field.tag))
             if field_name in Person.valid_roles:
                 process_person(field, field_name)
             else:
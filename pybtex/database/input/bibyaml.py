@@ -21,6 +21,7 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import sys
 from collections import OrderedDict
 
 import yaml
@@ -86,6 +87,24 @@ class Parser(BaseParser):
         self.data.add_entries(entries)
         return self.data
 
+    def iter_stream_entries(self, stream):
+        """Load the YAML document and yield the entries one by one.
+
+        The document is loaded as a whole, but the :py:class:`.Entry`
+        objects are created only as they are consumed.
+        """
+        t = yaml.load(stream, Loader=OrderedDictSafeLoader)
+
+        try:
+            self.data.add_to_preamble(t['preamble'])
+        except KeyError:
+            pass
+
+        entries = t['entries']
+        while entries:
+            key, entry = entries.popitem(last=False)
+            yield key, self.process_entry(entry)
+
     def process_entry(self, entry):
         bib_entry = Entry(entry['type'])
         for (key, value) in entry.items():
@@ -96,5 +115,5 @@ class Parser(BaseParser):
             elif key_lower == 'type':
                 pass
             else:
-                bib_entry.fields[key] = str(value)
+                bib_entry.fields[sys.intern(key)] = str(value)
         return bib_entry
@@ -0,0 +1,159 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""On-disk cache of parsed bibliography files.
+
+Parsers store the results of parsing a file in the cache
+(see :py:meth:`pybtex.database.input.BaseParser.parse_file`),
+under a key made of the absolute file name, the parser class and the parser options.
+A cached result is valid as long as the file has the same size and
+modification time, or the same SHA-256 hash.
+
+>>> import tempfile
+>>> with tempfile.TemporaryDirectory() as directory:
+...     cache = ParseCache(directory)
+...     cache.store('key', file_size=42, file_mtime=1, file_hash='abc', parsed_data=['parsed'])
+...     print(cache.load('key', file_size=42, file_mtime=1, get_file_hash=None))
+...     print(cache.load('key', file_size=42, file_mtime=2, get_file_hash=lambda: 'abc'))
+...     print(cache.load('key', file_size=42, file_mtime=3, get_file_hash=lambda: 'def'))
+...     print(cache.load('another key', file_size=42, file_mtime=1, get_file_hash=None))
+['parsed']
+['parsed']
+None
+None
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import gc
+import hashlib
+import os
+import pickle
+
+
+def make_cache_key(*args):
+    """Make a cache key from the ``repr()`` of the arguments."""
+    return hashlib.sha256(repr(args).encode('UTF-8')).hexdigest()
+
+
+class ParseCache(object):
+    version = 3
+    suffix = '.pickle'
+
+    max_size = 256 * 1024 * 1024
+    """When the total size of the cache exceeds ``max_size`` bytes,
+    the least recently used files are removed."""
+
+    def __init__(self, directory, max_size=None):
+        self.directory = os.path.expanduser(directory)
+        if max_size is not None:
+            self.max_size = max_size
+
+    def get_filename(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key, file_size, file_mtime, get_file_hash):
+        """Return the cached data for the key,
+        or None if there is no valid cached data.
+
+        If the file was touched but its contents did not change,
+        update the modification time stored in the cache.
+        """
+        filename = self.get_filename(key)
+        try:
+            with open(filename, 'rb') as cache_file:
+                header = pickle.load(cache_file)
+                if header['version'] != self.version or header['file_size'] != file_size:
+                    return None
+                if header['file_mtime'] != file_mtime and header['file_hash'] != get_file_hash():
+                    return None
+                # unpickling many small objects triggers the garbage collector over and over
+                gc_enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    parsed_data = pickle.load(cache_file)
+                finally:
+                    if gc_enabled:
+                        gc.enable()
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, KeyError, TypeError):
+            return None
+
+        if header['file_mtime'] != file_mtime:
+            self.store(key, file_size, file_mtime, header['file_hash'], parsed_data)
+        else:
+            self.touch(filename)
+        return parsed_data
+
+    def store(self, key, file_size, file_mtime, file_hash, parsed_data):
+        """Store the data in the cache, and remove old cache files if the cache is too large.
+
+        Errors are ignored: the cache is only an optimization.
+        """
+        header = {
+            'version': self.version,
+            'file_size': file_size,
+            'file_mtime': file_mtime,
+            'file_hash': file_hash,
+        }
+        filename = self.get_filename(key)
+        temp_filename = '{0}.{1}.tmp'.format(filename, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_filename, 'wb') as cache_file:
+                pickle.dump(header, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(parsed_data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, filename)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def touch(self, filename):
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+
+    def evict(self):
+        """Remove the least recently used cache files until the cache fits into :py:attr:`max_size`."""
+        cache_files = []
+        total_size = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.suffix) and entry.is_file():
+                        stat = entry.stat()
+                        cache_files.append((stat.st_mtime, stat.st_size, entry.path))
+                        total_size += stat.st_size
+        except OSError:
+            return
+        cache_files.sort()
+        for mtime, size, path in cache_files:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
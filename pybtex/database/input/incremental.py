@@ -0,0 +1,501 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+r"""Incremental re-parsing of edited BibTeX files.
+
+:py:class:`IncrementalParser` keeps the text of a BibTeX file along with
+the parsed :py:class:`.BibliographyData`. When the text is edited,
+only the commands touched by the edit are parsed again, along with
+the commands using the ``@string`` macros redefined by the edit.
+
+>>> parser = IncrementalParser('''
+...     @string{journal = "Journal"}
+...     @article{one, journal = journal}
+...     @article{two, title = "Two"}
+... ''')
+>>> parser.update(parser.text.replace('"Two"', '"Three"'))
+BibliographyChanges(added=[], removed=[], modified=['two'])
+>>> print(parser.data.entries['two'].fields['title'])
+Three
+>>> parser.update(parser.text.replace('"Journal"', '"Another Journal"'))
+BibliographyChanges(added=[], removed=[], modified=['one'])
+>>> print(parser.data.entries['one'].fields['journal'])
+Another Journal
+>>> parser.update(parser.text + '@article{three, title = "Three"}')
+BibliographyChanges(added=['three'], removed=[], modified=[])
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from bisect import bisect_left
+from collections import Counter
+
+import pybtex.errors
+from pybtex.database import BibliographyData
+from pybtex.database.input.bibtex import Parser, SkipEntry, _ChunkParser, _RecordingMacros
+from pybtex.scanner import PrematureEOF, PybtexSyntaxError
+from pybtex.utils import CaseInsensitiveDict, OrderedCaseInsensitiveDict
+
+
+class BibliographyChanges(object):
+    """The keys of the entries added, removed and modified by an update."""
+
+    def __init__(self, added=(), removed=(), modified=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.modified = list(modified)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified)
+
+    def __eq__(self, other):
+        if not isinstance(other, BibliographyChanges):
+            return NotImplemented
+        return (
+            self.added == other.added
+            and self.removed == other.removed
+            and self.modified == other.modified
+        )
+
+    def __repr__(self):
+        return 'BibliographyChanges(added={0!r}, removed={1!r}, modified={2!r})'.format(
+            self.added, self.removed, self.modified,
+        )
+
+
+class IncrementalParser(object):
+    """Parses a BibTeX string and keeps it up to date with edits.
+
+    For every top-level command, the parser remembers where it starts,
+    how far the text was scanned to parse it,
+    which ``@string`` macros it uses, and which macro it defines.
+    An update parses the text again from the first command scanned up to the edit
+    (or the last command starting before the edit)
+    until it reaches the start of some command after the edit.
+    From that point on, the text is parsed in the same way as before,
+    except that the commands using the macros redefined by the edit
+    are parsed again.
+
+    The text is parsed from scratch if some entry key parsed again also
+    occurs outside of the edited commands (the first occurrence of a key
+    wins), and on every update if the parser has ``wanted_entries`` or
+    ``keyless_entries`` enabled.
+
+    Errors are only reported for the commands that are parsed again.
+    """
+
+    def __init__(self, text='', parser=None, **parser_options):
+        """
+        :param text: The BibTeX string to parse.
+        :param parser: A :py:class:`pybtex.database.input.bibtex.Parser`
+            to parse the text with. If None, a new parser is created
+            with the given options.
+        """
+        if parser is None:
+            parser = Parser(**parser_options)
+        self.parser = parser
+        self.initial_macros = CaseInsensitiveDict(parser.macros)
+        self.initial_wanted_entries = parser.data.wanted_entries
+        self.text = ''
+        self.starts = []
+        self.ends = []
+        self.commands = []
+        self.key_counts = Counter()
+        self.reparse(text)
+
+    @property
+    def data(self):
+        return self.parser.data
+
+    def is_incremental(self):
+        return self.parser.data.wanted_entries is None and not self.parser.keyless_entries
+
+    def update(self, new_text):
+        """Replace the text with the new text and return the :py:class:`BibliographyChanges`."""
+        old_text = self.text
+        prefix_length = _common_prefix_length(old_text, new_text)
+        suffix_length = _common_suffix_length(old_text, new_text, prefix_length)
+        return self.update_range(
+            prefix_length,
+            len(old_text) - suffix_length,
+            new_text[prefix_length:len(new_text) - suffix_length],
+        )
+
+    def update_range(self, start, end, replacement):
+        """Replace ``text[start:end]`` with the replacement and return the :py:class:`BibliographyChanges`."""
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError('invalid range: {0}-{1}'.format(start, end))
+        new_text = self.text[:start] + replacement + self.text[end:]
+        if not self.is_incremental():
+            return self.reparse(new_text)
+
+        delta = len(replacement) - (end - start)
+        starts = self.starts
+        ends = self.ends
+        first = bisect_left(starts, start)
+        if first:
+            first -= 1
+        # a command scanned up to the end of the text ends with an error,
+        # and may have skipped the commands that follow it
+        first = min(first, bisect_left(ends, start))
+        region_start = starts[first] if first < len(starts) and starts[first] < start else 0
+        first_unchanged = bisect_left(starts, end)
+
+        def is_unchanged_command(at):
+            if at < end + delta:
+                return False
+            i = bisect_left(starts, at - delta, first_unchanged)
+            return i < len(starts) and starts[i] == at - delta
+
+        macros, num_preambles = self.get_state(first)
+        scanner = self.make_scanner()
+        new_starts, new_ends, new_commands = scanner.scan(new_text, region_start, macros, is_unchanged_command)
+        last = bisect_left(starts, scanner.pos - delta, first_unchanged)
+        old_commands = self.commands[first:last]
+
+        if _has_generated_keys(old_commands) or _has_generated_keys(new_commands):
+            # generated keys are numbered from the start of the text
+            return self.reparse(new_text)
+        old_keys = _get_entry_keys(old_commands)
+        new_keys = _get_entry_keys(new_commands)
+        key_counts = self.key_counts.copy()
+        key_counts.subtract(key.lower() for key in old_keys)
+        if any(key_counts[key.lower()] for key in old_keys + new_keys):
+            # the first occurrence of a key may change
+            return self.reparse(new_text)
+        key_counts.update(key.lower() for key in new_keys)
+
+        old_macros = CaseInsensitiveDict(macros)
+        for command, name, value, referenced_macros in old_commands:
+            if command == 'string':
+                old_macros[name] = value
+        new_macros = CaseInsensitiveDict(scanner.macros)
+        commands = self.commands[:first] + new_commands + self.commands[last:]
+        dependent_scanner = self.make_scanner()
+        dependent_commands = self.reparse_dependent_commands(
+            dependent_scanner, new_text, commands,
+            first + len(new_commands),
+            [start + delta for start in starts[last:]],
+            num_preambles + sum(1 for command in new_commands if command[0] == 'preamble'),
+            new_macros,
+            _get_changed_macros(old_macros, new_macros, old_commands + new_commands),
+            key_counts,
+        )
+        if dependent_commands is None:
+            return self.reparse(new_text)
+        reparsed_preambles, final_macros = dependent_commands
+
+        region_data = self.replay_events(scanner.events)
+        dependent_data = self.replay_events(dependent_scanner.events)
+        data = self.parser.data
+        changes = self.merge_entries(region_data.entries, old_keys, new_keys, commands)
+        for key, entry in dependent_data.entries.items():
+            if data.entries[key] != entry:
+                data.entries[key] = entry
+                changes.modified.append(key)
+        num_old_preambles = sum(1 for command in old_commands if command[0] == 'preamble')
+        data.preamble_list[num_preambles:num_preambles + num_old_preambles] = region_data.preamble_list
+        for index, value in zip(reparsed_preambles, dependent_data.preamble_list):
+            data.preamble_list[index] = value
+        if final_macros is not None:
+            self.parser.macros = final_macros
+
+        self.text = new_text
+        self.starts = starts[:first] + new_starts + [start + delta for start in starts[last:]]
+        self.ends = ends[:first] + new_ends + [end + delta for end in ends[last:]]
+        for i in range(first + len(new_ends), len(self.ends)):
+            if self.ends[i] >= self.ends[i - 1]:
+                break
+            self.ends[i] = self.ends[i - 1]
+        self.commands = commands
+        self.key_counts = +key_counts
+        return changes
+
+    def reparse(self, text):
+        """Parse the whole text from scratch and return the :py:class:`BibliographyChanges`."""
+        data = self.parser.data
+        old_entries = data.entries
+        scanner = self.make_scanner()
+        starts, ends, commands = scanner.scan(text, 0, self.initial_macros, lambda at: False)
+        new_data = self.replay_events(scanner.events, wanted_entries=self.initial_wanted_entries)
+
+        data.__dict__.update(new_data.__dict__)
+        self.parser.macros = CaseInsensitiveDict(scanner.macros)
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.commands = commands
+        self.key_counts = Counter(key.lower() for key in _get_entry_keys(commands))
+
+        return BibliographyChanges(
+            added=[key for key in data.entries if key not in old_entries],
+            removed=[key for key in old_entries if key not in data.entries],
+            modified=[
+                key for key, entry in data.entries.items()
+                if key in old_entries and old_entries[key] != entry
+            ],
+        )
+
+    def make_scanner(self):
+        return _CommandScanner(filename=self.parser.filename, **self.parser.get_worker_options())
+
+    def replay_events(self, events, wanted_entries=None):
+        """Replay the events into a new :py:class:`.BibliographyData`, reporting the errors."""
+        data = self.parser.data
+        macros = self.parser.macros
+        self.parser.data = BibliographyData(wanted_entries=wanted_entries, min_crossrefs=data.min_crossrefs)
+        self.parser.macros = CaseInsensitiveDict(macros)
+        try:
+            self.parser.replay_events(events)
+            return self.parser.data
+        finally:
+            self.parser.data = data
+            self.parser.macros = macros
+
+    def get_state(self, index):
+        """Return the macros defined before the given command and the number of preceding ``@preamble`` commands."""
+        macros = CaseInsensitiveDict(self.initial_macros)
+        num_preambles = 0
+        for i in range(index):
+            command, name, value, referenced_macros = self.commands[i]
+            if command == 'string':
+                macros[name] = value
+            elif command == 'preamble':
+                num_preambles += 1
+        return macros, num_preambles
+
+    def reparse_dependent_commands(
+        self, scanner, text, commands, index, starts, num_preambles, macros, changed_macros, key_counts
+    ):
+        """Parse again the commands after the edited ones that use the changed macros.
+
+        ``starts`` are the positions of ``commands[index:]`` in the text.
+        The reparsed commands are replaced in ``commands``.
+
+        Return the indices of the reparsed ``@preamble`` commands in the preamble list,
+        and the macros defined at the end of the text, or None if they did not change.
+        Return None if some of the reparsed entry keys occur more than once.
+        """
+        reparsed_preambles = []
+        for i, start in enumerate(starts):
+            if not changed_macros:
+                return reparsed_preambles, None
+            command, name, value, referenced_macros = commands[index + i]
+            if referenced_macros and not changed_macros.isdisjoint(referenced_macros):
+                if command == 'entry' and (value or key_counts[name.lower()] > 1):
+                    return None
+                new_starts, new_ends, new_commands = scanner.scan(text, start, macros, lambda at: at > start)
+                commands[index + i] = new_commands[0]
+                if command == 'string':
+                    new_value = new_commands[0][2]
+                    macros[name] = new_value
+                    if new_value != value:
+                        changed_macros.add(name.lower())
+                    else:
+                        changed_macros.discard(name.lower())
+                elif command == 'preamble':
+                    reparsed_preambles.append(num_preambles)
+            elif command == 'string':
+                macros[name] = value
+                changed_macros.discard(name.lower())
+            if command == 'preamble':
+                num_preambles += 1
+        return reparsed_preambles, macros if changed_macros else None
+
+    def merge_entries(self, new_entries, old_keys, new_keys, commands):
+        """Put the entries parsed again into the :py:class:`.BibliographyData`
+        and return the :py:class:`BibliographyChanges`.
+        """
+        entries = self.parser.data.entries
+        changes = BibliographyChanges()
+        old_keys_lower = dict((key.lower(), key) for key in _unique(old_keys))
+        for key, entry in new_entries.items():
+            if key not in entries:
+                changes.added.append(key)
+            elif entries[key] != entry or old_keys_lower.get(key.lower(), key) != key:
+                changes.modified.append(key)
+        removed_keys = set(key.lower() for key in old_keys) - set(key.lower() for key in new_keys)
+        changes.removed = [key for key in _unique(old_keys) if key.lower() in removed_keys]
+
+        if _unique(old_keys) == _unique(new_keys):
+            for key in changes.modified:
+                entries[key] = new_entries[key]
+        else:
+            result = OrderedCaseInsensitiveDict()
+            for command, key, value, referenced_macros in commands:
+                if command == 'entry' and key not in result:
+                    if key in changes.added or key in changes.modified:
+                        result[key] = new_entries[key]
+                    else:
+                        result[key] = entries[key]
+            self.parser.data.entries = result
+        return changes
+
+
+def _get_entry_keys(commands):
+    return [name for command, name, value, referenced_macros in commands if command == 'entry']
+
+
+def _has_generated_keys(commands):
+    return any(command == 'entry' and value for command, name, value, referenced_macros in commands)
+
+
+def _unique(keys):
+    return list(CaseInsensitiveDict((key, None) for key in reversed(keys)))[::-1]
+
+
+def _get_changed_macros(old_macros, new_macros, commands):
+    names = set(name for command, name, value, referenced_macros in commands if command == 'string')
+    return set(
+        name.lower() for name in names
+        if old_macros.get(name) != new_macros.get(name)
+    )
+
+
+def _common_prefix_length(a, b, block_size=4096):
+    length = min(len(a), len(b))
+    pos = 0
+    while pos < length and a[pos:pos + block_size] == b[pos:pos + block_size]:
+        pos += block_size
+    pos = min(pos, length)
+    while pos < length and a[pos] == b[pos]:
+        pos += 1
+    return pos
+
+
+def _common_suffix_length(a, b, prefix_length, block_size=4096):
+    length = min(len(a), len(b)) - prefix_length
+    pos = 0
+    while pos < length and a[len(a) - pos - block_size:len(a) - pos] == b[len(b) - pos - block_size:len(b) - pos]:
+        pos += block_size
+    pos = min(pos, length)
+    while pos < length and a[len(a) - pos - 1] == b[len(b) - pos - 1]:
+        pos += 1
+    return pos
+
+
+class _TrackedMacros(_RecordingMacros):
+    """A macro dictionary remembering the macros used and defined by the current command."""
+
+    def __init__(self, macros, record):
+        super(_TrackedMacros, self).__init__(macros, record)
+        self.referenced = set()
+        self.defined = None
+
+    def __getitem__(self, key):
+        self.referenced.add(key.lower())
+        return super(_TrackedMacros, self).__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self.defined = key, value
+        super(_TrackedMacros, self).__setitem__(key, value)
+
+
+class _CommandScanner(_ChunkParser):
+    """Parses the commands of a text one by one, recording the events
+    (see :py:class:`pybtex.database.input.bibtex._ChunkParser`)
+    and a ``(command, name, value, referenced_macros)`` tuple for each command:
+
+    - ``command`` is ``entry``, ``string``, ``preamble``, or None for
+      ``@comment`` and unparsable commands;
+    - ``name`` is the entry key or the macro name;
+    - ``value`` is the macro value, or True for entries with generated
+      ``unnamed-<number>`` keys;
+    - ``referenced_macros`` is a set of lowercase names of the used macros, or None.
+    """
+
+    pos = 0
+    # True if the current command was scanned up to the end of the text
+    reached_eof = False
+
+    def handle_error(self, error):
+        if isinstance(error, PrematureEOF):
+            self.reached_eof = True
+        super(_CommandScanner, self).handle_error(error)
+
+    def scan(self, text, pos, macros, stop):
+        """Parse the commands starting at ``pos`` until the end of the text,
+        or until a command starting at a position for which ``stop(position)`` is true.
+
+        Return the list of command starts, the list of positions
+        the text has been scanned up to after each command (the length of the text
+        if some command ended prematurely), and the list of command tuples.
+        """
+        self.macros = _TrackedMacros(macros, self.define_macro)
+        low_level_parser = self.low_level_parser(
+            text,
+            keyless_entries=self.keyless_entries,
+            handle_error=self.handle_error,
+            filename=self.filename,
+            macros=self.macros,
+        )
+        self.unnamed_entry_counter = 1
+        starts = []
+        ends = []
+        commands = []
+        with pybtex.errors.capture() as captured_errors:
+            self.captured_errors = captured_errors
+            while True:
+                at = text.find('@', pos)
+                if at == -1 or stop(at):
+                    self.pos = at if at != -1 else len(text)
+                    break
+                low_level_parser.pos = at + 1
+                if not low_level_parser.lazy_lineno:
+                    low_level_parser.lineno = low_level_parser.get_lineno(at)
+                low_level_parser.command_start = at
+                self.macros.referenced = set()
+                self.macros.defined = None
+                self.reached_eof = False
+                try:
+                    result = tuple(low_level_parser.parse_command())
+                except PybtexSyntaxError as error:
+                    self.handle_error(error)
+                    result = None
+                except SkipEntry:
+                    result = None
+                if result is not None:
+                    self.process_command(result)
+                pos = low_level_parser.pos
+                starts.append(at)
+                end = len(text) if self.reached_eof else pos
+                ends.append(max(end, ends[-1]) if ends else end)
+                commands.append(self.make_command_tuple(result))
+            self.flush_captured_errors()
+        return starts, ends, commands
+
+    def make_command_tuple(self, result):
+        referenced_macros = frozenset(self.macros.referenced) or None
+        if result is None:
+            return None, None, None, referenced_macros
+        command = result[0].lower()
+        if command == 'string':
+            if self.macros.defined is None:
+                return None, None, None, referenced_macros
+            name, value = self.macros.defined
+            return 'string', name, value, referenced_macros
+        elif command == 'preamble':
+            return 'preamble', None, None, referenced_macros
+        else:
+            key = result[1][0]
+            if key is None:
+                return 'entry', self.events[-1][1], True, referenced_macros
+            return 'entry', key, None, referenced_macros
@@ -0,0 +1,148 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Sidecar index files for random access into bibliography files.
+
+An index lists the commands of a bibliography file with their byte offsets,
+so that a parser can seek to the wanted entries and skip everything else.
+Each command is a tuple ``(command, key, start, end, crossref, macros)``:
+
+- ``command`` is the lowercased command name: ``entry``, ``string`` or ``preamble``;
+- ``key`` is the entry key or the macro name (``None`` for preambles);
+- ``start`` and ``end`` are the byte offsets of the command,
+  from the ``@`` character to the closing brace or parenthesis;
+- ``crossref`` is the crossref target of the entry, or ``None``;
+- ``macros`` is the list of ``@string`` macros referenced by the command.
+
+The index is valid as long as the file has the same size and modification time,
+or the same SHA-256 hash.
+
+>>> index = BibliographyIndex(
+...     encoding='UTF-8', file_size=42, file_mtime=1, file_hash='abc',
+...     commands=[('entry', 'key', 0, 42, None, ['jan'])],
+... )
+>>> index.is_valid('UTF-8', file_size=42, file_mtime=1, get_file_hash=None)
+True
+>>> index.is_valid('latin1', file_size=42, file_mtime=1, get_file_hash=None)
+False
+>>> index.is_valid('UTF-8', file_size=43, file_mtime=1, get_file_hash=None)
+False
+>>> index.is_valid('UTF-8', file_size=42, file_mtime=2, get_file_hash=lambda: 'abc')
+True
+>>> index.file_mtime
+2
+>>> index.is_valid('UTF-8', file_size=42, file_mtime=3, get_file_hash=lambda: 'def')
+False
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import hashlib
+import json
+import os
+
+
+def get_file_hash(data):
+    """Return the hex SHA-256 digest of a bytes-like object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BibliographyIndex(object):
+    version = 1
+
+    def __init__(self, encoding, file_size, file_mtime, file_hash, commands):
+        """
+        :param commands: The list of indexed commands,
+            or None if the file cannot be indexed (because of syntax errors, for example).
+        """
+        self.encoding = encoding
+        self.file_size = file_size
+        self.file_mtime = file_mtime
+        self.file_hash = file_hash
+        self.commands = commands
+        self.changed = False
+
+    def is_valid(self, encoding, file_size, file_mtime, get_file_hash):
+        """Check if the index is up to date with the file.
+
+        If the file was touched but its contents did not change,
+        update the modification time stored in the index.
+        """
+        if encoding.lower() != self.encoding.lower() or file_size != self.file_size:
+            return False
+        if file_mtime == self.file_mtime:
+            return True
+        if get_file_hash() != self.file_hash:
+            return False
+        self.file_mtime = file_mtime
+        self.changed = True
+        return True
+
+    @classmethod
+    def load(cls, filename):
+        """Load the index from a file.
+
+        Return None if the file does not exist or is not a valid index.
+        """
+        try:
+            with open(filename, 'r', encoding='UTF-8') as index_file:
+                index_data = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index_data, dict) or index_data.get('version') != cls.version:
+            return None
+        commands = index_data['commands']
+        return cls(
+            encoding=index_data['encoding'],
+            file_size=index_data['file_size'],
+            file_mtime=index_data['file_mtime'],
+            file_hash=index_data['file_hash'],
+            commands=[tuple(command) for command in commands] if commands is not None else None,
+        )
+
+    def save(self, filename):
+        """Save the index to a file.
+
+        The index is written to a temporary file first, so that concurrent
+        readers never see a partially written index. Errors are ignored:
+        the index is only an optimization.
+        """
+        index_data = {
+            'version': self.version,
+            'encoding': self.encoding,
+            'file_size': self.file_size,
+            'file_mtime': self.file_mtime,
+            'file_hash': self.file_hash,
+            'commands': self.commands,
+        }
+        temp_filename = '{0}.{1}.tmp'.format(filename, os.getpid())
+        try:
+            with open(temp_filename, 'w', encoding='UTF-8') as index_file:
+                json.dump(index_data, index_file, separators=(',', ':'))
+            os.replace(temp_filename, filename)
+        except OSError:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            return False
+        self.changed = False
+        return True
@@ -0,0 +1,323 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+r"""Secondary indexes and queries over bibliography entries.
+
+An index maps the values of a field, the last names of persons
+or the entry types to the entries having them.
+Indexes are added with :py:meth:`.BibliographyData.add_index`
+and are kept up to date as entries are added, replaced and deleted.
+
+>>> from pybtex.database import parse_string
+>>> bib_data = parse_string('''
+...     @Book{knuth1984,
+...         author = {Donald E. Knuth},
+...         title = {The {\\TeX}book},
+...         year = 1984,
+...     }
+...     @Book{knuth1986,
+...         author = {Donald E. Knuth},
+...         title = {The {METAFONT}book},
+...         year = 1986,
+...     }
+...     @Article{lamport1986,
+...         author = {Leslie Lamport},
+...         title = {{\\LaTeX}: A Document Preparation System},
+...         year = 1986,
+...         doi = {10.1000/latex},
+...     }
+... ''', 'bibtex')
+>>> bib_data.add_index(FieldIndex('year'))
+>>> bib_data.add_index(FieldIndex('doi'))
+>>> bib_data.add_index(FieldIndex('title'))
+>>> bib_data.add_index(PersonIndex('author'))
+>>> bib_data.add_index(TypeIndex())
+
+:py:meth:`.BibliographyData.query` returns the keys of the entries matching
+all the given conditions, in the entry order. Values are compared case-insensitively:
+
+>>> bib_data.query(author='knuth')
+['knuth1984', 'knuth1986']
+>>> bib_data.query(type='book', year=1986)
+['knuth1986']
+>>> bib_data.query(doi='10.1000/LaTeX')
+['lamport1986']
+>>> bib_data.query(year=Range(1985, 1990))
+['knuth1986', 'lamport1986']
+>>> bib_data.query(title=Prefix('the met'))
+['knuth1986']
+>>> del bib_data.entries['knuth1986']
+>>> bib_data.query(author='Knuth')
+['knuth1984']
+
+.. versionadded:: 0.26
+"""
+
+from __future__ import unicode_literals
+
+from bisect import bisect_left, bisect_right
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+from pybtex.exceptions import PybtexError
+from pybtex.utils import CaseInsensitiveDict
+
+
+class QueryError(PybtexError):
+    pass
+
+
+def _strip_braces(value):
+    return value.replace('{', '').replace('}', '')
+
+
+class Index(object):
+    """Base class for indexes.
+
+    An index maps normalized values to the sets of case-folded entry keys.
+    Subclasses define :py:meth:`get_values`.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.buckets = {}
+        self._sorted_values = None
+
+    def normalize(self, value):
+        """Normalize a value for comparison (casefold and strip braces)."""
+        return _strip_braces(str(value)).casefold()
+
+    def get_values(self, entry):
+        """Return the normalized values to index the entry by."""
+        raise NotImplementedError
+
+    def add(self, key, entry):
+        buckets = self.buckets
+        for value in self.get_values(entry):
+            bucket = buckets.get(value)
+            if bucket is None:
+                bucket = buckets[value] = set()
+                self._sorted_values = None
+            bucket.add(key)
+
+    def remove(self, key, entry):
+        buckets = self.buckets
+        for value in self.get_values(entry):
+            bucket = buckets.get(value)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[value]
+                    self._sorted_values = None
+
+    def get_sorted_values(self):
+        if self._sorted_values is None:
+            self._sorted_values = sorted(self.buckets)
+        return self._sorted_values
+
+    def find(self, value):
+        """Return the keys of the entries with the value."""
+        return self.buckets.get(self.normalize(value), set())
+
+    def find_values(self, values):
+        """Return the keys of the entries with any of the (normalized) values."""
+        buckets = self.buckets
+        keys = set()
+        for value in values:
+            keys.update(buckets[value])
+        return keys
+
+
+class FieldIndex(Index):
+    """An index over the values of a field."""
+
+    def __init__(self, field_name):
+        super(FieldIndex, self).__init__()
+        self.name = field_name
+
+    def get_values(self, entry):
+        value = entry.fields.get(self.name)
+        if value is None:
+            return ()
+        return (self.normalize(value),)
+
+
+class PersonIndex(Index):
+    """An index over the last names of the persons with the given role."""
+
+    def __init__(self, role='author'):
+        super(PersonIndex, self).__init__()
+        self.name = role
+
+    def get_values(self, entry):
+        return set(
+            self.normalize(' '.join(person.last_names))
+            for person in entry.persons.get(self.name, ())
+        )
+
+
+class TypeIndex(Index):
+    """An index over the entry types."""
+
+    name = 'type'
+
+    def get_values(self, entry):
+        return (self.normalize(entry.type),)
+
+
+class Condition(object):
+    """Base class for query conditions other than equality."""
+
+    def find(self, index):
+        """Return the keys of the matching entries."""
+        raise NotImplementedError
+
+
+class Prefix(Condition):
+    """Match the values starting with the prefix."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def find(self, index):
+        prefix = index.normalize(self.prefix)
+        values = index.get_sorted_values()
+        start = bisect_left(values, prefix)
+        end = start
+        while end < len(values) and values[end].startswith(prefix):
+            end += 1
+        return index.find_values(values[start:end])
+
+
+class Range(Condition):
+    """Match the values between ``low`` and ``high``, inclusive.
+
+    If the bounds are numbers, the values are compared as integers,
+    and non-numeric values never match. Otherwise, the normalized
+    values are compared as strings. A bound of None is not checked.
+    """
+
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def is_numeric(self):
+        return isinstance(self.low, (int, float)) or isinstance(self.high, (int, float))
+
+    def find(self, index):
+        low, high = self.low, self.high
+        if self.is_numeric():
+            values = [
+                value for value in index.buckets
+                if value.isdecimal()
+                and (low is None or int(value) >= low)
+                and (high is None or int(value) <= high)
+            ]
+            return index.find_values(values)
+        values = index.get_sorted_values()
+        start = 0 if low is None else bisect_left(values, index.normalize(low))
+        end = len(values) if high is None else bisect_right(values, index.normalize(high))
+        return index.find_values(values[start:end])
+
+
+class IndexedEntries(MutableMapping):
+    """A wrapper around the entry dictionary of a :py:class:`.BibliographyData`
+    keeping the indexes up to date.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.indexes = CaseInsensitiveDict()
+        # case-folded key -> (position in the entry order, key)
+        self._positions = {}
+        self._next_position = 0
+        for key in entries:
+            self._add_position(key)
+
+    def _add_position(self, key):
+        self._positions[key.casefold()] = self._next_position, key
+        self._next_position += 1
+
+    def add_index(self, index):
+        for key, entry in self.entries.items():
+            index.add(key.casefold(), entry)
+        self.indexes[index.name] = index
+
+    def __getitem__(self, key):
+        return self.entries[key]
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return repr(self.entries)
+
+    def __setitem__(self, key, entry):
+        key_folded = key.casefold()
+        old_position = self._positions.get(key_folded)
+        if old_position is not None:
+            old_entry = self.entries[key]
+            for index in self.indexes.values():
+                index.remove(key_folded, old_entry)
+        self.entries[key] = entry
+        if old_position is None:
+            self._add_position(key)
+        else:
+            self._positions[key_folded] = old_position[0], key
+        for index in self.indexes.values():
+            index.add(key_folded, entry)
+
+    def __delitem__(self, key):
+        entry = self.entries[key]
+        key_folded = key.casefold()
+        for index in self.indexes.values():
+            index.remove(key_folded, entry)
+        del self.entries[key]
+        del self._positions[key_folded]
+
+    def query(self, conditions):
+        matches = []
+        for name, condition in conditions.items():
+            try:
+                index = self.indexes[name]
+            except KeyError:
+                raise QueryError('no index for {0}'.format(name))
+            if isinstance(condition, Condition):
+                matches.append(condition.find(index))
+            else:
+                matches.append(index.find(condition))
+        if not matches:
+            keys = set(self._positions)
+        else:
+            matches.sort(key=len)
+            keys = matches[0].intersection(*matches[1:])
+        positions = self._positions
+        return [positions[key][1] for key in sorted(keys, key=positions.__getitem__)]
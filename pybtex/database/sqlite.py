@@ -0,0 +1,574 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+r"""Bibliography data stored in an SQLite database.
+
+:py:class:`SQLiteBibliographyData` keeps the entries in an SQLite file
+instead of memory. Entries are loaded one by one when they are looked up,
+so very large bibliographies can be used by many processes at once,
+each of them opening the same database file.
+
+>>> from pybtex.database import Entry, Person
+>>> from pybtex.database.query import FieldIndex, PersonIndex, Range
+>>> bib_data = SQLiteBibliographyData()
+>>> with bib_data.transaction():
+...     bib_data.add_entry('knuth1984', Entry('book', fields={
+...         'title': 'The {\\TeX}book', 'year': '1984',
+...     }, persons={'author': [Person('Donald E. Knuth')]}))
+...     bib_data.add_entry('lamport1986', Entry('article', fields={
+...         'title': '{\\LaTeX}: A Document Preparation System', 'year': '1986',
+...     }, persons={'author': [Person('Leslie Lamport')]}))
+>>> print(bib_data.entries['Knuth1984'].fields['title'])
+The {\TeX}book
+>>> bib_data.entries['knuth1984'].persons['author']
+[Person('Knuth, Donald E.')]
+>>> len(bib_data.entries)
+2
+
+Indexes are stored in the database as well:
+
+>>> bib_data.add_index(FieldIndex('year'))
+>>> bib_data.add_index(PersonIndex('author'))
+>>> bib_data.query(author='lamport')
+['lamport1986']
+>>> bib_data.query(year=Range(1980, 1985))
+['knuth1984']
+
+Loaded entries are copies of the stored data.
+To change an entry, replace it with another :py:class:`.Entry`.
+If anything fails inside :py:meth:`~SQLiteBibliographyData.transaction`,
+all changes made in it are rolled back:
+
+>>> entry = bib_data.entries['knuth1984']
+>>> entry.fields['year'] = '1986'
+>>> try:
+...     with bib_data.transaction():
+...         bib_data.entries['knuth1984'] = entry
+...         raise ValueError
+... except ValueError:
+...     pass
+>>> bib_data.query(year='1986')
+['lamport1986']
+
+.. versionadded:: 0.26
+"""
+
+from __future__ import unicode_literals
+
+import sqlite3
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+
+try:
+    from collections.abc import ItemsView, MutableMapping
+except ImportError:
+    from collections import ItemsView, MutableMapping
+
+from pybtex.database import BibliographyData, Entry
+from pybtex.database.columnar import _decode_name_parts, _encode_person, _make_person
+from pybtex.database.crossref import CrossrefGraph
+from pybtex.database.query import (
+    Condition, FieldIndex, PersonIndex, Prefix, QueryError, Range, TypeIndex,
+)
+from pybtex.exceptions import PybtexError
+from pybtex.plugin import find_plugin
+from pybtex.utils import BoundedCache, CaseInsensitiveDefaultDict, CaseInsensitiveDict, CaseInsensitiveSet
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    folded_key TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL
+);
+CREATE TABLE fields (
+    entry_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (entry_id, position)
+) WITHOUT ROWID;
+CREATE TABLE persons (
+    entry_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    name_parts TEXT NOT NULL,
+    PRIMARY KEY (entry_id, position)
+) WITHOUT ROWID;
+CREATE TABLE preamble (
+    position INTEGER PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE indexes (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    argument TEXT
+);
+CREATE TABLE index_values (
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    PRIMARY KEY (name, value, entry_id)
+) WITHOUT ROWID;
+CREATE INDEX index_values_by_entry ON index_values (entry_id);
+"""
+
+_INDEX_KINDS = {
+    FieldIndex: 'field',
+    PersonIndex: 'person',
+    TypeIndex: 'type',
+}
+
+
+def _make_index(kind, argument):
+    if kind == 'type':
+        return TypeIndex()
+    elif kind == 'person':
+        return PersonIndex(argument)
+    else:
+        return FieldIndex(argument)
+
+
+def _iter_groups(rows):
+    """Group the rows by their first column."""
+    for entry_id, group in groupby(rows, itemgetter(0)):
+        yield entry_id, [row[1:] for row in group]
+
+
+class _SQLiteItemsView(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class SQLiteEntries(MutableMapping):
+    """A case-insensitive mapping of entry keys to entries stored in an SQLite database.
+
+    Entries are loaded from the database each time they are looked up.
+    Iterating over :py:meth:`items` reads all entries with a few sequential
+    queries, keeping only one entry in memory at a time.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.version = 0
+        """Incremented on each change made through this mapping."""
+
+        self.indexes = CaseInsensitiveDict()
+        self._transaction_depth = 0
+        for name, kind, argument in connection.execute('SELECT name, kind, argument FROM indexes'):
+            self.indexes[name] = _make_index(kind, argument)
+
+    @contextmanager
+    def transaction(self):
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+        self.connection.execute('BEGIN IMMEDIATE')
+        self._transaction_depth = 1
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        else:
+            self.connection.execute('COMMIT')
+        finally:
+            self._transaction_depth = 0
+            self.version += 1
+
+    def _get_id(self, key):
+        row = self.connection.execute(
+            'SELECT id FROM entries WHERE folded_key = ?', (key.casefold(),)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _make_entry(self, key, type_, fields, persons):
+        entry = Entry(type_, fields)
+        entry.key = key
+        entry_persons = entry.persons
+        for role, name_parts in persons:
+            person = _make_person(_decode_name_parts(name_parts))
+            entry_persons.setdefault(role, []).append(person)
+        return entry
+
+    def _load_entry(self, entry_id, key, type_):
+        connection = self.connection
+        fields = connection.execute(
+            'SELECT name, value FROM fields WHERE entry_id = ? ORDER BY position', (entry_id,)
+        )
+        persons = connection.execute(
+            'SELECT role, name_parts FROM persons WHERE entry_id = ? ORDER BY position', (entry_id,)
+        )
+        return self._make_entry(key, type_, fields, persons)
+
+    def __getitem__(self, key):
+        row = self.connection.execute(
+            'SELECT id, key, type FROM entries WHERE folded_key = ?', (key.casefold(),)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._load_entry(*row)
+
+    def __contains__(self, key):
+        return self._get_id(key) is not None
+
+    def __iter__(self):
+        for key, in self.connection.execute('SELECT key FROM entries ORDER BY id'):
+            yield key
+
+    def __len__(self):
+        return self.connection.execute('SELECT count(*) FROM entries').fetchone()[0]
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, list(self.items()))
+
+    def items(self):
+        return _SQLiteItemsView(self)
+
+    def _iter_items(self):
+        for entry_id, key, entry in self._iter_rows():
+            yield key, entry
+
+    def _iter_rows(self):
+        connection = self.connection
+        entries = connection.execute('SELECT id, key, type FROM entries ORDER BY id')
+        field_groups = _iter_groups(connection.execute(
+            'SELECT entry_id, name, value FROM fields ORDER BY entry_id, position'
+        ))
+        person_groups = _iter_groups(connection.execute(
+            'SELECT entry_id, role, name_parts FROM persons ORDER BY entry_id, position'
+        ))
+        next_fields = next(field_groups, None)
+        next_persons = next(person_groups, None)
+        for entry_id, key, type_ in entries:
+            fields = persons = ()
+            if next_fields is not None and next_fields[0] == entry_id:
+                fields = next_fields[1]
+                next_fields = next(field_groups, None)
+            if next_persons is not None and next_persons[0] == entry_id:
+                persons = next_persons[1]
+                next_persons = next(person_groups, None)
+            yield entry_id, key, self._make_entry(key, type_, fields, persons)
+
+    def _delete_rows(self, entry_id):
+        connection = self.connection
+        connection.execute('DELETE FROM fields WHERE entry_id = ?', (entry_id,))
+        connection.execute('DELETE FROM persons WHERE entry_id = ?', (entry_id,))
+        connection.execute('DELETE FROM index_values WHERE entry_id = ?', (entry_id,))
+
+    def _insert_rows(self, entry_id, entry):
+        connection = self.connection
+        connection.executemany(
+            'INSERT INTO fields (entry_id, position, name, value) VALUES (?, ?, ?, ?)',
+            [
+                (entry_id, position, name, value)
+                for position, (name, value) in enumerate(entry.fields.items())
+            ],
+        )
+        connection.executemany(
+            'INSERT INTO persons (entry_id, position, role, name_parts) VALUES (?, ?, ?, ?)',
+            [
+                (entry_id, position, role, _encode_person(person))
+                for position, (role, person) in enumerate(
+                    (role, person)
+                    for role, persons in entry.persons.items()
+                    for person in persons
+                )
+            ],
+        )
+        for name, index in self.indexes.items():
+            self._insert_index_values(name, index, entry_id, entry)
+
+    def _insert_index_values(self, name, index, entry_id, entry):
+        self.connection.executemany(
+            'INSERT OR IGNORE INTO index_values (name, value, entry_id) VALUES (?, ?, ?)',
+            [(name.casefold(), value, entry_id) for value in index.get_values(entry)],
+        )
+
+    def __setitem__(self, key, entry):
+        with self.transaction():
+            entry_id = self._get_id(key)
+            if entry_id is None:
+                entry_id = self.connection.execute(
+                    'INSERT INTO entries (key, folded_key, type) VALUES (?, ?, ?)',
+                    (key, key.casefold(), entry.original_type),
+                ).lastrowid
+            else:
+                self.connection.execute(
+                    'UPDATE entries SET key = ?, type = ? WHERE id = ?',
+                    (key, entry.original_type, entry_id),
+                )
+                self._delete_rows(entry_id)
+            self._insert_rows(entry_id, entry)
+
+    def __delitem__(self, key):
+        with self.transaction():
+            entry_id = self._get_id(key)
+            if entry_id is None:
+                raise KeyError(key)
+            self._delete_rows(entry_id)
+            self.connection.execute('DELETE FROM entries WHERE id = ?', (entry_id,))
+
+    def add_index(self, index):
+        try:
+            kind = _INDEX_KINDS[type(index)]
+        except KeyError:
+            raise TypeError('unsupported index type: {0}'.format(type(index).__name__))
+        name = index.name.casefold()
+        argument = None if kind == 'type' else index.name
+        with self.transaction():
+            connection = self.connection
+            connection.execute('DELETE FROM index_values WHERE name = ?', (name,))
+            connection.execute(
+                'INSERT OR REPLACE INTO indexes (name, kind, argument) VALUES (?, ?, ?)',
+                (name, kind, argument),
+            )
+            for entry_id, key, entry in self._iter_rows():
+                self._insert_index_values(name, index, entry_id, entry)
+            self.indexes[index.name] = index
+
+    def _get_condition_sql(self, index, condition):
+        if isinstance(condition, Prefix):
+            prefix = index.normalize(condition.prefix)
+            return 'value >= ? AND value <= ?', [prefix, prefix + '\U0010ffff']
+        elif isinstance(condition, Range):
+            low, high = condition.low, condition.high
+            if condition.is_numeric():
+                sql = ["value != '' AND value NOT GLOB '*[^0-9]*'"]
+                params = []
+                if low is not None:
+                    sql.append('CAST(value AS INTEGER) >= ?')
+                    params.append(low)
+                if high is not None:
+                    sql.append('CAST(value AS INTEGER) <= ?')
+                    params.append(high)
+                return ' AND '.join(sql), params
+            sql = ['1']
+            params = []
+            if low is not None:
+                sql.append('value >= ?')
+                params.append(index.normalize(low))
+            if high is not None:
+                sql.append('value <= ?')
+                params.append(index.normalize(high))
+            return ' AND '.join(sql), params
+        elif isinstance(condition, Condition):
+            raise QueryError('unsupported condition: {0}'.format(type(condition).__name__))
+        else:
+            return 'value = ?', [index.normalize(condition)]
+
+    def query(self, conditions):
+        sql = ['SELECT key FROM entries']
+        params = []
+        for name, condition in conditions.items():
+            try:
+                index = self.indexes[name]
+            except KeyError:
+                raise QueryError('no index for {0}'.format(name))
+            condition_sql, condition_params = self._get_condition_sql(index, condition)
+            sql.append('AND' if params else 'WHERE')
+            sql.append(
+                'id IN (SELECT entry_id FROM index_values WHERE name = ? AND {0})'.format(condition_sql)
+            )
+            params.append(name.casefold())
+            params.extend(condition_params)
+        sql.append('ORDER BY id')
+        return [key for key, in self.connection.execute(' '.join(sql), params)]
+
+
+class SQLiteCrossrefGraph(CrossrefGraph):
+    """A :py:class:`.CrossrefGraph` for :py:class:`SQLiteEntries`.
+
+    Missing entries and cycles are looked for in the database, and only again
+    after the entries are changed.
+    """
+
+    def __init__(self, entries):
+        super(SQLiteCrossrefGraph, self).__init__(entries)
+        self._links = None
+
+    def _check_links(self):
+        entries = self.entries
+        if self._links is not None and self._links[0] == entries.version:
+            return self._links[1:]
+        missing = []
+        links = {}
+        keys = {}
+        rows = entries.connection.execute("""
+            SELECT entries.key, fields.value FROM fields
+            JOIN entries ON entries.id = fields.entry_id
+            WHERE fields.name = 'crossref' COLLATE NOCASE
+            ORDER BY entries.id
+        """)
+        for key, crossref in rows.fetchall():
+            if crossref in entries:
+                links[key.casefold()] = crossref.casefold()
+                keys[key.casefold()] = key
+            else:
+                missing.append((key, crossref))
+        self._links = entries.version, missing, self._find_cycles(links, keys)
+        return self._links[1:]
+
+
+class SQLiteBibliographyData(BibliographyData):
+    """Bibliography data stored in an SQLite database file.
+
+    :param filename: The database file name. It is created if it does not exist.
+        By default, a temporary in-memory database is used.
+
+    Entries added with :py:meth:`add_entry` or assigned to :py:attr:`entries`
+    are saved immediately, unless this is done inside :py:meth:`transaction`.
+    Objects opened with the same file name are pickled as references to the file,
+    so they can be passed to worker processes.
+    """
+
+    def __init__(self, filename=':memory:', min_crossrefs=2, timeout=5.0):
+        self.filename = filename
+        self.min_crossrefs = min_crossrefs
+        self.timeout = timeout
+        self.wanted_entries = None
+        self.citations = CaseInsensitiveSet()
+        self.crossref_count = CaseInsensitiveDefaultDict(int)
+        self._crossref_graph = None
+
+        connection = sqlite3.connect(filename, timeout=timeout, isolation_level=None)
+        schema_version, = connection.execute('PRAGMA user_version').fetchone()
+        if schema_version == 0:
+            if filename != ':memory:':
+                connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('BEGIN IMMEDIATE')
+            # another process might have created the tables in the meantime
+            schema_version, = connection.execute('PRAGMA user_version').fetchone()
+            if schema_version == 0:
+                for statement in _SCHEMA.split(';'):
+                    connection.execute(statement)
+                connection.execute('PRAGMA user_version = {0}'.format(SCHEMA_VERSION))
+                schema_version = SCHEMA_VERSION
+            connection.execute('COMMIT')
+        if schema_version != SCHEMA_VERSION:
+            connection.close()
+            raise PybtexError(
+                'unsupported database schema version: {0}'.format(schema_version),
+                filename=filename,
+            )
+        self.entries = SQLiteEntries(connection)
+        self._preamble = [
+            value for value, in connection.execute('SELECT value FROM preamble ORDER BY position')
+        ]
+
+    def __reduce__(self):
+        if self.filename == ':memory:':
+            raise TypeError('cannot pickle an in-memory {0}'.format(type(self).__name__))
+        return type(self), (self.filename, self.min_crossrefs, self.timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.entries.connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group the changes made inside the ``with`` block into a single transaction.
+
+        If the block raises an exception, all changes are rolled back.
+        Nested transactions are merged into the outermost one.
+        """
+        try:
+            with self.entries.transaction():
+                yield
+        except BaseException:
+            self._preamble = [
+                value for value, in self.entries.connection.execute(
+                    'SELECT value FROM preamble ORDER BY position'
+                )
+            ]
+            raise
+
+    def add_to_preamble(self, *values):
+        with self.transaction():
+            self.entries.connection.executemany(
+                'INSERT INTO preamble (position, value) VALUES (?, ?)',
+                enumerate(values, len(self._preamble)),
+            )
+            self._preamble.extend(values)
+
+    def import_file(self, file, bib_format=None, **kwargs):
+        """Import the entries and the preamble from a file in any supported format,
+        in a single transaction.
+
+        The entries are added one by one as they are parsed, as with
+        :py:func:`pybtex.database.iter_entries`. Repeated entries are reported
+        and skipped, like with :py:meth:`add_entry`.
+
+        :param file: A file name.
+        :param bib_format: Data format ("bibtex", "yaml", etc.).
+            If not specified, Pybtex will try to guess by the file name.
+        """
+        parser = find_plugin('pybtex.database.input', bib_format, filename=file)(**kwargs)
+        with self.transaction():
+            self.add_entries(parser.iter_entries(file))
+            self.add_to_preamble(*parser.data.preamble_list)
+
+    def iter_entries(self):
+        """Yield ``(key, entry)`` pairs for all entries, one by one.
+
+        The same as ``entries.items()``.
+        """
+        return iter(self.entries.items())
+
+    def add_index(self, index):
+        """Add a :py:class:`.FieldIndex`, :py:class:`.PersonIndex` or :py:class:`.TypeIndex`.
+
+        Indexes are stored in the database and are kept up to date
+        as entries are added, replaced and deleted.
+        """
+        self.entries.add_index(index)
+
+    def query(self, **conditions):
+        return self.entries.query(conditions)
+
+    @property
+    def crossref_graph(self):
+        graph = self._crossref_graph
+        if graph is None or graph.entries is not self.entries:
+            graph = self._crossref_graph = SQLiteCrossrefGraph(self.entries)
+        return graph
+
+    def lower(self):
+        entries_lower = ((key.lower(), entry.lower()) for key, entry in self.entries.items())
+        return BibliographyData(
+            entries=entries_lower,
+            preamble=self._preamble,
+            min_crossrefs=self.min_crossrefs,
+        )
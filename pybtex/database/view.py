@@ -0,0 +1,144 @@
+# Copyright (c) 2006-2021  Andrey Golovizin
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+"""Read-only views of the cited entries of a :py:class:`.BibliographyData`.
+
+>>> from pybtex.database import BibliographyData, Entry
+>>> bib_data = BibliographyData([
+...     ('one', Entry('inbook', fields={'crossref': 'book'})),
+...     ('two', Entry('inbook', fields={'crossref': 'book'})),
+...     ('three', Entry('inbook', fields={'crossref': 'book'})),
+...     ('book', Entry('book', fields={'title': 'The Book'})),
+... ])
+>>> view = bib_data.view(['two', 'Missing'])
+>>> list(view.entries.keys())
+['two']
+>>> view.missing_citations
+['Missing']
+
+Entries referenced by ``crossref`` fields can be looked up, but are only
+listed if they are referenced at least ``min_crossrefs`` times:
+
+>>> print(view.entries['two']._find_field('title', view))
+The Book
+>>> 'book' in view.entries
+True
+>>> list(bib_data.view(['three', 'one']).entries.keys())
+['three', 'one', 'book']
+>>> list(bib_data.view(['*'], min_crossrefs=1).entries.keys())
+['one', 'two', 'three', 'book']
+
+.. versionadded:: 0.26
+"""
+
+from __future__ import unicode_literals
+
+from itertools import chain
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from pybtex.database import BibliographyData
+from pybtex.utils import CaseInsensitiveDefaultDict, CaseInsensitiveSet
+
+
+class EntriesView(Mapping):
+    """A read-only mapping of some of the entries of another mapping.
+
+    Iterating over the view yields the listed keys only, but the hidden
+    keys can be looked up as well.
+    """
+
+    def __init__(self, entries, keys, hidden_keys=()):
+        self._entries = entries
+        self._keys = keys
+        self._all_keys = CaseInsensitiveSet(chain(keys, hidden_keys))
+
+    def __getitem__(self, key):
+        if key not in self._all_keys:
+            raise KeyError(key)
+        return self._entries[key]
+
+    def __contains__(self, key):
+        return key in self._all_keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, list(self.items()))
+
+
+class BibliographyDataView(BibliographyData):
+    """A read-only subset of a :py:class:`.BibliographyData`
+    that shares the entries and the preamble with it.
+
+    See :py:meth:`.BibliographyData.view`.
+    """
+
+    def __init__(self, bib_data, citations, min_crossrefs=2):
+        self.bib_data = bib_data
+        self.min_crossrefs = min_crossrefs
+        self.wanted_entries = None
+        self.citations = CaseInsensitiveSet()
+        self.crossref_count = CaseInsensitiveDefaultDict(int)
+        self._preamble = bib_data._preamble
+        self._crossref_graph = None
+
+        entries = bib_data.entries
+        self.missing_citations = []
+        """The citations not found in the data."""
+
+        keys = []
+        for key in bib_data.add_extra_citations(citations, min_crossrefs):
+            if key in entries:
+                keys.append(entries[key].key or key)
+            else:
+                self.missing_citations.append(key)
+        self.entries = EntriesView(entries, keys, self._get_crossreferenced_keys(keys))
+
+    def _get_crossreferenced_keys(self, keys):
+        """Yield the keys of the entries referenced by the entries with the given keys, directly or not."""
+        entries = self.bib_data.entries
+        seen = CaseInsensitiveSet(keys)
+        for key in keys:
+            crossref = entries[key].fields.get('crossref')
+            while crossref is not None and crossref in entries and crossref not in seen:
+                seen.add(crossref)
+                yield crossref
+                crossref = entries[crossref].fields.get('crossref')
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('{0} is read-only'.format(type(self).__name__))
+
+    add_entry = add_entries = add_to_preamble = add_index = _read_only
+
+    def lower(self):
+        return BibliographyData(
+            entries=((key.lower(), entry.lower()) for key, entry in self.entries.items()),
+            preamble=self._preamble,
+            min_crossrefs=self.min_crossrefs,
+        )
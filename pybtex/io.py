@@ -24,6 +24,7 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import codecs
 import io
 import posixpath
 import sys
@@ -37,6 +38,36 @@ def get_default_encoding():
     return 'UTF-8'
 
 
+def is_ascii_compatible(encoding):
+    """Return True if ASCII bytes always mean ASCII characters in this encoding.
+
+    Data in such encodings can be scanned for ASCII characters
+    without decoding it first.
+
+    >>> is_ascii_compatible('UTF-8')
+    True
+    >>> is_ascii_compatible('latin1')
+    True
+    >>> is_ascii_compatible('cp1251')
+    True
+    >>> is_ascii_compatible('UTF-16')
+    False
+    >>> is_ascii_compatible('shift_jis')
+    False
+    """
+    if codecs.lookup(encoding).name in ('utf-8', 'utf-8-sig'):
+        return True
+    ascii_bytes = bytes(range(128))
+    non_ascii_bytes = bytes(range(128, 256))
+    try:
+        if ascii_bytes.decode(encoding) != ascii_bytes.decode('ascii'):
+            return False
+    except UnicodeDecodeError:
+        return False
+    # in single-byte encodings, every byte is a separate character
+    return len(non_ascii_bytes.decode(encoding, 'replace')) == len(non_ascii_bytes)
+
+
 def get_stream_encoding(stream):
     stream_encoding = getattr(stream, 'encoding', None)
     return stream_encoding or get_default_encoding()
@@ -28,6 +28,7 @@ from pybtex.richtext import String, Text, Protected
 class LaTeXParser(Scanner):
     LBRACE = Literal(u'{')
     RBRACE = Literal(u'}')
+    lazy_lineno = True
 
     def parse(self, level=0):
         """
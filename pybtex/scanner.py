@@ -24,6 +24,7 @@
 from __future__ import unicode_literals
 
 import re
+from bisect import bisect_right
 
 from pybtex.exceptions import PybtexError
 
@@ -41,6 +42,7 @@ class Pattern(object):
     def __init__(self, regexp, description, flags=0):
         self.description = description
         compiled_regexp = re.compile(regexp, flags=flags)
+        self.regexp = compiled_regexp.pattern
         self.search = compiled_regexp.search
         self.match = compiled_regexp.match
         self.findall = compiled_regexp.findall
@@ -53,18 +55,115 @@ class Literal(Pattern):
         super(Literal, self).__init__(pattern, description)
 
 
+def to_binary_regexp(regexp):
+    r"""Convert an ASCII-only text regexp to a bytes regexp.
+
+    In text regexps, ``\s`` also matches ``\x1c-\x1f``,
+    so these characters are added explicitly.
+
+    >>> print(to_binary_regexp(r'\s*[^\s,]+').decode('ascii'))
+    [\s\x1c-\x1f]*[^\s\x1c-\x1f,]+
+    """
+    result = []
+    in_class = False
+    chars = iter(regexp)
+    for char in chars:
+        if char == '\\':
+            char += next(chars)
+            if char == r'\s':
+                char = r'\s\x1c-\x1f' if in_class else r'[\s\x1c-\x1f]'
+        elif char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        result.append(char)
+    return ''.join(result).encode('ascii')
+
+
+class PatternGroup(object):
+    """Several patterns combined into a single regular expression.
+
+    Matching a group is equivalent to skipping whitespace and trying each
+    pattern in turn, as :py:meth:`Scanner.get_token` does, but takes only
+    one regex call.
+
+    If ``binary`` is True, the group matches bytes instead of text.
+    """
+
+    def __init__(self, patterns, description=None, flags=0, binary=False):
+        self.patterns = {}
+        alternatives = []
+        for i, pattern in enumerate(patterns):
+            group_name = 'p{0}'.format(i)
+            self.patterns[group_name] = pattern
+            alternatives.append('(?P<{0}>{1})'.format(group_name, pattern.regexp))
+        if description is None:
+            description = ' or '.join(pattern.description for pattern in patterns)
+        self.description = description
+        self.alternatives = '|'.join(alternatives)
+        regexp = r'\s*(?:{0})?'.format(self.alternatives)
+        if binary:
+            regexp = to_binary_regexp(regexp)
+        self.match = re.compile(regexp, flags=flags).match
+
+
 class Scanner(object):
     text = None
-    lineno = 1
     pos = 0
     WHITESPACE = Pattern(r'\s+', 'whitespace')
     NEWLINE = Pattern(r'\n|(\r\n)|\r', 'newline')
 
+    lazy_lineno = False
+    """If True, only :py:attr:`pos` is tracked while scanning.
+
+    Line numbers are then computed on demand by bisecting a list of
+    line start offsets, which is built on first use.
+    """
+
+    _lineno = 1
+    _line_starts = None
+
     def __init__(self, text, filename=None):
         self.text = text
         self.end_pos = len(text)
         self.filename = filename
 
+    @property
+    def lineno(self):
+        if self.lazy_lineno:
+            return self.get_lineno(self.pos)
+        return self._lineno
+
+    @lineno.setter
+    def lineno(self, value):
+        self._lineno = value
+
+    def get_line_starts(self):
+        if self._line_starts is None:
+            self._line_starts = [0] + [
+                match.end() for match in re.finditer(self.NEWLINE.regexp, self.text)
+            ]
+        return self._line_starts
+
+    def get_lineno(self, pos):
+        r"""Return the number of the line containing the given position.
+
+        >>> scanner = Scanner('one\ntwo\r\nthree\rfour')
+        >>> [scanner.get_lineno(pos) for pos in (0, 3, 4, 8, 9, 15)]
+        [1, 1, 2, 2, 3, 4]
+        """
+        return bisect_right(self.get_line_starts(), pos)
+
+    def get_line_span(self, lineno):
+        """Return the start and end positions of the given line.
+
+        The end position includes the trailing newline characters.
+        """
+        line_starts = self.get_line_starts()
+        start = line_starts[lineno - 1]
+        end = line_starts[lineno] if lineno < len(line_starts) else self.end_pos
+        return start, end
+
     def skip_to(self, patterns):
         end = None
         winning_pattern = None
@@ -81,8 +180,10 @@ class Scanner(object):
             return Token(value, winning_pattern)
 
     def update_lineno(self, value):
+        if self.lazy_lineno:
+            return
         num_newlines = value.count("\n") + value.count("\r") - value.count("\r\n")
-        self.lineno += num_newlines
+        self._lineno += num_newlines
 
     def eat_whitespace(self):
         whitespace = self.WHITESPACE.match(self.text, self.pos)
@@ -108,6 +209,45 @@ class Scanner(object):
                 # print '->', value
                 return Token(value, pattern)
 
+    def get_token_tuple(self, group):
+        """Get the next token matching a :py:class:`PatternGroup`.
+
+        Return a ``(value, pattern)`` tuple, or None if nothing matches.
+        """
+        pos = self.pos
+        match = group.match(self.text, pos)
+        group_name = match.lastgroup
+        if group_name is None:
+            token_start = token_end = match.end()
+        else:
+            token_start, token_end = match.span(group_name)
+        if token_start != pos:
+            if not self.lazy_lineno:
+                self.update_lineno_range(pos, token_start)
+            self.pos = token_start
+        if token_start == self.end_pos:
+            raise PrematureEOF(self)
+        if group_name is None:
+            return None
+        self.pos = token_end
+        return match.group(group_name), group.patterns[group_name]
+
+    def required_tuple(self, group):
+        token = self.get_token_tuple(group)
+        if token is None:
+            raise TokenRequired(group.description, self)
+        return token
+
+    def update_lineno_range(self, start, end):
+        if self.lazy_lineno:
+            return
+        text = self.text
+        num_newlines = text.count('\n', start, end)
+        num_cr = text.count('\r', start, end)
+        if num_cr:
+            num_newlines += num_cr - text.count('\r\n', start, end)
+        self._lineno += num_newlines
+
     def optional(self, patterns, allow_eof=False):
         return self.get_token(patterns, allow_eof=allow_eof)
 
@@ -126,11 +266,9 @@ class Scanner(object):
     def get_error_context(self, context_info):
         error_lineno, error_pos = context_info
         if error_lineno is not None:
-            error_lineno0 = error_lineno - 1
-            lines = self.text.splitlines(True)
-            before_error = ''.join(lines[:error_lineno0])
-            colno = error_pos - len(before_error)
-            context = lines[error_lineno0].rstrip('\r\n')
+            line_start, line_end = self.get_line_span(error_lineno)
+            colno = error_pos - line_start
+            context = self.text[line_start:line_end].rstrip('\r\n')
         else:
             colno = None
             context = None
@@ -24,13 +24,13 @@
 from __future__ import print_function, unicode_literals
 
 import itertools
-from collections import OrderedDict, deque
+from collections import deque, namedtuple
 from functools import wraps
 from types import GeneratorType
 try:
-    from collections.abc import MutableMapping, MutableSet, Sequence
+    from collections.abc import ItemsView, Mapping, MutableMapping, MutableSet, Sequence
 except ImportError:
-    from collections import MutableMapping, MutableSet, Sequence
+    from collections import ItemsView, Mapping, MutableMapping, MutableSet, Sequence
 
 from itertools import zip_longest
 
@@ -64,6 +64,64 @@ def memoize(f, capacity=1024):
     return new_f
 
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class BoundedCache(object):
+    """A cache holding at most ``capacity`` items.
+    When the cache is full, the oldest items are removed first, as in :py:func:`memoize`.
+
+    >>> cache = BoundedCache(capacity=2)
+    >>> print(cache.get('a'))
+    None
+    >>> cache.add('a', 1)
+    >>> cache.add('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.add('c', 3)
+    >>> print(cache.get('a'))
+    None
+    >>> cache.get('c')
+    3
+    >>> cache.cache_info()
+    CacheInfo(hits=2, misses=2, maxsize=2, currsize=2)
+    >>> cache.clear()
+    >>> cache.cache_info()
+    CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.clear()
+
+    def get(self, key):
+        try:
+            value = self.memory[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def add(self, key, value):
+        if self.capacity <= 0 or key in self.memory:
+            return
+        while len(self.history) >= self.capacity:
+            self.memory.pop(self.history.popleft(), None)
+        self.memory[key] = value
+        self.history.append(key)
+
+    def clear(self):
+        self.memory = {}
+        self.history = deque()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self):
+        """Return the cache statistics, like :py:func:`functools.lru_cache` does."""
+        return CacheInfo(self.hits, self.misses, self.capacity, len(self.memory))
+
+
 def collect_iterable(f):
     @wraps(f)
     def new_f(*args, **kwargs):
@@ -77,6 +135,16 @@ def pairwise(iterable):
     return zip_longest(a, b)
 
 
+_missing = object()
+
+
+class _CaseInsensitiveItemsView(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
 class CaseInsensitiveDict(MutableMapping):
     """A dict with case-insensitive lookup.
 
@@ -137,45 +205,167 @@ class CaseInsensitiveDict(MutableMapping):
     ... )
     CaseInsensitiveDict({'a': 'b'})
 
+    Keys are compared with :py:meth:`str.casefold`:
+
+    >>> d = CaseInsensitiveDict({'Straße': 'street'})
+    >>> print(d['STRASSE'])
+    street
+    >>> d.update([('STRASSE', 'road')], Weg='way')
+    >>> d
+    CaseInsensitiveDict({'STRASSE': 'road', 'Weg': 'way'})
+    >>> d.copy() == d
+    True
+    >>> d.copy() == CaseInsensitiveDict({'strasse': 'road', 'weg': 'way'})
+    False
+    >>> list(d.values())
+    ['road', 'way']
+    >>> ('weg', 'way') in d.items()
+    True
+    >>> ('Strasse', 'road') in CaseInsensitiveDict({'strasse': 'road'}).items()
+    True
+
     """
 
+    # _dict maps case-folded keys to values, in insertion order;
+    # _keys maps case-folded keys to the original keys, only if they differ
+    __slots__ = ('_dict', '_keys')
+
     def __init__(self, *args, **kwargs):
-        initial = dict(*args, **kwargs)
-        self._dict = dict((key.lower(), value) for key, value in initial.items())
-        self._keys = dict((key.lower(), key) for key in initial)
+        self._dict = {}
+        self._keys = {}
+        # bypass __setitem__ overridden in subclasses
+        self._update_items(dict(*args, **kwargs).items())
+
+    def __getstate__(self):
+        return {'_dict': self._dict, '_keys': self._keys}
+
+    def __setstate__(self, state):
+        self._dict = state['_dict']
+        # older versions stored all keys in _keys
+        self._keys = dict(
+            (key_lower, key) for key_lower, key in state['_keys'].items()
+            if key != key_lower
+        )
 
     def __len__(self):
         return len(self._dict)
 
     def __iter__(self):
-        return iter(self._keys.values())
+        keys = self._keys
+        if not keys:
+            return iter(self._dict)
+        return map(keys.get, self._dict, self._dict)
 
     def __setitem__(self, key, value):
         """To implement lowercase keys."""
-        key_lower = key.lower()
-        self._dict[key_lower] = value
-        self._keys[key_lower] = key
+        key_folded = key.casefold()
+        if key_folded == key:
+            # store the original (possibly interned) string instead of a copy
+            self._dict[key] = value
+            if self._keys:
+                self._keys.pop(key, None)
+        else:
+            self._dict[key_folded] = value
+            self._keys[key_folded] = key
+
+    # Case-folded keys are looked up directly.
+    # Any string equal to a stored key is already case-folded,
+    # so the key is folded only if the first lookup fails.
 
     def __getitem__(self, key):
-        return self._dict[key.lower()]
+        d = self._dict
+        if key in d:
+            return d[key]
+        return d[key.casefold()]
+
+    def get(self, key, default=None):
+        d = self._dict
+        if key in d:
+            return d[key]
+        return d.get(key.casefold(), default)
 
     def __delitem__(self, key):
-        key_lower = key.lower()
-        del self._dict[key_lower]
-        del self._keys[key_lower]
+        key_folded = key.casefold()
+        del self._dict[key_folded]
+        self._keys.pop(key_folded, None)
 
     def __contains__(self, key):
-        return key.lower() in self._dict
+        return key in self._dict or key.casefold() in self._dict
+
+    def __eq__(self, other):
+        if isinstance(other, CaseInsensitiveDict):
+            return self._dict == other._dict and self._keys == other._keys
+        return super(CaseInsensitiveDict, self).__eq__(other)
 
     def __repr__(self):
         """A caselessDict version of __repr__ """
-        dct = dict((key, self[key]) for key in self)
         return '{0}({1})'.format(
-            type(self).__name__, repr(dct),
+            type(self).__name__, repr(dict(self._iter_items())),
         )
 
+    def _iter_items(self):
+        d = self._dict
+        keys = self._keys
+        if not keys:
+            return iter(d.items())
+        return zip(map(keys.get, d, d), d.values())
+
+    def _update_items(self, items):
+        d = self._dict
+        keys = self._keys
+        for key, value in items:
+            key_folded = key.casefold()
+            if key_folded == key:
+                d[key] = value
+                if keys:
+                    keys.pop(key, None)
+            else:
+                d[key_folded] = value
+                keys[key_folded] = key
+
+    def items(self):
+        return _CaseInsensitiveItemsView(self)
+
+    def values(self):
+        return self._dict.values()
+
+    def update(self, other=(), **kwargs):
+        if isinstance(other, CaseInsensitiveDict):
+            other = other._iter_items()
+        elif isinstance(other, Mapping):
+            other = other.items()
+        elif hasattr(other, 'keys'):
+            other = [(key, other[key]) for key in other.keys()]
+        if type(self).__setitem__ is CaseInsensitiveDict.__setitem__:
+            self._update_items(other)
+            self._update_items(kwargs.items())
+        else:
+            # call __setitem__ overridden in subclasses
+            for key, value in other:
+                self[key] = value
+            for key, value in kwargs.items():
+                self[key] = value
+
+    def setdefault(self, key, default=None):
+        value = self.get(key, _missing)
+        if value is _missing:
+            self[key] = value = default
+        return value
+
+    def copy(self):
+        result = type(self).__new__(type(self))
+        result._dict = self._dict.copy()
+        result._keys = self._keys.copy()
+        return result
+
     def items_lower(self):
-        return ((key.lower(), value) for key, value in self.items())
+        keys = self._keys
+        if not keys:
+            return iter(self._dict.items())
+        return (
+            (keys[key_folded].lower() if key_folded in keys else key_folded, value)
+            for key_folded, value in self._dict.items()
+        )
 
     def lower(self):
         return type(self)(self.items_lower())
@@ -200,10 +390,30 @@ class CaseInsensitiveDefaultDict(CaseInsensitiveDict):
     10
 
     """
+    __slots__ = ('default_factory',)
+
     def __init__(self, default_factory):
         super(CaseInsensitiveDefaultDict, self).__init__()
         self.default_factory = default_factory
 
+    def __getstate__(self):
+        state = super(CaseInsensitiveDefaultDict, self).__getstate__()
+        state['default_factory'] = self.default_factory
+        return state
+
+    def __setstate__(self, state):
+        super(CaseInsensitiveDefaultDict, self).__setstate__(state)
+        self.default_factory = state['default_factory']
+
+    def get(self, key, default=None):
+        # like collections.defaultdict, do not call default_factory here
+        return super(CaseInsensitiveDefaultDict, self).get(key, default)
+
+    def copy(self):
+        result = super(CaseInsensitiveDefaultDict, self).copy()
+        result.default_factory = self.default_factory
+        return result
+
     def __getitem__(self, key):
         try:
             return super(CaseInsensitiveDefaultDict, self).__getitem__(key)
@@ -279,10 +489,8 @@ class OrderedCaseInsensitiveDict(CaseInsensitiveDict):
     ['one', 3, 'four']
     """
 
-    def __init__(self, *args, **kwargs):
-        initial = OrderedDict(*args, **kwargs)
-        self._dict = dict((key.lower(), value) for key, value in initial.items())
-        self._keys = OrderedDict((key.lower(), key) for key in initial)
+    # CaseInsensitiveDict is already ordered, since dicts preserve insertion order
+    __slots__ = ()
 
     def __repr__(self):
         return '{0}({1})'.format(
@@ -305,6 +513,10 @@ class CaseInsensitiveSet(MutableSet):
     CaseInsensitiveSet(['Aaa', 'Bbb'])
     >>> s.lower()
     CaseInsensitiveSet(['aaa', 'bbb'])
+    >>> sorted(CaseInsensitiveSet(['Straße', 'ὈΔΥΣΣΕΎΣ']))
+    ['straße', 'ὀδυσσεύς']
+    >>> CaseInsensitiveSet(['Straße']).lower()
+    CaseInsensitiveSet(['straße'])
     >>> len(s)
     2
     >>> 'aaa' in s
@@ -341,39 +553,67 @@ class CaseInsensitiveSet(MutableSet):
 
     """
 
+    # _keys maps lowercase keys to the original keys, only if they differ
+    __slots__ = ('_set', '_keys')
+
     def __init__(self, iterable=()):
         self._set = set()
         self._keys = dict()
         for item in iterable:
             self.add(item)
 
+    def __getstate__(self):
+        return {'_set': self._set, '_keys': self._keys}
+
+    def __setstate__(self, state):
+        self._set = state['_set']
+        self._keys = dict(
+            (key_lower, key) for key_lower, key in state['_keys'].items()
+            if key != key_lower
+        )
+
     def __contains__(self, key):
-        return key.lower() in self._set
+        return key in self._set or key.casefold() in self._set
 
     def __iter__(self):
-        return iter(self._set)
+        keys = self._keys
+        if not keys:
+            return iter(self._set)
+        return (
+            keys[key_folded].lower() if key_folded in keys else key_folded
+            for key_folded in self._set
+        )
 
     def __len__(self):
         return len(self._set)
 
     def __repr__(self):
         """A caselessDict version of __repr__ """
+        keys = self._keys
         return '{0}({1})'.format(
-            type(self).__name__, repr(sorted(self._keys.values()))
+            type(self).__name__, repr(sorted(keys.get(key_lower, key_lower) for key_lower in self._set))
         )
 
     def add(self, key):
-        key_lower = key.lower()
-        self._set.add(key_lower)
-        self._keys[key_lower] = key
+        key_folded = key.casefold()
+        if key_folded == key:
+            self._set.add(key)
+            if self._keys:
+                self._keys.pop(key, None)
+        else:
+            self._set.add(key_folded)
+            self._keys[key_folded] = key
 
     def discard(self, key):
-        key_lower = key.lower()
-        self._set.discard(key_lower)
-        self._keys.pop(key_lower, None)
+        key_folded = key.casefold()
+        self._set.discard(key_folded)
+        self._keys.pop(key_folded, None)
 
     def get_canonical_key(self, key):
-        return self._keys[key.lower()]
+        key_folded = key.casefold()
+        if key_folded not in self._set:
+            raise KeyError(key)
+        return self._keys.get(key_folded, key_folded)
 
     def lower(self):
-        return type(self)(self._set)
+        return type(self)(self)
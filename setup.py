@@ -98,6 +98,7 @@ setup(
             'pybtex = pybtex.__main__:main',
             'pybtex-convert = pybtex.database.convert.__main__:main',
             'pybtex-format = pybtex.database.format.__main__:main',
+            'pybtex-bst2py = pybtex.bibtex.bst2py.__main__:main',
         ],
         'pybtex.database.input': [
             'bibtex = pybtex.database.input.bibtex:Parser',
@@ -31,12 +31,25 @@ https://github.com/matthew-brett/babybib
 
 from __future__ import absolute_import, unicode_literals
 
+import asyncio
+import io
+import pickle
+import random
+import threading
 from unittest import TestCase
 
 from itertools import zip_longest
 
+import pytest
+from pybtex import errors
 from pybtex.database import BibliographyData, Entry, Person
-from pybtex.database.input.bibtex import Parser
+from pybtex.database.input.cache import ParseCache
+from pybtex.database.input.incremental import BibliographyChanges, IncrementalParser
+from pybtex.database.input.bibtex import (
+    FastLowLevelParser, LowLevelParser, Parser
+)
+
+from .utils import get_data
 
 
 class _TestParser(Parser):
@@ -60,9 +73,25 @@ class ParserTest(object):
             self.input_strings = [self.input_string]
 
     def test_parser(self):
-        parser = _TestParser(encoding='UTF-8', **self.parser_options)
+        for low_level_parser in LowLevelParser, FastLowLevelParser:
+            parser = _TestParser(encoding='UTF-8', low_level_parser=low_level_parser, **self.parser_options)
+            for input_string in self.input_strings:
+                parser.parse_string(input_string)
+            self.check_result(parser)
+
+    def test_lazy_parser(self):
+        parser = _TestParser(encoding='UTF-8', lazy_entries=True, **self.parser_options)
         for input_string in self.input_strings:
             parser.parse_string(input_string)
+        self.check_result(parser)
+
+    def test_bytes_parser(self):
+        parser = _TestParser(encoding='UTF-8', **self.parser_options)
+        for input_string in self.input_strings:
+            parser.parse_buffer(input_string.encode('UTF-8'))
+        self.check_result(parser)
+
+    def check_result(self, parser):
         result = parser.data
         correct_result = self.correct_result
         assert result == correct_result
@@ -541,3 +570,506 @@ class DuplicatePersonFieldTest(ParserTest, TestCase):
     errors = [
         'entry with key Me2009 has a duplicate AUTHoR field',
     ]
+
+
+class UnbalancedBracesTest(ParserTest, TestCase):
+    input_string = u"""
+        @article{unbalanced,
+            title = "Unbalanced}",
+        }
+        @article{nested,
+            title = {""" + '{' * 101 + '}' * 101 + u"""},
+        }
+        @article{eof,
+            title = "Premature
+    """
+    correct_result = BibliographyData([
+        ('unbalanced', Entry('article')),
+        ('nested', Entry('article')),
+        ('eof', Entry('article')),
+    ])
+    errors = [
+        'syntax error in line 3: unbalanced braces',
+        'syntax error in line 6: too many nested braces',
+        'syntax error in line 9: premature end of file',
+    ]
+
+
+class UnwantedEntriesTest(ParserTest, TestCase):
+    input_string = u"""
+        @string{journal = "Journal"}
+        @article{skipped, title = {A {Nested {Title}}} # " " # undefined, year = 2000,}
+        @article{wanted, title = "Wanted", journal = journal, crossref = "cited"}
+        @article{unbalanced, title = "Unbalanced}"}
+        @article{unclosed, title = {Missing brace}
+        @article{cited, title = "Cited" # undefined}
+        @article{deep, title = {{{{{{{{{{{Deep}}}}}}}}}}}, year = 2000}
+    """
+    parser_options = {'wanted_entries': ['wanted']}
+    correct_result = BibliographyData([
+        ('wanted', Entry('article', [('title', 'Wanted'), ('journal', 'Journal'), ('crossref', 'cited')])),
+        ('cited', Entry('article', [('title', 'Cited')])),
+    ])
+    errors = [
+        'syntax error in line 5: unbalanced braces',
+        'undefined string in line 7: undefined',
+    ]
+
+
+def test_memory_map(tmp_path):
+    bib_file = tmp_path / 'xampl.bib'
+    bib_file.write_text(get_data('xampl.bib'), encoding='UTF-8')
+    empty_bib_file = tmp_path / 'empty.bib'
+    empty_bib_file.write_bytes(b'')
+
+    data = Parser().parse_file(str(bib_file))
+    mapped_data = Parser(memory_map=True).parse_file(str(bib_file))
+    assert mapped_data == data
+    assert len(mapped_data.entries) == len(data.entries) > 0
+
+    wanted_data = Parser(memory_map=True, wanted_entries=['whole-set']).parse_file(str(bib_file))
+    assert list(wanted_data.entries.keys()) == ['whole-set']
+
+    assert Parser(memory_map=True).parse_file(str(empty_bib_file)) == BibliographyData()
+
+    with open(str(bib_file), 'rb') as bytes_stream:
+        assert Parser(memory_map=True).parse_file(bytes_stream) == data
+    assert Parser(memory_map=True).parse_file(io.StringIO(get_data('xampl.bib'))) == data
+
+
+def test_iter_entries(tmp_path):
+    bib_file = tmp_path / 'xampl.bib'
+    bib_file.write_text(get_data('xampl.bib'), encoding='UTF-8')
+
+    data = Parser().parse_file(str(bib_file))
+    for options in {}, {'memory_map': True}, {'lazy_entries': True}:
+        parser = Parser(**options)
+        assert list(parser.iter_entries(str(bib_file))) == list(data.entries.items())
+        assert parser.data.entries == {}
+        assert parser.data.preamble == data.preamble
+
+    bib_file.write_text("""
+        @article{unwanted, title = "Unwanted", crossref = "cited"}
+        @article{citing, title = "Citing", crossref = "cited"}
+        @article{Citing, title = "Repeated"}
+        @article{cited, title = "Cited"}
+    """)
+    for options in {}, {'memory_map': True}:
+        parser = _TestParser(wanted_entries=['citing'], **options)
+        assert [key for key, entry in parser.iter_entries(str(bib_file))] == ['citing', 'citing', 'cited']
+        assert parser.errors == []
+
+
+class _AsyncTestParser(_TestParser):
+    async_batch_size = 2
+
+    def __init__(self, *args, **kwargs):
+        super(_AsyncTestParser, self).__init__(*args, **kwargs)
+        self.batches = 0
+        self.batch_started = threading.Event()
+        self.resume = threading.Event()
+        self.closed = threading.Event()
+
+    def iter_entries(self, filename, file_suffix=None):
+        try:
+            for key, entry in super(_AsyncTestParser, self).iter_entries(filename, file_suffix):
+                yield key, entry
+        finally:
+            self.closed.set()
+
+    def parse_batch(self, entries):
+        self.batches += 1
+        self.batch_started.set()
+        self.resume.wait(5)
+        return super(_AsyncTestParser, self).parse_batch(entries)
+
+
+def test_parse_file_async(tmp_path):
+    bib_file = tmp_path / 'xampl.bib'
+    bib_file.write_text(get_data('xampl.bib'), encoding='UTF-8')
+    data = Parser().parse_file(str(bib_file))
+
+    async def parse():
+        parser = _AsyncTestParser()
+        parser.resume.set()
+        assert await parser.parse_file_async(str(bib_file)) == data
+        assert parser.batches == len(data.entries) // 2 + 1
+        assert parser.closed.is_set()
+
+    async def cancel():
+        loop = asyncio.get_running_loop()
+        parser = _AsyncTestParser()
+        task = asyncio.ensure_future(parser.parse_file_async(str(bib_file)))
+        assert await loop.run_in_executor(None, parser.batch_started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not parser.closed.is_set()
+        parser.resume.set()
+        assert await loop.run_in_executor(None, parser.closed.wait, 5)
+        assert parser.batches == 1
+
+    asyncio.run(parse())
+    asyncio.run(cancel())
+
+
+class _ParallelTestParser(_TestParser):
+    min_chunk_size = 256
+
+
+def test_parallel_parser():
+    commands = []
+    for i in range(60):
+        if i % 10 == 0:
+            commands.append('@string{{journal = "Journal {0}"}}'.format(i))
+        if i % 15 == 0:
+            commands.append('@preamble{{"preamble {0}"}}'.format(i))
+        commands.append("""
+            @article{{key{0},
+                author = "Doe, John and Roe, Jane",
+                journal = journal,
+                title = {{Title {{{0}}}}},
+                note = {1},
+                TITLE = "Duplicate",
+            }}
+        """.format(i % 50, 'undefined' if i % 20 == 0 else '"note"'))
+    text = '\n'.join(commands)
+
+    parser = _TestParser()
+    with errors.capture() as reported_errors:
+        data = parser.parse_string(text)
+    parallel_parser = _ParallelTestParser(processes=3)
+    assert len(parallel_parser.split_text(text)) > 1
+    with errors.capture() as parallel_reported_errors:
+        parallel_data = parallel_parser.parse_string(text)
+
+    assert [str(error) for error in parallel_reported_errors] == [str(error) for error in reported_errors]
+    assert reported_errors
+    assert parallel_data == data
+    assert list(parallel_data.entries.keys()) == list(data.entries.keys())
+    assert parallel_data.preamble_list == data.preamble_list
+    assert list(parallel_parser.macros.items()) == list(parser.macros.items())
+    assert [str(error) for error in parallel_parser.errors] == [str(error) for error in parser.errors]
+    assert any(' in line ' in str(error) for error in parser.errors)
+
+
+def test_parallel_parser_unsafe_boundary():
+    text = ''.join(
+        '@article{{key{0},\n  abstract = {{Starts with\n@ sign}},\n}}\n'.format(i)
+        for i in range(50)
+    )
+    data = _TestParser().parse_string(text)
+    parallel_parser = _ParallelTestParser(processes=3)
+    assert len(parallel_parser.split_text(text)) > 1
+    assert parallel_parser.parse_string(text) == data
+    assert not parallel_parser.errors
+
+
+def test_parallel_parse_files(tmp_path):
+    bib_files = {
+        'first': """
+            @string{jan = "January"}
+            @string{journal = "Journal"}
+            @article{citing, title = "Citing", crossref = "cited", note = undefined}
+            @article{unwanted, title = "Unwanted", note = undefined}
+        """,
+        'second': """
+            @article{citing, title = "Repeated"}
+            @article{cited, journal = journal, month = jan, note = undefined2}
+            @preamble{"preamble"}
+        """,
+        'third': """
+            @string{journal = "Another Journal"}
+            @article{other, journal = journal, title = "One", title = "Two"}
+        """,
+    }
+    for name, text in bib_files.items():
+        (tmp_path / (name + '.bib')).write_text(text)
+    filenames = [str(tmp_path / name) for name in bib_files]
+
+    for wanted_entries in None, ['citing', 'other']:
+        parser = _TestParser(wanted_entries=wanted_entries)
+        with errors.capture() as reported_errors:
+            data = parser.parse_files(filenames, '.bib')
+        parallel_parser = _TestParser(wanted_entries=wanted_entries, processes=3)
+        with errors.capture() as parallel_reported_errors:
+            parallel_data = parallel_parser.parse_files(filenames, '.bib')
+
+        assert [str(error) for error in parallel_reported_errors] == [str(error) for error in reported_errors]
+        assert reported_errors
+        assert parallel_data == data
+        assert list(parallel_data.entries.keys()) == list(data.entries.keys())
+        assert parallel_data.preamble_list == data.preamble_list
+        assert list(parallel_parser.macros.items()) == list(parser.macros.items())
+        assert [errors.format_error(error) for error in parallel_parser.errors] == [
+            errors.format_error(error) for error in parser.errors
+        ]
+        assert parallel_data.entries['citing'].fields['title'] == 'Citing'
+        assert parallel_data.entries['cited'].fields['journal'] == 'Journal'
+        assert parallel_data.entries['other'].fields['journal'] == 'Another Journal'
+    assert [str(error) for error in parallel_parser.errors] == [
+        'undefined string in line 4: undefined',
+        'undefined string in line 3: undefined2',
+        'entry with key other has a duplicate title field',
+    ]
+
+    with errors.capture():
+        data = _TestParser().parse_files([io.StringIO(text) for text in bib_files.values()])
+        stream_data = _TestParser(processes=3).parse_files([io.StringIO(text) for text in bib_files.values()])
+    assert stream_data == data
+    assert list(stream_data.entries.keys()) == ['citing', 'unwanted', 'cited', 'other']
+
+
+def test_parallel_parser_unwanted_syntax_errors(tmp_path):
+    # the end of unwanted entries is not checked by the sequential parser
+    bib_files = {
+        'a': '@article(bad, title={x}}\n@article{k1, title={y}}\n',
+        'b': '@misc{k2, note = {z} junk}\n@misc{k3, note = undefined}\n' * 20,
+    }
+    for name, text in bib_files.items():
+        (tmp_path / (name + '.bib')).write_text(text)
+    filenames = [str(tmp_path / name) for name in bib_files]
+
+    data = Parser(wanted_entries=['k1']).parse_files(filenames, '.bib')
+    parallel_data = Parser(wanted_entries=['k1'], processes=2).parse_files(filenames, '.bib')
+    assert parallel_data == data
+    assert list(parallel_data.entries.keys()) == ['k1']
+
+    text = ''.join(bib_files.values())
+    parallel_parser = _ParallelTestParser(wanted_entries=['k1'], processes=3)
+    assert len(parallel_parser.split_text(text)) > 1
+    assert parallel_parser.parse_string(text) == data
+    assert not parallel_parser.errors
+
+
+class _IndexTestParser(_TestParser):
+    indexed_files = 0
+
+    def build_index(self, *args, **kwargs):
+        type(self).indexed_files += 1
+        return super(_IndexTestParser, self).build_index(*args, **kwargs)
+
+
+def test_indexed_parser(tmp_path):
+    bib_file = tmp_path / 'test.bib'
+    bib_file.write_text("""
+        @string{journal = "Journal"}
+        @preamble{"preamble"}
+        @article{citing, title = "Citing", crossref = "cited", journal = journal}
+        @article{unwanted, title = "Unwanted", note = undefined}
+        @comment{@article{commented, note = undefined}}
+        @article{cited, title = "Cited", note = undefined}
+        @article{citing, title = "Repeated"}
+    """)
+    wanted_entries = ['citing', 'commented']
+    with errors.capture() as reported_errors:
+        data = _TestParser(wanted_entries=wanted_entries).parse_file(str(bib_file))
+    assert list(data.entries.keys()) == ['citing', 'commented', 'cited']
+
+    for indexed_files in 1, 1:
+        parser = _IndexTestParser(wanted_entries=wanted_entries, use_index=True)
+        with errors.capture() as indexed_reported_errors:
+            indexed_data = parser.parse_file(str(bib_file))
+        assert _IndexTestParser.indexed_files == indexed_files
+        assert indexed_data == data
+        assert list(indexed_data.entries.keys()) == list(data.entries.keys())
+        assert indexed_data.preamble_list == data.preamble_list
+        assert [str(error) for error in indexed_reported_errors] == [str(error) for error in reported_errors]
+        assert [str(error) for error in parser.errors] == [
+            'undefined string in line 6: undefined',
+            'undefined string in line 7: undefined',
+        ]
+    assert (tmp_path / 'test.bib.pybtex-index').exists()
+
+    bib_file.write_text(bib_file.read_text().replace('"Citing"', '"Changed"'))
+    with errors.capture():
+        data = _IndexTestParser(wanted_entries=wanted_entries, use_index=True).parse_file(str(bib_file))
+    assert _IndexTestParser.indexed_files == 2
+    assert data.entries['citing'].fields['title'] == 'Changed'
+
+
+def test_indexed_parser_syntax_error(tmp_path):
+    bib_file = tmp_path / 'test.bib'
+    bib_file.write_text("""
+        @article{unwanted, title = }
+        @article{wanted, title = "Wanted"}
+    """)
+    data = _TestParser(wanted_entries=['wanted']).parse_file(str(bib_file))
+    for i in range(2):
+        parser = _TestParser(wanted_entries=['wanted'], use_index=True)
+        assert parser.parse_file(str(bib_file)) == data
+        assert [str(error) for error in parser.errors] == ['syntax error in line 2: field value expected']
+
+
+def test_lazy_entries():
+    parser = _TestParser(lazy_entries=True, wanted_entries=['citing'])
+    data = parser.parse_string("""
+        @article{citing, author = "Doe, John and Roe, Jane",
+            title = {A  Title}, crossref = "cited"}
+        @book{cited, editor = "Doe, Jr, John, Jim"}
+    """)
+    citing = data.entries['citing']
+    assert 'persons' not in citing.__dict__
+    assert citing.fields['title'] == 'A Title'
+    assert 'persons' not in citing.__dict__
+    assert [str(person) for person in citing.persons['author']] == ['Doe, John', 'Roe, Jane']
+    assert pickle.loads(pickle.dumps(citing)) == citing
+
+    cited = data.entries['cited']
+    cited.fields = {'title': 'Cited'}
+    with errors.capture() as reported_errors:
+        assert len(cited.persons['editor']) == 1
+    assert [str(error) for error in reported_errors] == ["Too many commas in 'Doe, Jr, John, Jim'"]
+    assert cited.fields == {'title': 'Cited'}
+
+
+class _CacheTestParser(_TestParser):
+    parsed_files = 0
+
+    def parse_for_cache(self, filename):
+        type(self).parsed_files += 1
+        return super(_CacheTestParser, self).parse_for_cache(filename)
+
+
+def test_parse_cache(tmp_path):
+    bib_file = tmp_path / 'test.bib'
+    bib_file.write_text("""
+        @string{journal = "Journal"}
+        @preamble{"preamble"}
+        @article{citing, title = "Citing", crossref = "cited", journal = journal}
+        @article{unwanted, title = "Unwanted", note = undefined}
+        @article{cited, title = "Cited", note = undefined, title = "Repeated"}
+        @article{citing, title = "Repeated"}
+    """)
+    cache_dir = tmp_path / 'cache'
+
+    for wanted_entries in None, ['citing']:
+        with errors.capture() as reported_errors:
+            data = _TestParser(wanted_entries=wanted_entries).parse_file(str(bib_file))
+        for i in range(2):
+            parser = _CacheTestParser(wanted_entries=wanted_entries, cache=str(cache_dir))
+            with errors.capture() as cached_reported_errors:
+                cached_data = parser.parse_file(str(bib_file))
+            assert _CacheTestParser.parsed_files == 1
+            assert cached_data == data
+            assert list(cached_data.entries.keys()) == list(data.entries.keys())
+            assert cached_data.preamble_list == data.preamble_list
+            assert parser.macros['journal'] == 'Journal'
+            assert [str(error) for error in cached_reported_errors] == [str(error) for error in reported_errors]
+    assert [str(error) for error in parser.errors] == [
+        'undefined string in line 6: undefined',
+        'entry with key cited has a duplicate title field',
+    ]
+    assert len(list(cache_dir.iterdir())) == 1
+
+    with errors.capture():
+        data = _CacheTestParser(cache=str(cache_dir), macros={'undefined': 'Defined'}).parse_file(str(bib_file))
+    assert _CacheTestParser.parsed_files == 2
+    assert data.entries['unwanted'].fields['note'] == 'Defined'
+
+    bib_file.write_text(bib_file.read_text().replace('"Citing"', '"Changed"'))
+    with errors.capture():
+        data = _CacheTestParser(cache=str(cache_dir)).parse_file(str(bib_file))
+    assert _CacheTestParser.parsed_files == 3
+    assert data.entries['citing'].fields['title'] == 'Changed'
+
+    assert len(list(cache_dir.iterdir())) == 2
+    cache = ParseCache(str(cache_dir), max_size=1)
+    with errors.capture():
+        _CacheTestParser(cache=cache, macros={}).parse_file(str(bib_file))
+    assert _CacheTestParser.parsed_files == 4
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_parse_cache_unwanted_syntax_errors(tmp_path):
+    bib_file = tmp_path / 'test.bib'
+    bib_file.write_text('@article(bad, title={x}}\n@article{k1, title={y}}\n')
+    cache_dir = tmp_path / 'cache'
+
+    data = Parser(wanted_entries=['k1']).parse_file(str(bib_file))
+    for i in range(2):
+        cached_data = Parser(wanted_entries=['k1'], cache=str(cache_dir)).parse_file(str(bib_file))
+        assert cached_data == data
+        assert list(cached_data.entries.keys()) == ['k1']
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_incremental_parser():
+    text = """
+        @string{journal = "Journal"}
+        @preamble{"one"}
+        @article{first, title = "First", journal = journal}
+        @article{second, title = "Second", note = undefined}
+        @string{journal = "Another " # journal}
+        @preamble{"two"}
+        @article{third, journal = journal}
+    """
+    edits = [
+        ('"First"', '"Changed"', BibliographyChanges(modified=['first'])),
+        ('@string{journal = "Journal"}', '@string{journal = "New"}', BibliographyChanges(modified=['first', 'third'])),
+        ('@article{second', '@book{second', BibliographyChanges(modified=['second'])),
+        ('@preamble{"one"}', '@article{new, title = "New"}', BibliographyChanges(added=['new'])),
+        ('@article{first', '@article{renamed', BibliographyChanges(added=['renamed'], removed=['first'])),
+        ('note = undefined', 'note = {defined}', BibliographyChanges(modified=['second'])),
+        ('@article{new', '@article{third', BibliographyChanges(removed=['new'], modified=['third'])),
+    ]
+    parser = _TestParser()
+    incremental_parser = IncrementalParser(text, parser=parser)
+    assert [str(error) for error in parser.errors] == ['undefined string in line 5: undefined']
+    for old, new, changes in edits:
+        del parser.errors[:]
+        text = text.replace(old, new)
+        with errors.capture() as reported_errors:
+            assert incremental_parser.update(text) == changes
+        expected_parser = Parser()
+        with errors.capture():
+            expected_data = expected_parser.parse_string(text)
+        assert incremental_parser.data == expected_data
+        assert list(incremental_parser.data.entries.keys()) == list(expected_data.entries.keys())
+        assert sorted(parser.macros.items()) == sorted(expected_parser.macros.items())
+    assert [str(error) for error in reported_errors] == ['repeated bibliography entry: third']
+
+
+def test_incremental_parser_premature_eof():
+    text = '@article{old, title = "Old"}\n@article{new, title = "Some {Thing}", note = "Contact me at foo@bar.com'
+    incremental_parser = IncrementalParser()
+    with errors.capture():
+        incremental_parser.update(text)
+        assert incremental_parser.update(text + '"}\n') == BibliographyChanges(modified=['new'])
+    assert incremental_parser.data.entries['new'].fields['note'] == 'Contact me at foo@bar.com'
+
+
+def test_incremental_parser_key_case():
+    incremental_parser = IncrementalParser()
+    incremental_parser.update('@book{b, title = "B"}\n@book{c}')
+    assert incremental_parser.update('@book{B, title = "B"}\n@book{c}') == BibliographyChanges(modified=['B'])
+    assert list(incremental_parser.data.entries.keys()) == ['B', 'c']
+
+
+def test_incremental_parser_random_edits():
+    fragments = [
+        '@string{m = "M"}', '@string{n = m # "N"}', '@string{m = {Other}}',
+        '@article{a, title = m # "A"}', '@book{b, note = n, title = {B {x}}}',
+        '@preamble{"p" # m}', '@comment{c}', '@misc{a@b.c, note = "x@y"}',
+        '@article{', 'title = "', 'note = "x@', '"}', '"}\n', '{', '}', '"', '@', '#', ' = ', ', ', 'm', 'n', '\n', 'text ',
+    ]
+    rng = random.Random(2021)
+    for i in range(200):
+        text = ''.join(rng.choice(fragments) for j in range(rng.randint(0, 12)))
+        incremental_parser = IncrementalParser()
+        with errors.capture():
+            incremental_parser.update(text)
+        for j in range(10):
+            # appending to the text changes commands ending prematurely
+            start = rng.choice([rng.randint(0, len(text)), len(text)])
+            end = rng.randint(start, min(len(text), start + 20))
+            replacement = ''.join(rng.choice(fragments) for k in range(rng.randint(0, 2)))
+            text = text[:start] + replacement + text[end:]
+            expected_parser = Parser()
+            with errors.capture():
+                incremental_parser.update(text)
+                expected_data = expected_parser.parse_string(text)
+            assert incremental_parser.data == expected_data, text
+            assert list(incremental_parser.data.entries.keys()) == list(expected_data.entries.keys()), text
+            assert incremental_parser.data.preamble_list == expected_data.preamble_list, text
+            assert sorted(incremental_parser.parser.macros.items()) == sorted(expected_parser.macros.items()), text
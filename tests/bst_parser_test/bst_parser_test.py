@@ -38,3 +38,52 @@ def test_bst_parser(dataset_name):
 
     for correct_element, actual_element in zip_longest(actual_result, correct_result):
         assert correct_element == actual_element, '\n{0}\n{1}'.format(correct_element, actual_element)
+
+
+def test_bst_syntax_error():
+    bst_data = 'ENTRY {} {} {}\n\nFUNCTION {foo}\n  { "a" "b" * write$\n\n'
+    with pytest.raises(bst.PybtexSyntaxError) as excinfo:
+        list(bst.parse_string(bst_data))
+    error = excinfo.value
+    assert str(error) == 'syntax error in line 5: premature end of file'
+
+    bst_data = 'ENTRY {} {} {}\n\nFUNCTION {foo}\n  { "a" }\nbar {}\n'
+    with pytest.raises(bst.TokenRequired) as excinfo:
+        list(bst.parse_string(bst_data))
+    error = excinfo.value
+    assert str(error) == 'syntax error in line 5: BST command expected'
+    assert error.get_context() == 'bar {}\n  ^^^'
+
+
+def test_parse_file_cache(tmp_path, monkeypatch):
+    parsed_files = []
+
+    def parse_stream(stream, filename='<INPUT>'):
+        parsed_files.append(filename)
+        return original_parse_stream(stream, filename)
+
+    original_parse_stream = bst.parse_stream
+    monkeypatch.setattr(bst, 'parse_stream', parse_stream)
+    monkeypatch.setattr(bst, 'script_cache', bst.BoundedCache(capacity=1))
+    bst_file = tmp_path / 'test.bst'
+    bst_file.write_text('FUNCTION {foo}\n  { "a" write$ }\n\nEXECUTE {foo}\n')
+    cache_dir = tmp_path / 'cache'
+    expected_result = list(bst.parse_string(bst_file.read_text()))
+
+    script = bst.parse_file(str(bst_file))
+    assert script == expected_result
+    assert bst.parse_file(str(bst_file)) is script
+    assert len(parsed_files) == 1
+    assert bst.parse_file(str(bst_file), encoding='latin1') == expected_result
+    assert len(parsed_files) == 2
+
+    for i in range(2):
+        bst.script_cache.clear()
+        assert bst.parse_file(str(bst_file), cache=str(cache_dir)) == expected_result
+    assert len(parsed_files) == 3
+    assert len(list(cache_dir.iterdir())) == 1
+
+    bst_file.write_text('FUNCTION {foo}\n  { "changed" write$ }\n\nEXECUTE {foo}\n')
+    script = bst.parse_file(str(bst_file), cache=str(cache_dir))
+    assert script == list(bst.parse_string(bst_file.read_text()))
+    assert len(parsed_files) == 4
@@ -80,6 +80,13 @@ class PybtexStreamIO(PybtexDatabaseIO):
         return self.parser.parse_stream(parser_stream)
 
 
+class PybtexEntryIteratorIO(PybtexStreamIO):
+    def deserialize(self, stream):
+        parser_stream = stream if self.parser.unicode_io else stream.buffer
+        entries = list(self.parser.iter_entries(parser_stream))
+        return BibliographyData(entries, preamble=self.parser.data.preamble_list)
+
+
 class PybtexStringIO(PybtexDatabaseIO):
     def serialize(self, bib_data):
         result = bib_data.to_string(self.bib_format)
@@ -160,7 +167,7 @@ def check_database_io(io_obj):
     assert deserialized_data == io_obj.reference_data
 
 
-@pytest.mark.parametrize(["io_cls"], [(PybtexBytesIO,), (PybtexStringIO,), (PybtexEntryStringIO,),(PybtexBytesIO,)])
+@pytest.mark.parametrize(["io_cls"], [(PybtexBytesIO,), (PybtexStringIO,), (PybtexEntryStringIO,),(PybtexBytesIO,), (PybtexEntryIteratorIO,)])
 @pytest.mark.parametrize(["bib_format"], [("bibtex",), ("bibtexml",), ("yaml",)])
 def test_database_io(io_cls, bib_format):
     check_database_io(io_cls(bib_format))
@@ -176,3 +183,271 @@ def test_database_pickling(protocol):
 
 def test_database_repr():
     check_database_io(ReprEvalIO())
+
+
+@pytest.mark.parametrize(
+    ["protocol"],
+    [(protocol,) for protocol in range(0, pickle.HIGHEST_PROTOCOL + 1)]
+)
+def test_compact_objects(protocol):
+    from pybtex.database import LazyEntry, Person
+
+    entry = Entry('article', fields={'title': 'Title'}, persons={'author': [Person('Doe, John')]})
+    person = entry.persons['author'][0]
+    assert not hasattr(entry, '__dict__')
+    assert not hasattr(person, '__dict__')
+    assert not hasattr(entry.fields, '__dict__')
+
+    person.first_names.append('Jim')
+    assert Person('Doe, John').first_names == ['John']
+    assert pickle.loads(pickle.dumps(entry, protocol=protocol)) == entry
+    assert pickle.loads(pickle.dumps(person, protocol=protocol)) == Person(first='John Jim', last='Doe')
+
+    lazy_entry = LazyEntry('article', [('title', 'Title'), ('author', 'Doe, John')], ['author'])
+    lazy_entry.key = 'key'
+    unpickled_entry = pickle.loads(pickle.dumps(lazy_entry, protocol=protocol))
+    assert unpickled_entry.key == 'key'
+    assert 'fields' not in unpickled_entry.__dict__
+    assert unpickled_entry == Entry('article', fields={'title': 'Title'}, persons={'author': [Person('Doe, John')]})
+
+
+@pytest.mark.parametrize(
+    ["protocol"],
+    [(protocol,) for protocol in range(0, pickle.HIGHEST_PROTOCOL + 1)]
+)
+def test_columnar_data(protocol):
+    from pybtex.database import Person
+    from pybtex.database.columnar import ColumnarBibliographyData
+
+    data = ColumnarBibliographyData(deepcopy(reference_data).entries, preamble=reference_data.preamble_list)
+    assert data == reference_data
+    assert data.to_string('bibtex') == reference_data.to_string('bibtex')
+    assert pickle.loads(pickle.dumps(data, protocol=protocol)) == reference_data
+    entry = data.entries['Ruckenstein-Diffusion']
+    assert entry.key == 'ruckenstein-diffusion'
+    assert pickle.loads(pickle.dumps(entry, protocol=protocol)) == entry
+    assert type(pickle.loads(pickle.dumps(entry, protocol=protocol))) is Entry
+
+    entries = list(reference_data.entries.values())
+    assert data.column('Year') == [entry.fields.get('year') for entry in entries]
+    assert data.column('nonexistent') == [None] * len(entries)
+    assert data.type_column() == [entry.type for entry in entries]
+    assert data.person_column('author') == [entry.persons.get('author', []) for entry in entries]
+
+    data.entries['ruckenstein-diffusion'] = Entry('Book', fields={'Title': 'Another title'})
+    del data.entries['test-inbook']
+    data.entries['new'] = Entry('article', persons={'editor': [Person('Doe, John')]})
+    assert list(data.entries.keys())[-2:] == ['ruckenstein-diffusion', 'new']
+    assert data.entries['ruckenstein-diffusion'] == Entry('book', fields={'Title': 'Another title'})
+    assert 'test-inbook' not in data.entries
+    assert data.column('year')[-2:] == [None, None]
+    assert data.column('title')[-2:] == ['Another title', None]
+    assert data.person_column('editor')[-1] == [Person('Doe, John')]
+
+
+def test_parse_columnar():
+    from pybtex.database.columnar import ColumnarBibliographyData
+
+    bibtex = reference_data.to_string('bibtex')
+    data = parse_string(bibtex, 'bibtex', columnar=True)
+    assert isinstance(data, ColumnarBibliographyData)
+    assert data == reference_data
+
+
+@pytest.mark.parametrize(["columnar"], [(False,), (True,)])
+def test_query(columnar):
+    from pybtex.database import Person
+    from pybtex.database.query import FieldIndex, PersonIndex, Prefix, QueryError, Range, TypeIndex
+
+    data = parse_string(reference_data.to_string('bibtex'), 'bibtex', columnar=columnar)
+    with pytest.raises(QueryError):
+        data.query(year=2006)
+    data.add_index(FieldIndex('Year'))
+    data.add_index(PersonIndex('author'))
+    data.add_index(TypeIndex())
+    assert data.query() == list(reference_data.entries.keys())
+    assert data.query(year='2006') == ['test-booklet']
+    assert data.query(year=Range(1900, 1990)) == ['viktorov-metodoj', 'test-inbook']
+    assert data.query(author='викторов') == ['viktorov-metodoj']
+    assert data.query(year=Range('1997')) == ['test-booklet', 'ruckenstein-diffusion']
+    assert data.query(author='RUCKENSTEIN', type='article') == ['ruckenstein-diffusion']
+    assert data.query(author=Prefix('j')) == ['test-inbook']
+    assert data.query(author='Ruckenstein', type='book') == []
+    with pytest.raises(QueryError):
+        data.query(title='Some Title')
+
+    data.entries['Test-Inbook'] = Entry('article', fields={'year': '2006'}, persons={'author': [Person('Doe, John')]})
+    data.add_entry('new', Entry('book', fields={'year': '1997'}, persons={'author': [Person('Jackson, Peter')]}))
+    assert data.query(year=1997) == ['ruckenstein-diffusion', 'new']
+    assert data.query(year=1933) == []
+    assert data.query(author='jackson') == ['new']
+    assert data.query(type='article') == ['ruckenstein-diffusion', 'Test-Inbook']
+    del data.entries['ruckenstein-diffusion']
+    assert data.query(year=Range(1990, 1999)) == ['new']
+    data.add_entry('squared', Entry('misc', fields={'year': '²'}))
+    assert data.query(year=Range(1, 3)) == []
+    if columnar:
+        entries = list(data.entries.values())
+        assert data.column('year') == [entry.fields.get('year') for entry in entries]
+        assert data.type_column() == [entry.type.lower() for entry in entries]
+        assert data.person_column('author') == [entry.persons.get('author', []) for entry in entries]
+    assert pickle.loads(pickle.dumps(data)).query(author='doe') == ['Test-Inbook']
+
+
+def test_crossref_graph():
+    from pybtex.database import Person
+
+    data = BibliographyData([
+        ('chapter', Entry('inbook', fields={'title': 'Chapter', 'crossref': 'Book'})),
+        ('book', Entry('book', fields={'crossref': 'series'}, persons={'editor': [Person('Doe, John')]})),
+        ('series', Entry('book', fields={'series': 'Series', 'crossref': 'CHAPTER'})),
+    ])
+    chapter = data.entries['chapter']
+    assert data.crossref_graph.cycles == [['chapter', 'book', 'series']]
+    assert chapter._find_field('title', data) == 'Chapter'
+    assert chapter._find_field('series', data) == 'Series'
+    with pytest.raises(KeyError):
+        chapter._find_field('year', data)
+
+    data.entries['series'].fields['crossref'] = 'nowhere'
+    with pytest.raises(KeyError):
+        chapter._find_field('year', data)
+    data.entries['series'].fields['crossref'] = 'book'
+    with pytest.raises(KeyError):
+        chapter._find_field('year', data)
+    assert chapter._find_field('editor', data) == 'Doe, John'
+    data.entries['book'].add_person(Person('Roe, Jane'), 'editor')
+    assert chapter._find_field('editor', data) == 'Doe, John and Roe, Jane'
+    data.entries['book'].persons['editor'][0] = Person('Poe, Edgar')
+    assert chapter._find_field('editor', data) == 'Poe, Edgar and Roe, Jane'
+    data.entries['book'].persons['editor'][0].last_names.append('Jr.')
+    assert chapter._find_field('editor', data) == 'Poe Jr., Edgar and Roe, Jane'
+    data.entries['book'].fields['series'] = 'Another series'
+    assert chapter._find_field('series', data) == 'Another series'
+
+    data.add_entry('new', Entry('misc', fields={'crossref': 'chapter'}))
+    assert data.crossref_graph.cycles == [['book', 'series']]
+    assert data.crossref_graph.missing == []
+    assert data.entries['new']._find_field('series', data) == 'Another series'
+
+    graph = data.crossref_graph
+    data.entries['new'] = Entry('misc', fields={'crossref': 'nowhere'})
+    data.entries['series'] = Entry('book', fields={'publisher': 'Publisher'})
+    assert data.crossref_graph is graph
+    assert graph.missing == [('new', 'nowhere')]
+    assert graph.cycles == []
+    assert chapter._find_field('publisher', data) == 'Publisher'
+    del data.entries['new']
+    data.add_entry('another', Entry('misc', fields={'crossref': 'chapter'}))
+    assert data.crossref_graph is graph
+    assert graph.missing == []
+    assert data.entries['another']._find_field('publisher', data) == 'Publisher'
+
+
+@pytest.mark.parametrize(["columnar"], [(False,), (True,)])
+def test_crossref_graph_person_strings(columnar):
+    data = parse_string(reference_data.to_string('bibtex'), 'bibtex', columnar=columnar)
+    entry = data.entries['viktorov-metodoj']
+    for i in range(2000):
+        assert entry._find_field('author', data) == 'Викторов, Михаил Маркович'
+    assert data.crossref_graph._person_strings.cache_info().currsize == 1
+
+
+def test_sqlite_crossref_graph_person_strings(tmp_path):
+    from pybtex.database.sqlite import SQLiteBibliographyData
+
+    bib_file = tmp_path / 'data.bib'
+    bib_file.write_text(reference_data.to_string('bibtex'), encoding='utf-8')
+    with SQLiteBibliographyData(str(tmp_path / 'data.sqlite')) as data:
+        data.import_file(str(bib_file))
+        for i in range(2000):
+            assert data.entries['viktorov-metodoj']._find_field('author', data) == 'Викторов, Михаил Маркович'
+        assert data.crossref_graph._person_strings.cache_info().currsize == 1
+
+
+def test_view():
+    from pybtex.database import Person
+    from pybtex.style.formatting.plain import Style
+
+    data = BibliographyData([
+        ('chapter', Entry('inbook', fields={'title': 'Chapter', 'pages': '1--10', 'crossref': 'Book'})),
+        ('Article', Entry(
+            'article', fields={'title': 'Article', 'journal': 'Journal', 'year': '2000'},
+            persons={'author': [Person('Roe, Jane')]},
+        )),
+        ('book', Entry(
+            'book', fields={'title': 'Book', 'publisher': 'Publisher', 'year': '1999'},
+            persons={'editor': [Person('Doe, John')]},
+        )),
+    ], preamble=['\\preamble'])
+    view = data.view(['CHAPTER', 'missing'])
+    assert list(view.entries.keys()) == ['chapter']
+    assert len(view.entries) == 1
+    assert view.missing_citations == ['missing']
+    assert view.entries['book'] is data.entries['book']
+    assert 'article' not in view.entries
+    with pytest.raises(KeyError):
+        view.entries['article']
+    assert view.entries['chapter']._find_field('year', view) == '1999'
+    assert view.preamble == '\\preamble'
+    assert list(data.view(['*'], min_crossrefs=1).entries.keys()) == ['chapter', 'Article', 'book']
+    assert view.to_string('bibtex') == BibliographyData(
+        [('chapter', data.entries['chapter'])], preamble=['\\preamble'],
+    ).to_string('bibtex')
+    assert list(view.lower().entries.keys()) == ['chapter']
+
+    with pytest.raises(TypeError):
+        view.add_entry('new', Entry('misc'))
+    with pytest.raises(TypeError):
+        view.add_to_preamble('\\another')
+    with pytest.raises(TypeError):
+        view.entries['new'] = Entry('misc')
+
+    style = Style()
+    citations = ['article', 'book']
+    expected = style.format_bibliography(data, citations)
+    result = style.format_bibliography(data.view(citations))
+    assert [entry.key for entry in result] == [entry.key for entry in expected]
+    assert [entry.text.render_as('latex') for entry in result] == [
+        entry.text.render_as('latex') for entry in expected
+    ]
+    assert result.preamble == expected.preamble
+
+
+def test_sqlite_data(tmp_path):
+    from pybtex.database import Person
+    from pybtex.database.query import PersonIndex, Prefix, TypeIndex
+    from pybtex.database.sqlite import SQLiteBibliographyData
+
+    bib_file = tmp_path / 'data.bib'
+    bib_file.write_text(reference_data.to_string('bibtex'), encoding='utf-8')
+    filename = str(tmp_path / 'data.sqlite')
+    with SQLiteBibliographyData(filename) as data:
+        data.import_file(str(bib_file))
+        assert data == reference_data
+        assert list(data.entries.keys()) == list(reference_data.entries.keys())
+        assert data.entries['RUCKENSTEIN-DIFFUSION'] == reference_data.entries['ruckenstein-diffusion']
+        assert 'missing' not in data.entries
+        assert data.to_string('bibtex') == reference_data.to_string('bibtex')
+        assert [key for key, entry in data.iter_entries()] == list(reference_data.entries.keys())
+        data.add_index(TypeIndex())
+
+    data = pickle.loads(pickle.dumps(SQLiteBibliographyData(filename)))
+    assert data.preamble == reference_data.preamble
+    assert data.query(type='article') == ['ruckenstein-diffusion']
+    data.add_index(PersonIndex('author'))
+    with data.transaction():
+        del data.entries['ruckenstein-diffusion']
+        data.add_entry('new', Entry('article', persons={'author': [Person('Doe, John')]}))
+        data.add_to_preamble('\\new')
+    assert data.query(type='article') == ['new']
+    assert data.query(author=Prefix('LA')) == ['test-booklet']
+    assert data.query(author='doe') == ['new']
+    with pytest.raises(ValueError):
+        with data.transaction():
+            del data.entries['new']
+            data.add_to_preamble('\\rolled-back')
+            raise ValueError
+    assert data.query(type='article') == ['new']
+    assert data.preamble == reference_data.preamble + '\\new'
+    data.close()
@@ -163,3 +163,163 @@ def test_bibtex_engine(check, filenames):
 def test_pybtex_engine(check, filenames):
     import pybtex
     check(pybtex, filenames)
+
+
+def test_format_from_files_async():
+    import asyncio
+    from pybtex import PybtexEngine
+    from pybtex.bibtex import BibTeXEngine
+
+    with cd_tempdir():
+        copy_files(['cyrillic.bib', 'unsrt.bst'])
+        for engine in PybtexEngine(), BibTeXEngine():
+            with errors.capture():
+                result = engine.format_from_file('cyrillic.bib', style='unsrt')
+                async_result = asyncio.run(engine.format_from_files_async(['cyrillic.bib'], style='unsrt'))
+            assert async_result == result
+
+
+def test_format_from_files_async_bib_processes(monkeypatch):
+    import asyncio
+    from pybtex import PybtexEngine
+
+    engine = PybtexEngine()
+    bib_parsers = []
+    make_bib_parser = engine.make_bib_parser
+
+    def record_bib_parser(*args, **kwargs):
+        bib_parser = make_bib_parser(*args, **kwargs)
+        bib_parsers.append(bib_parser)
+        return bib_parser
+
+    monkeypatch.setattr(engine, 'make_bib_parser', record_bib_parser)
+    with cd_tempdir():
+        copy_files(['cyrillic.bib', 'unsrt.bst'])
+        with errors.capture():
+            asyncio.run(engine.format_from_files_async(['cyrillic.bib'], style='unsrt', bib_processes=3))
+    assert [bib_parser.processes for bib_parser in bib_parsers] == [3]
+
+
+def test_format_from_bib_data():
+    from pybtex.bibtex import BibTeXEngine
+    from pybtex.database import parse_file
+
+    engine = BibTeXEngine()
+    with cd_tempdir():
+        copy_files(['xampl.bib', 'unsrt.bst'])
+        bib_data = parse_file('xampl.bib')
+        citations = list(bib_data.entries.keys())[::3]
+        with errors.capture():
+            result = engine.format_from_file('xampl.bib', style='unsrt', citations=citations)
+            view_result = engine.format_from_files(bib_data.view(citations), style='unsrt', citations=citations)
+            full_result = engine.format_from_files(bib_data, style='unsrt')
+            expected_full_result = engine.format_from_file('xampl.bib', style='unsrt')
+        assert view_result == result
+        assert full_result == expected_full_result
+
+
+@pytest.mark.parametrize(["style"], [("unsrt",), ("alpha",), ("IEEEtran",), ("jurabib",)])
+def test_format_from_transpiled_style(style):
+    from pybtex.bibtex import BibTeXEngine
+    from pybtex.bibtex.bst2py import transpile_file
+
+    engine = BibTeXEngine()
+    with cd_tempdir():
+        copy_files(['xampl.bib', style + '.bst'])
+        transpile_file(style + '.bst')
+        with errors.capture():
+            result = engine.format_from_file('xampl.bib', style=style)
+            transpiled_result = engine.format_from_file('xampl.bib', style=style + '.py')
+            write_aux('test.aux', 'xampl', 'nonexistent')
+            engine.make_bibliography('test.aux', style=style + '.py')
+        assert transpiled_result == result
+        with io.open_unicode('test.bbl') as result_file:
+            assert result_file.read() == result
+
+
+def test_profile_bst(tmp_path):
+    import pstats
+    from pybtex.bibtex import BibTeXEngine
+    from pybtex.bibtex.profiler import Profiler
+    from pybtex.database import parse_file
+
+    engine = BibTeXEngine()
+    profiler = Profiler()
+    with cd_tempdir():
+        copy_files(['xampl.bib', 'alpha.bst'])
+        bib_data = parse_file('xampl.bib')
+        with errors.capture():
+            result = engine.format_from_file('xampl.bib', style='alpha')
+            profiled_result = engine.format_from_file('xampl.bib', style='alpha', profiler=profiler)
+    assert profiled_result == result
+
+    # each entry is processed by three ITERATE commands and a REVERSE command
+    entry_types = set(entry.type.lower() for entry in bib_data.entries.values())
+    assert set(profiler.entry_type_stats) == entry_types
+    assert sum(stats.ncalls for stats in profiler.entry_type_stats.values()) == 4 * len(bib_data.entries)
+    assert profiler.function_stats['call.type$'].ncalls == len(bib_data.entries)
+    assert profiler.function_stats['output.bibitem'].callers['article'].ncalls == len([
+        entry for entry in bib_data.entries.values() if entry.type == 'article'
+    ])
+    format_names = profiler.function_stats['format.names']
+    assert format_names.cumtime >= format_names.tottime > 0
+    assert profiler.max_stack_depth > 0
+    assert 'format.name$' in profiler.format_report()
+
+    stats_filename = str(tmp_path / 'alpha.prof')
+    profiler.dump_stats(stats_filename)
+    stats = pstats.Stats(stats_filename)
+    assert stats.stats[('~', 0, 'format.names')][:2] == (format_names.primitive_calls, format_names.ncalls)
+
+
+@pytest.mark.parametrize(["style"], [("plain",), ("alpha",), ("jurabib",), ("apacite",)])
+def test_format_with_bst_processes(style, monkeypatch):
+    from pybtex.bibtex import BibTeXEngine
+    from pybtex.bibtex.interpreter import Interpreter
+
+    monkeypatch.setattr(Interpreter, 'min_parallel_entries', 2)
+    engine = BibTeXEngine()
+    with cd_tempdir():
+        copy_files(['xampl.bib', style + '.bst'])
+        with errors.capture() as reported_errors:
+            result = engine.format_from_file('xampl.bib', style=style)
+        with errors.capture() as parallel_reported_errors:
+            parallel_result = engine.format_from_file('xampl.bib', style=style, bst_processes=2)
+    assert parallel_result == result
+    assert [str(error) for error in parallel_reported_errors] == [str(error) for error in reported_errors]
+
+
+def test_iterate_parallel():
+    from pybtex.bibtex import bst
+    from pybtex.bibtex.interpreter import Interpreter
+    from pybtex.database import BibliographyData, Entry
+
+    script = list(bst.parse_string('''
+        ENTRY {title} {} {label}
+        INTEGERS {count}
+        STRINGS {temp}
+        FUNCTION {make.label} { title 'temp := temp "!" * 'label := }
+        FUNCTION {print} { label write$ newline$ }
+        FUNCTION {counter} { count #1 + 'count := }
+        FUNCTION {debug} { label top$ }
+        READ
+        ITERATE {make.label}
+        REVERSE {print}
+        ITERATE {counter}
+    '''))
+    bib_data = BibliographyData(
+        [('key{0}'.format(n), Entry('article', {'title': 'Title {0}'.format(n)})) for n in range(10)]
+    )
+    interpreter = Interpreter(None, None, processes=2)
+    interpreter.min_parallel_entries = 2
+    result = interpreter.run(script, ['*'], bib_data, min_crossrefs=2)
+    assert result == ''.join('Title {0}!\n'.format(n) for n in reversed(range(10)))
+    assert interpreter.vars['temp'].value() == 'Title 9'
+    assert interpreter.vars['count'].value() == 10
+    assert interpreter.entry_vars['key3']['label'] == 'Title 3!'
+
+    citations = list(bib_data.entries.keys())
+    assert interpreter.is_entry_local('make.label', citations)
+    assert interpreter.is_entry_local('counter', citations)
+    assert not interpreter.is_entry_local('debug', citations)
+    assert interpreter.sequential_functions == {'counter'}
@@ -207,3 +207,22 @@ def test_parse_name(name, correct_result, expected_errors):
     result = (person.bibtex_first_names, person.prelast_names, person.last_names, person.lineage_names)
     assert result == correct_result
     assert captured_errors == expected_errors
+
+
+def test_name_cache():
+    Person.name_cache.clear()
+    person = Person('de la Fontaine, Jean')
+    person.first_names.append('Extra')
+    cached_person = Person('de la Fontaine, Jean')
+    assert cached_person.first_names == ['Jean']
+    assert cached_person.prelast_names == ['de', 'la']
+    assert cached_person.last_names[0] is person.last_names[0]
+    assert Person(last='Fontaine') != Person('Fontaine', first='Jean')
+    info = Person.name_cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 3)
+
+    invalid_name = 'Chong, B. M., Specia, L., & Mitkov, R.'
+    with errors.capture() as captured_errors:
+        Person(invalid_name)
+        Person(invalid_name)
+    assert captured_errors == [InvalidNameString(invalid_name)] * 2